@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark and load-test the Customer Insights tool queries on the local DuckDB backend.
+
+Loads synthetic data (numpy engine) into an in-memory DuckDBBackend, then runs
+every query template from query_templates.py, in rows and summary mode, and
+prints p50/p95 latency per query. With --threads N, the same queries are also
+fired from N threads at once and the sustained queries/s is reported. Needs
+no GCP project.
+
+Usage:
+    python scripts/benchmark_local_backend.py
+    python scripts/benchmark_local_backend.py 100000 --iterations 50 --threads 8
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add project root to path to import from src
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.customer_insights.data.duckdb_backend import DuckDBBackend
+from src.customer_insights.data.query_templates import QUERY_TEMPLATES, render_template
+
+SEED = 42
+# Filters bound for every template run (the rest stay NULL)
+PARAMETERS = {"is_gen_z": True, "time_period": "2025-Q2"}
+
+
+def build_queries(backend: DuckDBBackend):
+    """(label, mode, sql, query_parameters) for every template in rows and summary mode"""
+    queries = []
+    for name in QUERY_TEMPLATES:
+        sql_query, query_parameters = render_template(name, backend.project, backend.dataset_id, PARAMETERS)
+        queries.append((name, "rows", sql_query, query_parameters))
+        sql_query, query_parameters = render_template(
+            name, backend.project, backend.dataset_id, PARAMETERS, row_limit=""
+        )
+        queries.append((name, "summary", sql_query, query_parameters))
+    return queries
+
+
+def run(backend: DuckDBBackend, mode: str, sql_query: str, query_parameters) -> None:
+    if mode == "summary":
+        backend.run_summary_query(sql_query, backend.dataset_id, query_parameters)
+    else:
+        backend.run_query(sql_query, backend.dataset_id, query_parameters)
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("num_customers", nargs="?", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=20, help="Runs per query (default 20)")
+    parser.add_argument("--threads", type=int, default=0, help="Concurrent load test with this many threads")
+    args = parser.parse_args()
+
+    backend = DuckDBBackend()
+    start = time.perf_counter()
+    row_counts = backend.load_synthetic_data(num_customers=args.num_customers, seed=SEED)
+    load_seconds = time.perf_counter() - start
+    print()
+    print("=" * 72)
+    print(f"Local DuckDB backend: {args.num_customers:,} customers loaded in {load_seconds:.1f}s")
+    for table_name, rows in row_counts.items():
+        print(f"  {table_name:<28} {rows:>12,} rows")
+    print("=" * 72)
+
+    queries = build_queries(backend)
+    print(f"{'template':<24} | {'mode':<8} | {'p50 ms':>8} | {'p95 ms':>8}")
+    print("-" * 72)
+    for name, mode, sql_query, query_parameters in queries:
+        run(backend, mode, sql_query, query_parameters)  # warm-up
+        timings = []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            run(backend, mode, sql_query, query_parameters)
+            timings.append((time.perf_counter() - started) * 1000)
+        print(
+            f"{name:<24} | {mode:<8} | {statistics.median(timings):>8.1f} | "
+            f"{percentile(timings, 0.95):>8.1f}"
+        )
+
+    if args.threads:
+        total = len(queries) * args.iterations
+        print("-" * 72)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(lambda query: run(backend, *query[1:]), queries * args.iterations))
+        seconds = time.perf_counter() - started
+        print(f"Load test: {total:,} queries on {args.threads} threads in {seconds:.2f}s ({total / seconds:,.1f} queries/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
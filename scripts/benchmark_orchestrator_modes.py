@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Compare the wall-clock time of the marketing orchestrator's research modes.
+
+Runs MarketingOrchestratorAgent end to end on one research goal with
+MARKETING_RESEARCH_MODE=sequential (the three research teams one after
+another) and =parallel (the research squad's ParallelAgent plus the join
+stage), each in its own process because the mode is fixed when agent.py is
+imported. Reports total time, time until offer design starts, and each
+team's time. Needs the same credentials as a normal ADK run (Gemini and
+BigQuery, or CUSTOMER_INSIGHTS_QUERY_BACKEND=duckdb for local data).
+
+Usage:
+    python scripts/benchmark_orchestrator_modes.py
+    python scripts/benchmark_orchestrator_modes.py "Analyze weekday lunch offers" --modes parallel
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path to import from src
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+DEFAULT_GOAL = "Design Q1 breakfast offers for Gen Z app users"
+MODES = ("sequential", "parallel")
+# Top-level agent name -> research team it belongs to (sequential mode authors)
+TEAM_AUTHORS = {
+    "MarketTrendsAnalystAgent": "market_trends",
+    "CustomerInsightsAgent": "customer_insights",
+    "CompetitorIntelAgent": "competitor_intel",
+}
+# Branch path segment -> research team (parallel mode)
+TEAM_BRANCHES = {
+    "MarketTrendsBranch": "market_trends",
+    "CustomerInsightsBranch": "customer_insights",
+    "CompetitorIntelBranch": "competitor_intel",
+}
+
+
+def team_of(event) -> str:
+    branch_path = (event.branch or "").split(".")
+    for segment, team in TEAM_BRANCHES.items():
+        if segment in branch_path:
+            return team
+    for segment, team in TEAM_AUTHORS.items():
+        if segment in branch_path:
+            return team
+    return ""
+
+
+async def run_once(goal: str) -> dict:
+    """Run the orchestrator in this process and time it from its events"""
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    from src.marketing_orchestrator.agent import root_agent
+
+    runner = InMemoryRunner(agent=root_agent, app_name="marketing_orchestrator")
+    session = await runner.session_service.create_session(app_name="marketing_orchestrator", user_id="benchmark")
+    message = types.Content(role="user", parts=[types.Part(text=goal)])
+
+    # Agent name -> research team, for events that carry no branch (sequential mode)
+    team_agents = {}
+    for team_name, team in TEAM_AUTHORS.items():
+        pending = [root_agent.find_agent(team_name)]
+        while pending:
+            agent = pending.pop()
+            if agent is not None:
+                team_agents[agent.name] = team
+                pending.extend(agent.sub_agents)
+
+    started = time.perf_counter()
+    team_spans = {}
+    offer_design_started = None
+    async for event in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+        now = time.perf_counter() - started
+        if event.author == "SimplifiedOfferDesignAgent" and offer_design_started is None:
+            offer_design_started = now
+        team = team_of(event)
+        if not team:
+            team = team_agents.get(event.author, "")
+        if team:
+            first, _ = team_spans.get(team, (now, now))
+            team_spans[team] = (first, now)
+    total = time.perf_counter() - started
+    return {
+        "total_seconds": round(total, 1),
+        "research_seconds": round(offer_design_started if offer_design_started is not None else total, 1),
+        "team_seconds": {team: round(last - first, 1) for team, (first, last) in team_spans.items()},
+    }
+
+
+def run_mode(mode: str, goal: str) -> dict:
+    env = dict(os.environ, MARKETING_RESEARCH_MODE=mode)
+    completed = subprocess.run(
+        [sys.executable, __file__, goal, "--child"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("goal", nargs="?", default=DEFAULT_GOAL)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_once(args.goal))))
+        return 0
+
+    print()
+    print("=" * 72)
+    print(f"Marketing orchestrator: \"{args.goal}\"")
+    print("=" * 72)
+    results = {}
+    for mode in args.modes:
+        print(f"Running {mode}...", flush=True)
+        results[mode] = run_mode(mode, args.goal)
+
+    print(f"{'mode':<12} | {'total s':>8} | {'research s':>10} | team seconds")
+    print("-" * 72)
+    for mode, result in results.items():
+        if "error" in result:
+            print(f"{mode:<12} | failed: {result['error']}")
+            continue
+        teams = ", ".join(f"{team} {seconds}" for team, seconds in sorted(result["team_seconds"].items()))
+        print(f"{mode:<12} | {result['total_seconds']:>8.1f} | {result['research_seconds']:>10.1f} | {teams}")
+    if all(mode in results and "error" not in results[mode] for mode in MODES):
+        speedup = results["sequential"]["research_seconds"] / max(results["parallel"]["research_seconds"], 0.1)
+        print("-" * 72)
+        print(f"Research stage speedup (parallel vs sequential): {speedup:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
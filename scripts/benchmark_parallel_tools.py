@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark the wall-clock time of the Customer Insights parallel stage.
+
+BehavioralAnalysisAgent and SentimentAnalysisAgent run under a ParallelAgent.
+This replays one round of their tool calls two ways:
+
+- blocking: the *_sync tools called one after another, which is what
+  synchronous tools amount to on a single event loop
+- async: each agent's calls awaited in order, the agents gathered
+  concurrently, as the ParallelAgent runs the async tools
+
+By default the queries run on the local DuckDB backend (see
+duckdb_backend.py). --simulated-latency adds a fixed per-query delay that
+stands in for a BigQuery job's round trip: it blocks in the sync path, like
+query_job.result(), and is awaited in the async path, like polling the job.
+Pass --bigquery to run against the configured BigQuery project instead (the
+result cache is disabled so every call reaches BigQuery).
+
+Usage:
+    python scripts/benchmark_parallel_tools.py
+    python scripts/benchmark_parallel_tools.py --simulated-latency 1.5 --rounds 3
+    python scripts/benchmark_parallel_tools.py --bigquery
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path to import from src
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Tool calls per sub-agent: (tool name, query, table_name, mode)
+WORKLOAD = {
+    "BehavioralAnalysisAgent": [
+        ("crm_database_tool", "Compare Gen Z vs non-Gen Z visits", "crm_data", "raw"),
+        ("crm_database_tool", "Daypart breakdown for Gen Z", "crm_data", "raw"),
+        ("crm_database_tool", "Summarize transactions for Gen Z on app", "customer_transactions_raw", "summary"),
+        ("redemption_log_tool", "Offer lift by channel for Gen Z", "redemption_logs", "raw"),
+    ],
+    "SentimentAnalysisAgent": [
+        ("feedback_database_tool", "Gen Z feedback sentiment", "feedback_data", "raw"),
+        ("feedback_database_tool", "Gen Z feedback sentiment", "feedback_data", "summary"),
+        ("feedback_database_tool", "Raw feedback ratings from Gen Z", "customer_feedback_raw", "raw"),
+    ],
+}
+DATASET = "wendys_hackathon_data"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per variant (default 5)")
+    parser.add_argument("--customers", type=int, default=5_000, help="Synthetic customers for DuckDB (default 5000)")
+    parser.add_argument("--simulated-latency", type=float, default=0.0, help="Seconds added per DuckDB query")
+    parser.add_argument("--bigquery", action="store_true", help="Query BigQuery instead of local DuckDB")
+    return parser.parse_args()
+
+
+def install_local_backend(num_customers: int, latency: float) -> None:
+    from src.customer_insights.data.duckdb_backend import DuckDBBackend
+    from src.customer_insights.data.query_backend import set_query_backend
+
+    class SlowDuckDBBackend(DuckDBBackend):
+        """DuckDB with a fixed per-query delay standing in for a BigQuery job's round trip"""
+
+        def run_query(self, *args, **kwargs):
+            time.sleep(latency)
+            return super().run_query(*args, **kwargs)
+
+        async def run_query_async(self, *args, **kwargs):
+            await asyncio.sleep(latency)
+            return await asyncio.to_thread(super().run_query, *args, **kwargs)
+
+    backend = SlowDuckDBBackend() if latency else DuckDBBackend()
+    backend.load_synthetic_data(num_customers=num_customers, seed=42)
+    set_query_backend(backend)
+
+
+def main():
+    args = parse_args()
+    if args.bigquery:
+        os.environ["BQ_RESULT_CACHE_ENABLED"] = "false"
+    else:
+        install_local_backend(args.customers, args.simulated_latency)
+
+    # Imported after the backend is chosen (query_runner reads its settings on import)
+    from src.customer_insights.sub_agents.behavioral_analysis import tools as behavioral_tools
+    from src.customer_insights.sub_agents.sentiment_analysis import tools as sentiment_tools
+
+    tools = {
+        "crm_database_tool": behavioral_tools.crm_database_tool.func,
+        "redemption_log_tool": behavioral_tools.redemption_log_tool.func,
+        "feedback_database_tool": sentiment_tools.feedback_database_tool.func,
+    }
+    sync_tools = {
+        "crm_database_tool": behavioral_tools.crm_database_tool_sync,
+        "redemption_log_tool": behavioral_tools.redemption_log_tool_sync,
+        "feedback_database_tool": sentiment_tools.feedback_database_tool_sync,
+    }
+
+    def run_blocking_round() -> None:
+        for calls in WORKLOAD.values():
+            for tool_name, query, table_name, mode in calls:
+                sync_tools[tool_name](query, DATASET, table_name, mode=mode)
+
+    async def run_agent(calls) -> None:
+        for tool_name, query, table_name, mode in calls:
+            await tools[tool_name](query, DATASET, table_name, mode=mode)
+
+    async def run_async_round() -> None:
+        await asyncio.gather(*(run_agent(calls) for calls in WORKLOAD.values()))
+
+    # Warm up clients, caches of compiled SQL and the DuckDB buffer pool
+    run_blocking_round()
+
+    timings = {"blocking": [], "async": []}
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        run_blocking_round()
+        timings["blocking"].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        asyncio.run(run_async_round())
+        timings["async"].append(time.perf_counter() - started)
+
+    calls = sum(len(agent_calls) for agent_calls in WORKLOAD.values())
+    backend = "BigQuery" if args.bigquery else f"DuckDB (+{args.simulated_latency:.2f}s per query)"
+    print()
+    print("=" * 72)
+    print(f"Parallel stage: {len(WORKLOAD)} sub-agents, {calls} tool calls per round, {backend}")
+    print("=" * 72)
+    print(f"{'variant':<10} | {'best s':>8} | {'mean s':>8}")
+    print("-" * 72)
+    for variant, seconds in timings.items():
+        print(f"{variant:<10} | {min(seconds):>8.2f} | {sum(seconds) / len(seconds):>8.2f}")
+    speedup = min(timings["blocking"]) / min(timings["async"])
+    print("-" * 72)
+    print(f"Async speedup (best round): {speedup:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark BigQuery result conversion used by the Customer Insights tools.
+
+Compares the legacy REST row path (JSON page decoding into bigquery.Row objects,
+then the per-cell ``for col in columns: row_dict[col] = row[col]`` loop) against
+the Arrow columnar path used by query_runner.results_to_columns, plus the cost of
+expanding columnar results into row dicts when result_format="rows".
+
+Runs fully offline: result sets are synthesized with crm_data-shaped columns.
+
+Usage:
+    python scripts/benchmark_result_conversion.py
+    python scripts/benchmark_result_conversion.py 10000 100000 500000
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path to import from src
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pyarrow as pa
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery._helpers import _rows_from_json
+
+from src.customer_insights.data.query_runner import columns_to_rows
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+
+SCHEMA = [
+    SchemaField("customer_id", "STRING"),
+    SchemaField("segment_id", "STRING"),
+    SchemaField("visit_date", "TIMESTAMP"),
+    SchemaField("spend", "FLOAT"),
+    SchemaField("channel", "STRING"),
+    SchemaField("is_gen_z", "BOOLEAN"),
+    SchemaField("time_period", "STRING"),
+    SchemaField("visit_daypart", "STRING"),
+]
+
+
+def build_result_set(num_rows: int) -> pa.Table:
+    """Build an Arrow table shaped like a crm_data query result"""
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    return pa.table(
+        {
+            "customer_id": [f"customer_{rng.randint(1, 1200):04d}" for _ in range(num_rows)],
+            "segment_id": [rng.choice(["discount-hunter", "loyal-repeater", "premium-seeker"]) for _ in range(num_rows)],
+            "visit_date": [start + timedelta(minutes=rng.randint(0, 525_600)) for _ in range(num_rows)],
+            "spend": [round(rng.uniform(5, 18), 2) for _ in range(num_rows)],
+            "channel": [rng.choice(["app", "web", "in-store", "drive-thru"]) for _ in range(num_rows)],
+            "is_gen_z": [rng.random() < 0.32 for _ in range(num_rows)],
+            "time_period": [rng.choice(["2025-Q1", "2025-Q2", "2025-Q3", "2025-Q4"]) for _ in range(num_rows)],
+            "visit_daypart": [rng.choice(["breakfast", "lunch", "dinner"]) for _ in range(num_rows)],
+        }
+    )
+
+
+def to_rest_pages(table: pa.Table):
+    """Encode the table the way the BigQuery REST API returns rows ({"f": [{"v": ...}]})"""
+    pages = []
+    for values in zip(*table.to_pydict().values()):
+        cells = []
+        for value in values:
+            if isinstance(value, datetime):
+                value = int(value.timestamp() * 1_000_000)
+            elif isinstance(value, bool):
+                value = "true" if value else "false"
+            cells.append({"v": str(value)})
+        pages.append({"f": cells})
+    return pages
+
+
+def legacy_row_loop(rest_rows, columns):
+    """The REST decode plus per-cell conversion the tools used before the Arrow path"""
+    result = []
+    for row in _rows_from_json(rest_rows, SCHEMA):
+        row_dict = {}
+        for col in columns:
+            row_dict[col] = row[col]
+        result.append(row_dict)
+    return result
+
+
+def timed(func, *args, repeat: int = 3) -> float:
+    """Best-of-N wall-clock time in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print("=" * 80)
+    print("BigQuery result conversion benchmark")
+    print("=" * 80)
+    print(f"{'rows':>10} | {'row loop (ms)':>14} | {'arrow columnar (ms)':>20} | {'columnar->rows (ms)':>20} | {'speedup':>8}")
+    print("-" * 80)
+
+    for num_rows in sizes:
+        table = build_result_set(num_rows)
+        columns = table.column_names
+        rest_rows = to_rest_pages(table)
+
+        loop_ms = timed(legacy_row_loop, rest_rows, columns)
+        arrow_ms = timed(table.to_pydict)
+        data = table.to_pydict()
+        expand_ms = timed(columns_to_rows, columns, data)
+
+        print(
+            f"{num_rows:>10,} | {loop_ms:>14.1f} | {arrow_ms:>20.1f} | {expand_ms:>20.1f} | {loop_ms / arrow_ms:>7.1f}x"
+        )
+
+    print()
+    print("row loop:        REST JSON decode + legacy nested loop over bigquery.Row objects")
+    print("arrow columnar:  Arrow table -> {column: [values]} (tool default)")
+    print("columnar->rows:  extra cost paid only when result_format='rows'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark the python and numpy synthetic data engines (crm_data, redemption_logs
+and feedback_data) at 1k / 100k / 1M customers.
+
+The numpy engine generates in batches of BATCH_CUSTOMERS customers so the
+1M-customer run, roughly 140M visit rows, fits in memory; each batch is timed
+and discarded. The python engine is only run up to PYTHON_MAX_CUSTOMERS
+(override with --python), since it needs about a minute per 5k customers.
+
+With --compare, both engines also generate the default 1,200-customer dataset
+from the same seed and the total variation distance of each categorical
+column's distribution is printed (0 = identical, sampling noise is ~0.01-0.05).
+
+Usage:
+    python scripts/benchmark_synthetic_generation.py
+    python scripts/benchmark_synthetic_generation.py 1000 100000 --compare
+    python scripts/benchmark_synthetic_generation.py 10000 --python
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path to import from src
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import numpy as np
+import pandas as pd
+
+from src.customer_insights.data.synthetic_data_generator import (
+    generate_crm_data,
+    generate_feedback_data,
+    generate_redemption_logs,
+)
+from src.customer_insights.data.vectorized_generator import (
+    generate_crm_frame,
+    generate_feedback_frame,
+    generate_redemption_frame,
+)
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+SEED = 42
+BATCH_CUSTOMERS = 50_000
+PYTHON_MAX_CUSTOMERS = 1_000
+
+# Same ratios as export_to_dataframes
+REDEMPTIONS_PER_CUSTOMER = 5500 / 1200
+REVIEWS_PER_CUSTOMER = 2200 / 1200
+
+COMPARE_COLUMNS = {
+    "crm_data": ["generation", "segment_id", "channel", "time_period", "visit_daypart", "preferred_time"],
+    "redemption_logs": ["offer_type", "channel", "time_period", "daypart", "day_of_week", "hour"],
+    "feedback_data": ["offer_type", "channel", "source", "time_period", "daypart"],
+}
+
+
+def run_python(num_customers: int, seed: int):
+    """Generate with the row-by-row engine; returns (seconds, rows, frames)"""
+    random.seed(seed)
+    np.random.seed(seed)
+    start = time.perf_counter()
+    crm_rows, profile_rows = generate_crm_data(num_customers)
+    profiles = pd.DataFrame(profile_rows)
+    redemptions = generate_redemption_logs(round(num_customers * REDEMPTIONS_PER_CUSTOMER), profiles)
+    feedback = generate_feedback_data(round(num_customers * REVIEWS_PER_CUSTOMER), profiles)
+    frames = {
+        "crm_data": pd.DataFrame(crm_rows),
+        "redemption_logs": pd.DataFrame(redemptions),
+        "feedback_data": pd.DataFrame(feedback),
+    }
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(len(df) for df in frames.values()), frames
+
+
+def run_numpy(num_customers: int, seed: int, batch_customers: int):
+    """Generate with the vectorized engine in customer batches; returns (seconds, rows, frames of the last batch)"""
+    rng = np.random.default_rng(seed)
+    elapsed = 0.0
+    rows = 0
+    frames = {}
+    for offset in range(0, num_customers, batch_customers):
+        batch = min(batch_customers, num_customers - offset)
+        start = time.perf_counter()
+        crm_df, profiles = generate_crm_frame(batch, rng, start_index=offset)
+        redemption_df = generate_redemption_frame(
+            round(batch * REDEMPTIONS_PER_CUSTOMER), profiles, rng, start_index=round(offset * REDEMPTIONS_PER_CUSTOMER)
+        )
+        feedback_df = generate_feedback_frame(
+            round(batch * REVIEWS_PER_CUSTOMER), profiles, rng, start_index=round(offset * REVIEWS_PER_CUSTOMER)
+        )
+        elapsed += time.perf_counter() - start
+        frames = {"crm_data": crm_df, "redemption_logs": redemption_df, "feedback_data": feedback_df}
+        rows += sum(len(df) for df in frames.values())
+    return elapsed, rows, frames
+
+
+def total_variation(a: pd.Series, b: pd.Series) -> float:
+    """Total variation distance between the value distributions of two columns"""
+    pa = a.astype(str).value_counts(normalize=True)
+    pb = b.astype(str).value_counts(normalize=True)
+    return 0.5 * pa.sub(pb, fill_value=0).abs().sum()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:] if not arg.startswith("--")] or DEFAULT_SIZES
+    python_max_customers = max(sizes) if "--python" in sys.argv else PYTHON_MAX_CUSTOMERS
+
+    print("=" * 80)
+    print("Synthetic data generation benchmark (crm_data + redemption_logs + feedback_data)")
+    print("=" * 80)
+    print(f"{'customers':>10} | {'engine':<6} | {'rows':>12} | {'seconds':>9} | {'rows/s':>11} | {'speedup':>7}")
+    print("-" * 80)
+    for num_customers in sizes:
+        python_seconds = None
+        if num_customers <= python_max_customers:
+            python_seconds, rows, _ = run_python(num_customers, SEED)
+            print(
+                f"{num_customers:>10,} | {'python':<6} | {rows:>12,} | {python_seconds:>9.2f} | "
+                f"{rows / python_seconds:>11,.0f} | {'':>7}"
+            )
+        else:
+            print(f"{num_customers:>10,} | {'python':<6} | {'skipped (pass --python)':>47}")
+        numpy_seconds, rows, _ = run_numpy(num_customers, SEED, BATCH_CUSTOMERS)
+        speedup = f"{python_seconds / numpy_seconds:.1f}x" if python_seconds else ""
+        print(
+            f"{num_customers:>10,} | {'numpy':<6} | {rows:>12,} | {numpy_seconds:>9.2f} | "
+            f"{rows / numpy_seconds:>11,.0f} | {speedup:>7}"
+        )
+
+    if "--compare" in sys.argv:
+        print()
+        print("Distribution check at 1,200 customers (total variation distance, python vs numpy)")
+        print("-" * 80)
+        _, _, python_frames = run_python(1200, SEED)
+        _, _, numpy_frames = run_numpy(1200, SEED, 1200)
+        for table, columns in COMPARE_COLUMNS.items():
+            for column in columns:
+                distance = total_variation(python_frames[table][column], numpy_frames[table][column])
+                print(f"{table + '.' + column:<40} {distance:.3f}")
+        for table, column in [
+            ("crm_data", "spend"),
+            ("redemption_logs", "lift_multiplier"),
+            ("feedback_data", "sentiment_score"),
+        ]:
+            python_values = python_frames[table][column]
+            numpy_values = numpy_frames[table][column]
+            print(
+                f"{table + '.' + column:<40} mean {python_values.mean():.3f} vs {numpy_values.mean():.3f}, "
+                f"std {python_values.std():.3f} vs {numpy_values.std():.3f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
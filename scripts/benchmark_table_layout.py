@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark bytes scanned by the agents' standard cohort queries before and after
+partitioning/clustering (see TABLE_CONFIGS in bigquery_schemas.py).
+
+For each partitioned table, an unpartitioned, unclustered copy is created as the
+"before" baseline (it expires after an hour and is dropped at the end). Every
+query then runs against both layouts with the BigQuery cache disabled, and the
+actual bytes processed are compared. Dry-run estimates are not used because they
+ignore clustering pruning.
+
+Run `python src/customer_insights/data/bigquery_loader.py --migrate` first so the
+real tables have the configured layout.
+
+Usage:
+    python scripts/benchmark_table_layout.py
+    python scripts/benchmark_table_layout.py <dataset-id>
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path to import from src
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Load environment variables from .env file
+from src.utils.env_loader import load_env
+load_env()
+
+from google.cloud import bigquery
+
+from src.customer_insights.data.bigquery_client import get_bigquery_client
+from src.customer_insights.data.bigquery_loader import build_time_partitioning, table_layout_matches
+from src.customer_insights.data.bigquery_schemas import TABLE_CONFIGS
+from src.customer_insights.data.query_runner import format_bytes
+from src.customer_insights.data.query_templates import QUERY_TEMPLATES, render_template
+
+BASELINE_SUFFIX = "__unpartitioned_baseline"
+
+# Cohort checks the agent instructions mandate, plus a date-bounded variant that
+# can prune partitions
+STANDARD_QUERIES = [
+    (
+        "gen_z_cohort_size",
+        "crm_data",
+        "SELECT COUNT(*) AS gen_z_visits FROM {table} WHERE is_gen_z = TRUE",
+    ),
+    (
+        "gen_z_breakfast_app_q1",
+        "crm_data",
+        "SELECT COUNT(*) AS visits, AVG(spend) AS avg_spend FROM {table} "
+        "WHERE is_gen_z = TRUE AND visit_daypart = 'breakfast' AND time_period = '2025-Q1' AND channel = 'app'",
+    ),
+    (
+        "gen_z_breakfast_q1_by_segment",
+        "crm_data",
+        "SELECT segment_id, COUNT(*) AS visits FROM {table} "
+        "WHERE is_gen_z = TRUE AND visit_daypart = 'breakfast' AND time_period = '2025-Q1' "
+        "GROUP BY segment_id ORDER BY visits DESC",
+    ),
+    (
+        "gen_z_visits_january",
+        "crm_data",
+        "SELECT COUNT(*) AS visits FROM {table} "
+        "WHERE is_gen_z = TRUE AND visit_date >= '2025-01-01' AND visit_date < '2025-02-01'",
+    ),
+    (
+        "gen_z_time_boxed_redemptions_q1",
+        "redemption_logs",
+        "SELECT offer_type, SUM(redemption_value) AS total_value FROM {table} "
+        "WHERE is_gen_z = TRUE AND is_time_boxed = TRUE AND time_period = '2025-Q1' GROUP BY offer_type",
+    ),
+    (
+        "gen_z_breakfast_reviews_q1",
+        "feedback_data",
+        "SELECT feedback_id, review_text, sentiment_score FROM {table} "
+        "WHERE is_gen_z = TRUE AND time_period = '2025-Q1' AND daypart = 'breakfast' "
+        "ORDER BY sentiment_score DESC LIMIT 100",
+    ),
+]
+
+# Natural-language template queries with typical filters
+TEMPLATE_QUERIES = [
+    ("cohort_comparison", {"time_period": "2025-Q1", "daypart": "breakfast"}),
+    ("daypart_breakdown", {"time_period": "2025-Q1", "is_gen_z": True}),
+    ("offer_lift_by_channel", {"time_period": "2025-Q1", "is_gen_z": True, "offer_type": "App Exclusive"}),
+    ("feedback_sentiment", {"time_period": "2025-Q1", "is_gen_z": True, "daypart": "breakfast"}),
+]
+
+
+def bytes_processed(client: bigquery.Client, sql: str, query_parameters=None) -> int:
+    """Run a query without the BigQuery cache and return the actual bytes processed"""
+    job_config = bigquery.QueryJobConfig(use_query_cache=False, query_parameters=query_parameters or [])
+    job = client.query(sql, job_config=job_config)
+    job.result()
+    return job.total_bytes_processed or 0
+
+
+def create_baseline(client: bigquery.Client, table_id: str) -> str:
+    """Copy a table without partitioning or clustering; the copy expires after an hour"""
+    baseline_id = f"{table_id}{BASELINE_SUFFIX}"
+    client.query(
+        f"CREATE OR REPLACE TABLE `{baseline_id}` "
+        "OPTIONS(expiration_timestamp=TIMESTAMP_ADD(CURRENT_TIMESTAMP(), INTERVAL 1 HOUR)) "
+        f"AS SELECT * FROM `{table_id}`"
+    ).result()
+    return baseline_id
+
+
+def main():
+    project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+    dataset_id = sys.argv[1] if len(sys.argv) > 1 else os.getenv("BIGQUERY_DATASET", "wendys_hackathon_data")
+    if not project_id:
+        print("Error: GOOGLE_CLOUD_PROJECT is not set")
+        return 1
+
+    client = get_bigquery_client(project_id)
+    tables = {name for _, name, _ in STANDARD_QUERIES}
+    tables.update(QUERY_TEMPLATES[name]["table"] for name, _ in TEMPLATE_QUERIES)
+
+    print("=" * 80)
+    print("Table layout benchmark (bytes processed per query)")
+    print("=" * 80)
+    print(f"Project: {project_id}")
+    print(f"Dataset: {dataset_id}")
+    print()
+
+    baselines = {}
+    for table_name in sorted(tables):
+        config = TABLE_CONFIGS[table_name]
+        table_id = f"{project_id}.{dataset_id}.{table_name}"
+        table = client.get_table(table_id)
+        if not table_layout_matches(table, build_time_partitioning(config), config.get("clustering_fields")):
+            print(f"⚠ {table_name} does not have the configured layout yet; run bigquery_loader.py --migrate")
+        print(f"Creating unpartitioned baseline for {table_name} ({table.num_rows:,} rows)...")
+        baselines[table_name] = create_baseline(client, table_id)
+    print()
+
+    queries = [
+        (name, table_name, sql.format(table="`{table_id}`"), [])
+        for name, table_name, sql in STANDARD_QUERIES
+    ]
+    for template_name, params in TEMPLATE_QUERIES:
+        table_name = QUERY_TEMPLATES[template_name]["table"]
+        sql, query_parameters = render_template(template_name, project_id, dataset_id, params)
+        sql = sql.replace(f"`{project_id}.{dataset_id}.{table_name}`", "`{table_id}`")
+        queries.append((f"template:{template_name}", table_name, sql, query_parameters))
+
+    print(f"{'query':<36} | {'before':>11} | {'after':>11} | {'reduction':>9}")
+    print("-" * 80)
+    total_before = 0
+    total_after = 0
+    try:
+        for name, table_name, sql, query_parameters in queries:
+            before = bytes_processed(client, sql.replace("{table_id}", baselines[table_name]), query_parameters)
+            after = bytes_processed(
+                client, sql.replace("{table_id}", f"{project_id}.{dataset_id}.{table_name}"), query_parameters
+            )
+            total_before += before
+            total_after += after
+            reduction = 1 - after / before if before else 0.0
+            print(f"{name:<36} | {format_bytes(before):>11} | {format_bytes(after):>11} | {reduction:>8.0%}")
+    finally:
+        for baseline_id in baselines.values():
+            client.delete_table(baseline_id, not_found_ok=True)
+
+    print("-" * 80)
+    reduction = 1 - total_after / total_before if total_before else 0.0
+    print(f"{'total':<36} | {format_bytes(total_before):>11} | {format_bytes(total_after):>11} | {reduction:>8.0%}")
+    print()
+    print("before: unpartitioned, unclustered copy of the table")
+    print("after:  table with the partitioning and clustering from TABLE_CONFIGS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
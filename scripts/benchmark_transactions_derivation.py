@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark customer_transactions_raw derivation: the legacy per-row version
+(pick_offer via apply, random.choice/random.sample per row, per-row daypart and
+quarter functions) against the vectorized generate_customer_transactions_raw.
+
+Input crm_data and redemption_logs are generated with the numpy engine at
+roughly the requested number of transactions (one per visit). The legacy
+version is only run up to LEGACY_MAX_ROWS (override with --legacy).
+
+With --compare, both versions derive the same 100k-row input and the total
+variation distance of each derived column's distribution is printed
+(0 = identical, sampling noise is ~0.01).
+
+Usage:
+    python scripts/benchmark_transactions_derivation.py
+    python scripts/benchmark_transactions_derivation.py 100000 10000000 --compare
+    python scripts/benchmark_transactions_derivation.py 1000000 --legacy
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path to import from src
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import numpy as np
+import pandas as pd
+
+from src.customer_insights.data.synthetic_data_generator import (
+    MENU_ITEMS,
+    OFFER_TYPES,
+    PAYMENT_METHODS,
+    determine_daypart_from_hour,
+    generate_customer_transactions_raw,
+    get_quarter_label,
+)
+from src.customer_insights.data.vectorized_generator import generate_crm_frame, generate_redemption_frame
+
+DEFAULT_SIZES = [100_000, 1_000_000, 10_000_000]
+SEED = 42
+LEGACY_MAX_ROWS = 1_000_000
+COMPARE_ROWS = 100_000
+
+# Average crm_data visits per customer and redemptions per customer, as in export_to_dataframes
+VISITS_PER_CUSTOMER = 120
+REDEMPTIONS_PER_CUSTOMER = 5500 / 1200
+
+COMPARE_COLUMNS = ["redeemed_offer", "offer_type", "payment_method", "item_count", "visit_daypart", "time_period"]
+
+
+def legacy_transactions_raw(crm_df: pd.DataFrame, redemption_df: pd.DataFrame) -> pd.DataFrame:
+    """The per-row derivation generate_customer_transactions_raw used before vectorization"""
+    transactions_df = crm_df.copy()
+    transactions_df["transaction_date"] = pd.to_datetime(transactions_df["visit_date"])
+    transactions_df["transaction_id"] = [f"txn_{i+1:07d}" for i in range(len(transactions_df))]
+    transactions_df["total_spend"] = transactions_df["spend"]
+
+    offers_by_customer = redemption_df.groupby("customer_id")["offer_type"].apply(list).to_dict()
+
+    def pick_offer(customer_id: str) -> str:
+        offers = offers_by_customer.get(customer_id)
+        if offers and random.random() < 0.65:
+            return random.choice(offers)
+        if random.random() < 0.25:
+            return random.choice(OFFER_TYPES)
+        return None
+
+    transactions_df["redeemed_offer"] = transactions_df["customer_id"].apply(pick_offer)
+    transactions_df["offer_type"] = transactions_df["redeemed_offer"].fillna(
+        transactions_df["segment_id"].map(lambda _: random.choice(OFFER_TYPES))
+    )
+    transactions_df["payment_method"] = [random.choice(PAYMENT_METHODS) for _ in range(len(transactions_df))]
+    transactions_df["items"] = [
+        random.sample(MENU_ITEMS, k=random.randint(1, min(3, len(MENU_ITEMS))))
+        for _ in range(len(transactions_df))
+    ]
+    transactions_df["visit_daypart"] = transactions_df["transaction_date"].dt.hour.apply(determine_daypart_from_hour)
+    transactions_df["time_period"] = transactions_df["transaction_date"].apply(get_quarter_label)
+    return transactions_df
+
+
+def build_inputs(num_rows: int, seed: int):
+    """crm_data (trimmed to num_rows visits) and its customers' redemption_logs"""
+    rng = np.random.default_rng(seed)
+    num_customers = max(1, -(-num_rows // VISITS_PER_CUSTOMER))
+    crm_df, profiles = generate_crm_frame(num_customers, rng)
+    redemption_df = generate_redemption_frame(round(num_customers * REDEMPTIONS_PER_CUSTOMER), profiles, rng)
+    return crm_df.head(num_rows), redemption_df
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def total_variation(a: pd.Series, b: pd.Series) -> float:
+    """Total variation distance between the value distributions of two columns"""
+    pa = a.astype(str).value_counts(normalize=True)
+    pb = b.astype(str).value_counts(normalize=True)
+    return 0.5 * pa.sub(pb, fill_value=0).abs().sum()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:] if not arg.startswith("--")] or DEFAULT_SIZES
+    legacy_max_rows = max(sizes) if "--legacy" in sys.argv else LEGACY_MAX_ROWS
+    random.seed(SEED)
+
+    print("=" * 72)
+    print("customer_transactions_raw derivation benchmark")
+    print("=" * 72)
+    print(f"{'rows':>12} | {'version':<10} | {'seconds':>9} | {'rows/s':>12} | {'speedup':>7}")
+    print("-" * 72)
+    for num_rows in sizes:
+        crm_df, redemption_df = build_inputs(num_rows, SEED)
+        legacy_seconds = None
+        if num_rows <= legacy_max_rows:
+            legacy_seconds, _ = timed(legacy_transactions_raw, crm_df, redemption_df)
+            print(
+                f"{len(crm_df):>12,} | {'legacy':<10} | {legacy_seconds:>9.2f} | "
+                f"{len(crm_df) / legacy_seconds:>12,.0f} | {'':>7}"
+            )
+        else:
+            print(f"{len(crm_df):>12,} | {'legacy':<10} | {'skipped (pass --legacy)':>36}")
+        vectorized_seconds, _ = timed(
+            generate_customer_transactions_raw, crm_df, redemption_df, 0, np.random.default_rng(SEED)
+        )
+        speedup = f"{legacy_seconds / vectorized_seconds:.1f}x" if legacy_seconds else ""
+        print(
+            f"{len(crm_df):>12,} | {'vectorized':<10} | {vectorized_seconds:>9.2f} | "
+            f"{len(crm_df) / vectorized_seconds:>12,.0f} | {speedup:>7}"
+        )
+
+    if "--compare" in sys.argv:
+        print()
+        print(f"Distribution check at {COMPARE_ROWS:,} rows (total variation distance, legacy vs vectorized)")
+        print("-" * 72)
+        crm_df, redemption_df = build_inputs(COMPARE_ROWS, SEED)
+        legacy = legacy_transactions_raw(crm_df, redemption_df)
+        vectorized = generate_customer_transactions_raw(crm_df, redemption_df, rng=np.random.default_rng(SEED))
+        legacy["item_count"] = legacy["items"].map(len)
+        vectorized["item_count"] = vectorized["items"].list.len()
+        for column in COMPARE_COLUMNS:
+            print(f"{column:<40} {total_variation(legacy[column], vectorized[column]):.3f}")
+        legacy_items = pd.Series([item for items in legacy["items"] for item in items])
+        vectorized_items = pd.Series(vectorized["items"].explode().to_numpy(dtype=object))
+        print(f"{'items (flattened)':<40} {total_variation(legacy_items, vectorized_items):.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
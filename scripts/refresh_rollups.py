@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Refresh the precomputed cohort rollup tables (see src/customer_insights/data/rollups.py).
+
+Only months whose source partitions changed since the last refresh are
+re-aggregated. Schedule this after any load into crm_data or redemption_logs;
+until it runs, the query tools fall back to the source tables.
+
+Usage:
+    python scripts/refresh_rollups.py
+    python scripts/refresh_rollups.py --full
+    python scripts/refresh_rollups.py <dataset-id> [--full]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path to import from src
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# Load environment variables from .env file
+from src.utils.env_loader import load_env
+load_env()
+
+from src.customer_insights.data.bigquery_client import get_bigquery_client
+from src.customer_insights.data.rollups import refresh_all_rollups
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    full_refresh = "--full" in sys.argv
+    project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+    dataset_id = args[0] if args else os.getenv("BIGQUERY_DATASET", "wendys_hackathon_data")
+    if not project_id:
+        print("Error: GOOGLE_CLOUD_PROJECT is not set")
+        return 1
+
+    print("=" * 80)
+    print("Refreshing cohort rollup tables")
+    print("=" * 80)
+    print(f"Project: {project_id}")
+    print(f"Dataset: {dataset_id}")
+    print(f"Mode: {'full rebuild' if full_refresh else 'incremental'}")
+    print()
+
+    start = time.perf_counter()
+    client = get_bigquery_client(project_id)
+    refresh_all_rollups(client, project_id, dataset_id, full_refresh=full_refresh)
+    print(f"\nDone in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,20 +11,22 @@ load_env()
 
 from google.adk.agents.sequential_agent import SequentialAgent
 
-from .sub_agents.competitor_analysis.agent import competitor_analysis_agent
+from utils.model_cache import install_model_cache
+
 from .sub_agents.research_orchestrator.agent import research_orchestrator_agent
 from .sub_agents.target_identification.agent import target_identification_agent
 from .sub_agents.whitespace_synthesizer.agent import whitespace_synthesizer_agent
 
 # The Competitor Intelligence Manager is a SequentialAgent that follows a clear
 # research process. Participants can modify this workflow by changing the order
-# or adding new analytical steps.
+# or adding new analytical steps. The research orchestrator runs one
+# CompetitorAnalysisAgent per identified competitor concurrently, so this stage
+# takes as long as the slowest competitor rather than the sum of all of them.
 competitor_intel_manager_agent = SequentialAgent(
     name="CompetitorIntelAgent",
     sub_agents=[
         target_identification_agent,
         research_orchestrator_agent,
-        competitor_analysis_agent,
         whitespace_synthesizer_agent,
     ],
     description=(
@@ -36,3 +38,5 @@ competitor_intel_manager_agent = SequentialAgent(
 
 root_agent = competitor_intel_manager_agent
 
+# Opt-in model response cache (LLM_RESPONSE_CACHE_ENABLED); see utils/model_cache.py
+install_model_cache(root_agent)
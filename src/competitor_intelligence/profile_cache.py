@@ -0,0 +1,204 @@
+"""Persistent cache of structured competitor profiles
+
+Competitor promotions change weekly, not per request, yet every Competitor
+Intelligence run used to research the same rivals from scratch. This store
+keeps each competitor's profile in SQLite as separate fields, each stamped
+with when it was researched and judged against its own max age (promotions
+and pricing go stale after a week, brand details after a quarter).
+ResearchOrchestratorAgent serves competitors whose fields are all fresh from
+here and re-researches only the stale or missing ones.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Profile field -> days before a cached value must be researched again
+DEFAULT_FIELD_MAX_AGE_DAYS = {
+    "brand": 90,
+    "promotions": 7,
+    "pricing": 7,
+    "loyalty_program": 30,
+    "target_audience": 30,
+    "channels": 30,
+    "performance_metrics": 14,
+    "innovations": 14,
+}
+PROFILE_FIELDS = tuple(DEFAULT_FIELD_MAX_AGE_DAYS)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / ".cache" / "competitor_profiles.sqlite3"
+
+# Values the model writes for fields it could not research; never cached, so they stay stale
+PLACEHOLDER_VALUES = {"", "not found", "n/a", "na", "none", "unknown", "not available"}
+
+_JSON_OBJECT_PATTERN = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+
+def competitor_key(name: str) -> str:
+    """Case- and punctuation-insensitive key, so "McDonald's" and "Mcdonalds" share an entry"""
+    return re.sub(r"[^a-z0-9]+", "", name.lower())
+
+
+def is_placeholder(value: Any) -> bool:
+    """Whether a profile value is missing, empty or a placeholder (Not found, N/A, ...)"""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip().rstrip(".").lower() in PLACEHOLDER_VALUES
+    if isinstance(value, (list, dict)):
+        return all(is_placeholder(item) for item in (value.values() if isinstance(value, dict) else value))
+    return False
+
+
+def parse_profile_fields(text: str) -> Dict[str, Any]:
+    """Researched profile fields from the last fenced COMPETITOR_PROFILE JSON object in ``text``"""
+    for candidate in reversed(_JSON_OBJECT_PATTERN.findall(text or "")):
+        try:
+            parsed = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            fields = {field: parsed[field] for field in PROFILE_FIELDS if not is_placeholder(parsed.get(field))}
+            if fields:
+                return fields
+    return {}
+
+
+def render_profile(name: str, fields: Dict[str, Any]) -> str:
+    """Readable profile for the competitive landscape, one line per field"""
+    lines = [f"Brand information: {name}"]
+    for field in PROFILE_FIELDS:
+        if field not in fields:
+            continue
+        value = fields[field]
+        if not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False)
+        lines.append(f"- {field.replace('_', ' ').capitalize()}: {value}")
+    return "\n".join(lines)
+
+
+class CompetitorProfileCache:
+    """
+    Thread-safe SQLite store of competitor profile fields.
+
+    One row per (competitor, field) holds the JSON value and the time it was
+    researched, so a refresh of the weekly fields leaves the slower-moving
+    ones (and their timestamps) untouched.
+    """
+
+    def __init__(self, path: str = str(DEFAULT_CACHE_PATH), max_age_days: Optional[Dict[str, float]] = None):
+        self.path = path
+        self.max_age_days = {**DEFAULT_FIELD_MAX_AGE_DAYS, **(max_age_days or {})}
+        self._lock = threading.Lock()
+        self._stats = {"fresh": 0, "partial": 0, "missing": 0, "fields_written": 0}
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS competitor_profile_fields ("
+                " competitor_key TEXT NOT NULL,"
+                " competitor_name TEXT NOT NULL,"
+                " field TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (competitor_key, field))"
+            )
+
+    def get(self, name: str) -> Dict[str, Dict[str, Any]]:
+        """Field -> {"value", "updated_at", "stale"} for every cached field of a competitor"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT field, value, updated_at FROM competitor_profile_fields WHERE competitor_key = ?",
+                (competitor_key(name),),
+            ).fetchall()
+        now = time.time()
+        entries = {}
+        for field, value, updated_at in rows:
+            if field not in self.max_age_days:
+                continue
+            value = json.loads(value)
+            entries[field] = {
+                "value": value,
+                "updated_at": updated_at,
+                # Placeholders cached before they were filtered out are researched again too
+                "stale": self._is_stale(field, updated_at, now) or is_placeholder(value),
+            }
+        return entries
+
+    def fresh_fields(self, name: str) -> Dict[str, Any]:
+        """Field -> value for the cached fields still within their max age"""
+        return {field: entry["value"] for field, entry in self.get(name).items() if not entry["stale"]}
+
+    def stale_fields(self, name: str) -> List[str]:
+        """Profile fields that are missing or past their max age, in PROFILE_FIELDS order"""
+        fresh = self.fresh_fields(name)
+        stale = [field for field in PROFILE_FIELDS if field not in fresh]
+        with self._lock:
+            if not stale:
+                self._stats["fresh"] += 1
+            elif len(stale) < len(PROFILE_FIELDS):
+                self._stats["partial"] += 1
+            else:
+                self._stats["missing"] += 1
+        return stale
+
+    def put(self, name: str, fields: Dict[str, Any], updated_at: Optional[float] = None) -> int:
+        """Upsert the given profile fields (unknown fields and placeholders are ignored); returns how many were written"""
+        updated_at = time.time() if updated_at is None else updated_at
+        rows = [
+            (competitor_key(name), name, field, json.dumps(value, ensure_ascii=False), updated_at)
+            for field, value in fields.items()
+            if field in self.max_age_days and not is_placeholder(value)
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO competitor_profile_fields (competitor_key, competitor_name, field, value, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (competitor_key, field) DO UPDATE SET"
+                " competitor_name = excluded.competitor_name,"
+                " value = excluded.value,"
+                " updated_at = excluded.updated_at",
+                rows,
+            )
+            self._stats["fields_written"] += len(rows)
+        return len(rows)
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM competitor_profile_fields")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            competitors = self._connection.execute(
+                "SELECT COUNT(DISTINCT competitor_key) FROM competitor_profile_fields"
+            ).fetchone()[0]
+            return {**self._stats, "competitors": competitors, "path": self.path}
+
+    def _is_stale(self, field: str, updated_at: float, now: float) -> bool:
+        return now - updated_at > self.max_age_days[field] * 86400
+
+
+_profile_cache: Optional[CompetitorProfileCache] = None
+_profile_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> Optional[CompetitorProfileCache]:
+    """Get the shared profile cache, or None when COMPETITOR_PROFILE_CACHE_ENABLED is off"""
+    global _profile_cache
+    if os.getenv("COMPETITOR_PROFILE_CACHE_ENABLED", "true").lower() in {"0", "false", "no"}:
+        return None
+    if _profile_cache is None:
+        with _profile_cache_lock:
+            if _profile_cache is None:
+                # e.g. COMPETITOR_PROFILE_MAX_AGE_DAYS='{"promotions": 3}' to refresh promotions more often
+                max_age_days = json.loads(os.getenv("COMPETITOR_PROFILE_MAX_AGE_DAYS", "{}"))
+                _profile_cache = CompetitorProfileCache(
+                    path=os.getenv("COMPETITOR_PROFILE_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+                    max_age_days=max_age_days,
+                )
+    return _profile_cache
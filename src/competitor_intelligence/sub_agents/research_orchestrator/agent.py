@@ -1,16 +1,231 @@
 """Research Orchestrator Agent - The Team Lead (Parallel Orchestrator)"""
-from google.adk.agents.llm_agent import LlmAgent
-from utils.instruction_loader import load_instruction_from_file
-from competitor_intelligence.tools.agent_tools import competitor_analysis_tool
+import asyncio
+import json
 import os
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
-research_orchestrator_agent = LlmAgent(
-    name="ResearchOrchestratorAgent",
-    model=os.getenv("GEN_ADVANCED_MODEL", "gemini-2.5-pro"),
-    instruction=load_instruction_from_file(
-        "competitor_intelligence/sub_agents/research_orchestrator/instruction.txt"
-    ),
-    description="Manages parallel research of all identified competitors by orchestrating multiple CompetitorAnalysisAgent calls.",
-    tools=[competitor_analysis_tool],  # AgentTool to call CompetitorAnalysisAgent
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.genai import types
+
+from competitor_intelligence.profile_cache import (
+    PROFILE_FIELDS,
+    get_profile_cache,
+    parse_profile_fields,
+    render_profile,
 )
+# Relative, so the app loaded as competitor_intelligence and the copy imported through
+# src.competitor_intelligence (marketing orchestrator) each parent their own template
+from ..competitor_analysis.agent import competitor_analysis_agent
+
+# Most CompetitorAnalysisAgent runs in flight at once (each is a gemini-2.5-pro + google_search session)
+MAX_CONCURRENT_COMPETITORS = int(os.getenv("COMPETITOR_RESEARCH_CONCURRENCY", "4"))
+# Most competitors researched per run; TargetIdentificationAgent is asked for 5-7
+MAX_COMPETITORS = int(os.getenv("COMPETITOR_RESEARCH_MAX_TARGETS", "7"))
+# Stands in for the target list when it cannot be parsed; never cached
+FALLBACK_TARGET_NAME = "All identified competitors"
+
+_JSON_BLOCK_PATTERN = re.compile(r"```(?:json)?\s*(\[.*?\])\s*```", re.DOTALL)
+
+
+def parse_competitor_list(text: str) -> List[Dict[str, Any]]:
+    """
+    Extract the COMPETITOR_LIST JSON array from TargetIdentificationAgent's output.
+
+    Accepts a fenced or bare array of objects with at least a ``name`` (or of
+    plain brand names); repeated names are dropped. Returns an empty list when
+    no array can be parsed.
+    """
+    candidates = _JSON_BLOCK_PATTERN.findall(text or "")
+    start, end = (text or "").find("["), (text or "").rfind("]")
+    if start != -1 and end > start:
+        candidates.append(text[start : end + 1])
+    for candidate in reversed(candidates):
+        try:
+            parsed = json.loads(candidate)
+        except ValueError:
+            continue
+        if not isinstance(parsed, list):
+            continue
+        competitors: Dict[str, Dict[str, Any]] = {}
+        for item in parsed:
+            if isinstance(item, str) and item.strip():
+                competitors.setdefault(item.strip(), {"name": item.strip()})
+            elif isinstance(item, dict) and str(item.get("name") or "").strip():
+                name = str(item["name"]).strip()
+                competitors.setdefault(name, {**item, "name": name})
+        if competitors:
+            return list(competitors.values())
+    return []
+
+
+def _agent_name(competitor_name: str) -> str:
+    slug = re.sub(r"\W+", "_", competitor_name).strip("_") or "competitor"
+    return f"{competitor_analysis_agent.name}_{slug}"
+
+
+def _target_instruction(competitor: Dict[str, Any], fresh_fields: Dict[str, Any], stale_fields: List[str]) -> str:
+    lines = [f"- {key.replace('_', ' ').capitalize()}: {value}" for key, value in competitor.items() if value]
+    instruction = (
+        f"{competitor_analysis_agent.instruction}\n\n"
+        "Your Target For This Run:\n" + "\n".join(lines) + "\n"
+        "Research only this competitor."
+    )
+    if fresh_fields:
+        # Only the stale fields need new searches; the rest were researched recently
+        instruction += (
+            "\n\nAlready researched recently (do not search for these again):\n"
+            + render_profile(competitor["name"], fresh_fields)
+            + "\n\nResearch only these profile fields: " + ", ".join(stale_fields)
+        )
+    return instruction
+
 
+class ResearchOrchestratorAgent(BaseAgent):
+    """
+    Fans CompetitorAnalysisAgent out over every identified competitor.
+
+    Reads the competitor list TargetIdentificationAgent saved to session state,
+    runs one copy of CompetitorAnalysisAgent per competitor (at most
+    max_concurrency at once, each on its own branch), and saves the profiles
+    under ``competitor_profiles`` and the compiled ``competitive_landscape`` for
+    WhitespaceSynthesizerAgent. Competitors whose profile is fresh in the
+    profile cache (see profile_cache.py) are not researched again; partly
+    stale ones are researched for their stale fields only.
+    """
+
+    targets_key: str = "competitor_targets"
+    max_concurrency: int = MAX_CONCURRENT_COMPETITORS
+    max_competitors: int = MAX_COMPETITORS
+    use_profile_cache: bool = True
+
+    def _analysis_agent(
+        self, competitor: Dict[str, Any], fresh_fields: Dict[str, Any], stale_fields: List[str]
+    ) -> LlmAgent:
+        return competitor_analysis_agent.model_copy(
+            update={
+                "name": _agent_name(competitor["name"]),
+                "instruction": _target_instruction(competitor, fresh_fields, stale_fields),
+                "parent_agent": None,
+            }
+        )
+
+    def _branch_context(self, agent: BaseAgent, ctx: InvocationContext) -> InvocationContext:
+        # Same branch naming as ParallelAgent, so the copies keep separate histories
+        branch_ctx = ctx.model_copy()
+        branch_suffix = f"{self.name}.{agent.name}"
+        branch_ctx.branch = f"{ctx.branch}.{branch_suffix}" if ctx.branch else branch_suffix
+        return branch_ctx
+
+    async def _research(
+        self,
+        competitor: Dict[str, Any],
+        fresh_fields: Dict[str, Any],
+        stale_fields: List[str],
+        ctx: InvocationContext,
+        semaphore: asyncio.Semaphore,
+        queue: "asyncio.Queue[Tuple[str, Optional[Event], Any]]",
+    ) -> None:
+        name = competitor["name"]
+        agent = self._analysis_agent(competitor, fresh_fields, stale_fields)
+        profile = ""
+        async with semaphore:
+            try:
+                async for event in agent.run_async(self._branch_context(agent, ctx)):
+                    if event.is_final_response() and event.content and event.content.parts:
+                        text = "".join(part.text or "" for part in event.content.parts).strip()
+                        profile = text or profile
+                    # Wait until the runner has applied this event before continuing
+                    processed = asyncio.Event()
+                    await queue.put((name, event, processed))
+                    await processed.wait()
+            except Exception as e:
+                await queue.put((name, None, f"Research failed: {e}"))
+                return
+
+        cache = get_profile_cache() if self.use_profile_cache else None
+        if cache is not None and name != FALLBACK_TARGET_NAME:
+            # Only the requested fields are stored, so fresh fields keep their original timestamps
+            researched = parse_profile_fields(profile)
+            cache.put(name, {field: researched[field] for field in stale_fields if field in researched})
+        if fresh_fields:
+            profile = f"{profile}\n\n(Cached, still fresh)\n{render_profile(name, fresh_fields)}"
+        await queue.put((name, None, profile or "Not found"))
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        competitors = parse_competitor_list(str(ctx.session.state.get(self.targets_key, "")))
+        if not competitors:
+            # Fall back to a single run over the whole target list, as the previous LLM orchestrator did
+            competitors = [{"name": FALLBACK_TARGET_NAME, "targets": ctx.session.state.get(self.targets_key, "")}]
+        competitors = competitors[: self.max_competitors]
+
+        # Competitors whose cached fields are all fresh are served without an LLM or search call
+        cache = get_profile_cache() if self.use_profile_cache else None
+        profiles: Dict[str, str] = {}
+        to_research = []
+        for competitor in competitors:
+            name = competitor["name"]
+            if cache is None or name == FALLBACK_TARGET_NAME:
+                to_research.append((competitor, {}, list(PROFILE_FIELDS)))
+                continue
+            stale_fields = cache.stale_fields(name)
+            fresh_fields = cache.fresh_fields(name)
+            if stale_fields:
+                to_research.append((competitor, fresh_fields, stale_fields))
+            else:
+                profiles[name] = f"{render_profile(name, fresh_fields)}\n(Cached, still fresh)"
+        served_from_cache = list(profiles)
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        queue: "asyncio.Queue[Tuple[str, Optional[Event], Any]]" = asyncio.Queue()
+        tasks = [
+            asyncio.create_task(self._research(competitor, fresh_fields, stale_fields, ctx, semaphore, queue))
+            for competitor, fresh_fields, stale_fields in to_research
+        ]
+        try:
+            while len(profiles) < len(competitors):
+                name, event, detail = await queue.get()
+                if event is None:
+                    profiles[name] = detail
+                    continue
+                yield event
+                detail.set()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Profiles in the order TargetIdentificationAgent listed the competitors
+        ordered = {competitor["name"]: profiles[competitor["name"]] for competitor in competitors}
+        sections = [f"### {name}\n{profile}" for name, profile in ordered.items()]
+        landscape = (
+            "COMPETITIVE_LANDSCAPE:\n\n" + "\n\n".join(sections)
+            + f"\n\nSUMMARY:\n- Total Competitors Analyzed: {len(ordered)}"
+        )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=landscape)]),
+            actions=EventActions(
+                state_delta={
+                    "competitor_profiles": ordered,
+                    "competitive_landscape": landscape,
+                    "competitor_profile_cache": {
+                        "served_from_cache": served_from_cache,
+                        "researched": [competitor["name"] for competitor, _, _ in to_research],
+                    },
+                }
+            ),
+        )
+
+
+research_orchestrator_agent = ResearchOrchestratorAgent(
+    name="ResearchOrchestratorAgent",
+    # Never run directly: it is the template copied once per competitor
+    sub_agents=[competitor_analysis_agent],
+    description="Manages parallel research of all identified competitors by running one CompetitorAnalysisAgent per competitor concurrently.",
+)
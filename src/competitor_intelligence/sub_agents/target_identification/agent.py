@@ -16,5 +16,6 @@ target_identification_agent = LlmAgent(
     ),
     description="Identifies competitors and their digital assets to be analyzed for competitive intelligence.",
     tools=get_target_identification_tools(),
+    output_key="competitor_targets",  # Read by ResearchOrchestratorAgent
 )
 
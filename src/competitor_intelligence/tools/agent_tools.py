@@ -3,7 +3,8 @@ from google.adk.tools import AgentTool
 from competitor_intelligence.sub_agents.competitor_analysis.agent import competitor_analysis_agent
 
 # Create AgentTool to wrap CompetitorAnalysisAgent
-# This allows ResearchOrchestratorAgent to invoke it multiple times (once per competitor)
+# This lets an LlmAgent research a competitor on demand; the pipeline itself fans
+# CompetitorAnalysisAgent out per competitor in ResearchOrchestratorAgent
 competitor_analysis_tool = AgentTool(agent=competitor_analysis_agent)
 
 # Export all agent tools for use in orchestrator agent
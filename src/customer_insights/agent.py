@@ -3,34 +3,46 @@ This module defines the root agent for the Customer Insights team.
 
 This agent's primary responsibility is to extract and synthesize insights from
 Wendy's internal data sources, which are mocked using a BigQuery database.
-It uses a ParallelAgent to conduct different types of analysis simultaneously,
-making the research process more efficient.
+It uses a DagAgent to schedule the analyses by their data dependencies:
+behavioral and sentiment analysis run simultaneously, and profile synthesis
+starts as soon as both have saved their output to session state.
 """
 # Load environment variables from .env file (must be imported early)
 from utils.env_loader import load_env
 load_env()
 
-from google.adk.agents.parallel_agent import ParallelAgent
+from utils.dag_agent import DagAgent
+from utils.model_cache import install_model_cache
 
 from .sub_agents.behavioral_analysis.agent import behavioral_analysis_agent
 from .sub_agents.profile_synthesizer.agent import profile_synthesizer_agent
 from .sub_agents.sentiment_analysis.agent import sentiment_analysis_agent
 
-# The Customer Insights Manager is a ParallelAgent. This means it runs all the
-# specified sub-agents (behavioral_analysis, profile_synthesizer, etc.) at the
-# same time. This is useful for running independent analyses concurrently.
-customer_insights_manager_agent = ParallelAgent(
+# The Customer Insights Manager is a DagAgent. It starts each sub-agent as soon
+# as the session state keys it reads exist: behavioral_analysis and
+# sentiment_analysis have no inputs and run at the same time, and
+# profile_synthesizer starts once both have written their output_key.
+customer_insights_manager_agent = DagAgent(
     name="CustomerInsightsAgent",
     sub_agents=[
         behavioral_analysis_agent,
         profile_synthesizer_agent,
         sentiment_analysis_agent,
     ],
+    inputs={
+        profile_synthesizer_agent.name: [
+            behavioral_analysis_agent.output_key,
+            sentiment_analysis_agent.output_key,
+        ],
+    },
     description=(
         "An agent that analyzes customer data to uncover behavioral patterns,"
         " synthesize customer profiles, and perform sentiment analysis. It runs"
-        " multiple analyses in parallel to generate comprehensive insights."
+        " the two analyses in parallel and synthesizes profiles once both finish."
     ),
 )
 
-root_agent = customer_insights_manager_agent
\ No newline at end of file
+root_agent = customer_insights_manager_agent
+
+# Opt-in model response cache (LLM_RESPONSE_CACHE_ENABLED); see utils/model_cache.py
+install_model_cache(root_agent)
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""Shared BigQuery client factory for Customer Insights tools and loaders
+
+Every tool invocation used to build a brand-new ``bigquery.Client`` (and re-read
+the service account JSON). This module keeps one lazily created client per
+(project, credentials) pair for the whole process, backed by a pooled HTTP
+transport so connections and OAuth tokens are reused across agent turns.
+
+Usage:
+    from customer_insights.data.bigquery_client import get_bigquery_client
+    client = get_bigquery_client()
+"""
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import bigquery
+from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
+
+BIGQUERY_SCOPES = (
+    "https://www.googleapis.com/auth/bigquery",
+    "https://www.googleapis.com/auth/cloud-platform",
+)
+
+# Size of the per-client HTTP connection pool. ParallelAgent runs several
+# sub-agents at once, so keep enough connections for concurrent tool calls.
+HTTP_POOL_MAXSIZE = int(os.getenv("BIGQUERY_HTTP_POOL_SIZE", "32"))
+
+ClientKey = Tuple[Optional[str], Optional[str]]
+
+_lock = threading.Lock()
+_clients: Dict[ClientKey, bigquery.Client] = {}
+_sessions: Dict[ClientKey, AuthorizedSession] = {}
+_bqstorage_clients: Dict[int, Any] = {}
+_counters = {
+    "clients_created": 0,
+    "client_requests": 0,
+    "bqstorage_clients_created": 0,
+}
+
+
+def _resolve_key(project_id: Optional[str], credentials_path: Optional[str]) -> ClientKey:
+    """Resolve the (project, credentials) cache key from arguments or environment"""
+    if project_id is None:
+        project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+    if credentials_path is None:
+        credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    return project_id or None, credentials_path or None
+
+
+def _load_credentials(credentials_path: Optional[str]) -> Tuple[Any, Optional[str]]:
+    """Load service account credentials, or Application Default Credentials"""
+    if credentials_path:
+        credentials = service_account.Credentials.from_service_account_file(
+            credentials_path, scopes=BIGQUERY_SCOPES
+        )
+        return credentials, credentials.project_id
+    return google.auth.default(scopes=BIGQUERY_SCOPES)
+
+
+def _build_http_session(credentials: Any) -> AuthorizedSession:
+    """Create an authorized HTTP session with a pooled transport"""
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_bigquery_client(
+    project_id: Optional[str] = None,
+    credentials_path: Optional[str] = None,
+) -> bigquery.Client:
+    """
+    Get the shared BigQuery client for a project and credentials file.
+
+    Clients are created lazily on first use and then reused by every caller in
+    the process. Creation is guarded by a lock so concurrent sub-agents never
+    build duplicate clients.
+
+    Args:
+        project_id: GCP project ID. Defaults to GOOGLE_CLOUD_PROJECT.
+        credentials_path: Service account JSON path. Defaults to
+            GOOGLE_APPLICATION_CREDENTIALS; Application Default Credentials
+            are used when neither is set.
+
+    Returns:
+        A thread-safe ``bigquery.Client`` shared across tools.
+    """
+    key = _resolve_key(project_id, credentials_path)
+
+    client = _clients.get(key)
+    if client is not None:
+        with _lock:
+            _counters["client_requests"] += 1
+        return client
+
+    with _lock:
+        _counters["client_requests"] += 1
+        client = _clients.get(key)
+        if client is None:
+            project, path = key
+            credentials, default_project = _load_credentials(path)
+            session = _build_http_session(credentials)
+            client = bigquery.Client(
+                project=project or default_project,
+                credentials=credentials,
+                _http=session,
+            )
+            _clients[key] = client
+            _sessions[key] = session
+            _counters["clients_created"] += 1
+        return client
+
+
+def get_bqstorage_client(client: bigquery.Client) -> Optional[Any]:
+    """
+    Get the shared BigQuery Storage Read API client for fast Arrow downloads.
+
+    One read client is kept per shared BigQuery client and reuses its
+    credentials. Returns None when google-cloud-bigquery-storage is not
+    installed, in which case results are downloaded over the REST API instead.
+    """
+    try:
+        from google.cloud import bigquery_storage
+    except ImportError:
+        return None
+
+    key = id(client)
+    read_client = _bqstorage_clients.get(key)
+    if read_client is not None:
+        return read_client
+
+    with _lock:
+        read_client = _bqstorage_clients.get(key)
+        if read_client is None:
+            read_client = bigquery_storage.BigQueryReadClient(credentials=client._credentials)
+            _bqstorage_clients[key] = read_client
+            _counters["bqstorage_clients_created"] += 1
+        return read_client
+
+
+def get_client_pool_stats() -> Dict[str, Any]:
+    """
+    Report how many shared clients and HTTP connections currently exist.
+
+    Returns:
+        Dictionary containing:
+        - clients: Number of live shared clients
+        - clients_created: Clients created since start (or last reset)
+        - client_requests: Calls to get_bigquery_client
+        - bqstorage_clients: Number of live Storage Read API clients
+        - connection_pools: Open per-host urllib3 connection pools
+        - connections_opened: Connections opened across all pools
+        - connections_idle: Connections currently idle in the pools
+    """
+    with _lock:
+        sessions = list(_sessions.values())
+        stats: Dict[str, Any] = {
+            "clients": len(_clients),
+            "clients_created": _counters["clients_created"],
+            "client_requests": _counters["client_requests"],
+            "bqstorage_clients": len(_bqstorage_clients),
+        }
+
+    connection_pools = 0
+    connections_opened = 0
+    connections_idle = 0
+    for session in sessions:
+        for adapter in set(session.adapters.values()):
+            pool_manager = getattr(adapter, "poolmanager", None)
+            if pool_manager is None:
+                continue
+            pools = pool_manager.pools
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is None:
+                    continue
+                connection_pools += 1
+                connections_opened += getattr(pool, "num_connections", 0)
+                if pool.pool is not None:
+                    connections_idle += pool.pool.qsize()
+
+    stats.update(
+        {
+            "connection_pools": connection_pools,
+            "connections_opened": connections_opened,
+            "connections_idle": connections_idle,
+        }
+    )
+    return stats
+
+
+def reset_bigquery_clients() -> None:
+    """Close all shared clients and their HTTP sessions (e.g. after credentials change)"""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        for session in _sessions.values():
+            session.close()
+        _clients.clear()
+        _sessions.clear()
+        _bqstorage_clients.clear()
+        for counter in _counters:
+            _counters[counter] = 0
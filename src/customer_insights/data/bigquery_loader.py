@@ -9,10 +9,18 @@ from src.utils.env_loader import load_env
 load_env()
 
 from google.cloud import bigquery
-from google.cloud.exceptions import NotFound
+from google.cloud.exceptions import BadRequest, NotFound
+import io
+import json
+import time
 import pandas as pd
-from typing import Dict, Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Any, Dict, List, Optional, Tuple
+from .bigquery_client import get_bigquery_client
 from .bigquery_schemas import TABLE_CONFIGS
+from .rollups import refresh_all_rollups
+from .streaming_export import iter_table_chunks
 from .synthetic_data_generator import export_to_dataframes
 import os
 
@@ -34,6 +42,33 @@ def get_or_create_dataset(client: bigquery.Client, dataset_id: str, project_id:
         return dataset
 
 
+def build_time_partitioning(config: Dict[str, Any]) -> Optional[bigquery.TimePartitioning]:
+    """Build the TimePartitioning for a TABLE_CONFIGS entry (None if unpartitioned)"""
+    partitioning = config.get("time_partitioning")
+    if not partitioning:
+        return None
+    return bigquery.TimePartitioning(
+        type_=partitioning.get("type", bigquery.TimePartitioningType.DAY),
+        field=partitioning["field"],
+    )
+
+
+def table_layout_matches(
+    table: bigquery.Table,
+    time_partitioning: Optional[bigquery.TimePartitioning],
+    clustering_fields: Optional[List[str]],
+) -> bool:
+    """Whether an existing table already has the given partitioning and clustering"""
+    actual = table.time_partitioning
+    if (actual is None) != (time_partitioning is None):
+        return False
+    if actual is not None and (
+        actual.field != time_partitioning.field or actual.type_ != time_partitioning.type_
+    ):
+        return False
+    return (table.clustering_fields or None) == (clustering_fields or None)
+
+
 def create_table_if_not_exists(
     client: bigquery.Client,
     project_id: str,
@@ -41,18 +76,28 @@ def create_table_if_not_exists(
     table_name: str,
     schema: list,
     description: str = "",
+    time_partitioning: Optional[bigquery.TimePartitioning] = None,
+    clustering_fields: Optional[List[str]] = None,
 ) -> bigquery.Table:
-    """Create a BigQuery table if it doesn't exist"""
+    """Create a BigQuery table if it doesn't exist, with optional partitioning and clustering"""
     table_ref = bigquery.TableReference(
         bigquery.DatasetReference(project_id, dataset_id),
         table_name
     )
     table = bigquery.Table(table_ref, schema=schema)
+    table.time_partitioning = time_partitioning
+    table.clustering_fields = clustering_fields
     
     try:
         table = client.get_table(table_ref)
         print(f"Table {table_name} already exists.")
         
+        if not table_layout_matches(table, time_partitioning, clustering_fields):
+            print(
+                f"  Note: {table_name} is not partitioned/clustered as configured. "
+                "Run migrate_table_layout() (or bigquery_loader.py --migrate) to rebuild it."
+            )
+        
         # Option to delete and recreate (uncomment if needed)
         # print(f"Deleting existing table {table_name}...")
         # client.delete_table(table_ref)
@@ -68,134 +113,585 @@ def create_table_if_not_exists(
         return table
 
 
-def load_dataframe_to_bigquery(
+# Columns stored as ISO strings by the python engine, parsed before loading
+DATETIME_COLUMNS: Dict[str, List[str]] = {
+    "crm_data": ["visit_date"],
+    "customer_transactions_raw": ["transaction_date"],
+    "redemption_logs": ["redemption_date"],
+    "feedback_data": ["feedback_date"],
+    "customer_feedback_raw": ["feedback_date"],
+    "customer_segments": ["created_at"],
+}
+
+PARQUET_COMPRESSION = "zstd"
+
+# Incremental loads record each table's high-water mark here
+WATERMARK_STATE_TABLE = "_load_watermarks"
+STAGING_SUFFIX = "__incremental"
+
+
+def prepare_dataframe_for_load(table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Parse the datetime columns of a table (or chunk) for loading"""
+    for column in DATETIME_COLUMNS.get(table_name, []):
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column])
+    return df
+
+
+def dataframe_to_parquet(table_name: str, df: pd.DataFrame) -> io.BytesIO:
+    """
+    Serialize a table (or chunk) as compressed Parquet for a load job.
+
+    REPEATED STRING columns are written as Parquet lists with an explicit
+    list<string> type, so an all-empty column still has the right type; a
+    missing list is written as null, which BigQuery loads as an empty array.
+    Timestamps are written in microseconds, BigQuery's precision.
+    """
+    list_types = {
+        field.name: pa.list_(pa.string())
+        for field in TABLE_CONFIGS[table_name]["schema"]
+        if field.mode == "REPEATED" and field.field_type == "STRING" and field.name in df.columns
+    }
+    arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+    for name, list_type in list_types.items():
+        index = arrow_table.schema.get_field_index(name)
+        if arrow_table.schema.field(name).type == list_type:
+            # Already an Arrow list<string> column
+            continue
+        column = pa.array(df[name], type=list_type, from_pandas=True)
+        arrow_table = arrow_table.set_column(index, pa.field(name, list_type), column)
+
+    buffer = io.BytesIO()
+    pq.write_table(
+        arrow_table,
+        buffer,
+        compression=PARQUET_COMPRESSION,
+        coerce_timestamps="us",
+        allow_truncated_timestamps=True,
+    )
+    buffer.seek(0)
+    return buffer
+
+
+def submit_parquet_load(
     client: bigquery.Client,
     df: pd.DataFrame,
     project_id: str,
     dataset_id: str,
     table_name: str,
     write_disposition: str = "WRITE_TRUNCATE",  # or "WRITE_APPEND"
-) -> None:
-    """Load a pandas DataFrame into BigQuery"""
+    time_partitioning: Optional[bigquery.TimePartitioning] = None,
+    clustering_fields: Optional[List[str]] = None,
+    schema_table: Optional[str] = None,
+) -> Tuple[bigquery.LoadJob, int]:
+    """
+    Start a Parquet load job for a DataFrame without waiting for it; returns (job, Parquet bytes).
+
+    schema_table names the TABLE_CONFIGS entry describing df when table_name is
+    not one itself (e.g. an incremental staging table); defaults to table_name.
+    """
     table_ref = bigquery.TableReference(
         bigquery.DatasetReference(project_id, dataset_id),
         table_name
     )
     
+    # The layout must match the destination table's, or BigQuery rejects the load
+    parquet_options = bigquery.ParquetOptions()
+    parquet_options.enable_list_inference = True
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        write_disposition=write_disposition,
+        time_partitioning=time_partitioning,
+        clustering_fields=clustering_fields,
+    )
+    job_config.parquet_options = parquet_options
+    
+    buffer = dataframe_to_parquet(schema_table or table_name, df)
+    size = buffer.getbuffer().nbytes
+    job = client.load_table_from_file(buffer, table_ref, job_config=job_config, size=size, rewind=True)
+    return job, size
+
+
+def load_dataframe_to_bigquery(
+    client: bigquery.Client,
+    df: pd.DataFrame,
+    project_id: str,
+    dataset_id: str,
+    table_name: str,
+    write_disposition: str = "WRITE_TRUNCATE",  # or "WRITE_APPEND"
+    time_partitioning: Optional[bigquery.TimePartitioning] = None,
+    clustering_fields: Optional[List[str]] = None,
+) -> None:
+    """Load a pandas DataFrame into BigQuery and wait for the job"""
     print(f"Loading data into {project_id}.{dataset_id}.{table_name}...")
     print(f"  Rows: {len(df)}")
     print(f"  Write mode: {write_disposition}")
     
-    job_config = bigquery.LoadJobConfig(
+    job, _ = submit_parquet_load(
+        client,
+        df,
+        project_id,
+        dataset_id,
+        table_name,
         write_disposition=write_disposition,
+        time_partitioning=time_partitioning,
+        clustering_fields=clustering_fields,
     )
+    job.result()  # Wait for the job to complete
     
-    # Convert dataframe to BigQuery format
-    # Handle repeated fields (arrays) specially
-    if table_name == "feedback_data" and "key_phrases" in df.columns:
-        # Convert list column to proper format
-        df = df.copy()
-        df["key_phrases"] = df["key_phrases"].apply(
-            lambda x: x if isinstance(x, list) else [x] if pd.notna(x) else []
+    print(f"Successfully loaded {len(df)} rows into {project_id}.{dataset_id}.{table_name}")
+
+
+def bulk_load_dataframes(
+    client: bigquery.Client,
+    dataframes: Dict[str, pd.DataFrame],
+    project_id: str,
+    dataset_id: str,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Load whole tables concurrently: submit one Parquet load job per table, then wait on all of them.
+
+    Each table is replaced (WRITE_TRUNCATE). Tables not in TABLE_CONFIGS are skipped.
+
+    Returns:
+        Per-table {"rows", "bytes", "seconds", "rows_per_second", "mb_per_second"};
+        seconds run from submission (including the upload) to job completion
+    """
+    submitted = {}
+    for table_name, df in dataframes.items():
+        if table_name not in TABLE_CONFIGS:
+            continue
+        df = prepare_dataframe_for_load(table_name, df)
+        table = create_configured_table(client, project_id, dataset_id, table_name)
+        start = time.perf_counter()
+        job, size = submit_parquet_load(
+            client,
+            df,
+            project_id,
+            dataset_id,
+            table_name,
+            write_disposition="WRITE_TRUNCATE",
+            # Match the existing table's layout; migrate_table_layout changes it
+            time_partitioning=table.time_partitioning,
+            clustering_fields=table.clustering_fields,
         )
+        print(f"Submitted load of {len(df):,} rows ({size / 1e6:0.1f} MB Parquet) into {table_name}")
+        submitted[table_name] = (job, start, len(df), size)
     
-    job = client.load_table_from_dataframe(df, table_ref, job_config=job_config)
-    job.result()  # Wait for the job to complete
+    stats = {}
+    errors = []
+    for table_name, (job, start, rows, size) in submitted.items():
+        try:
+            job.result()
+        except Exception as exc:
+            errors.append(f"{table_name}: {exc}")
+            continue
+        seconds = max(time.perf_counter() - start, 1e-9)
+        stats[table_name] = {
+            "rows": rows,
+            "bytes": size,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / seconds, 1),
+            "mb_per_second": round(size / 1e6 / seconds, 2),
+        }
     
-    print(f"Successfully loaded {len(df)} rows into {project_id}.{dataset_id}.{table_name}")
+    print(f"\n{'table':<28} | {'rows':>12} | {'MB':>8} | {'seconds':>8} | {'rows/s':>11} | {'MB/s':>7}")
+    for table_name, row in stats.items():
+        print(
+            f"{table_name:<28} | {row['rows']:>12,} | {row['bytes'] / 1e6:>8.1f} | {row['seconds']:>8.2f}"
+            f" | {row['rows_per_second']:>11,.0f} | {row['mb_per_second']:>7.2f}"
+        )
+    if errors:
+        raise RuntimeError("Load jobs failed:\n" + "\n".join(errors))
+    return stats
+
+
+def get_load_watermarks(client: bigquery.Client, project_id: str, dataset_id: str) -> Dict[str, Any]:
+    """
+    High-water mark of each table with a watermark_field.
+
+    Marks recorded by incremental loads come from the WATERMARK_STATE_TABLE;
+    tables loaded before that (or by a full load) fall back to MAX(watermark_field).
+    Tables that do not exist yet have no entry.
+    """
+    state_id = _ensure_watermark_table(client, project_id, dataset_id)
+    watermarks = {
+        row["table_name"]: row["watermark"]
+        for row in client.query(f"SELECT table_name, watermark FROM `{state_id}`").result()
+    }
+    for table_name, config in TABLE_CONFIGS.items():
+        field = config.get("watermark_field")
+        if not field or table_name in watermarks:
+            continue
+        try:
+            rows = client.query(
+                f"SELECT MAX({field}) AS watermark FROM `{project_id}.{dataset_id}.{table_name}`"
+            ).result()
+        except NotFound:
+            continue
+        watermark = next(iter(rows))["watermark"]
+        if watermark is not None:
+            watermarks[table_name] = watermark
+    return watermarks
+
+
+def _ensure_watermark_table(client: bigquery.Client, project_id: str, dataset_id: str) -> str:
+    state_id = f"{project_id}.{dataset_id}.{WATERMARK_STATE_TABLE}"
+    client.query(
+        f"CREATE TABLE IF NOT EXISTS `{state_id}` ("
+        "table_name STRING NOT NULL, watermark TIMESTAMP, loaded_at TIMESTAMP)"
+    ).result()
+    return state_id
+
+
+def rows_past_watermark(df: pd.DataFrame, field: str, watermark: Optional[Any]) -> pd.DataFrame:
+    """
+    Rows of df at or after the watermark (all rows when there is none); df[field] must be datetime.
+
+    Rows at the watermark itself are kept because other rows may share its
+    timestamp; the primary-key MERGE drops the ones already loaded.
+    """
+    if watermark is None:
+        return df
+    watermark = pd.Timestamp(watermark)
+    column = df[field]
+    if column.dt.tz is None and watermark.tzinfo is not None:
+        # BigQuery TIMESTAMPs are UTC; naive generated timestamps are read as UTC too
+        watermark = watermark.tz_convert(None)
+    return df[column >= watermark]
+
+
+def incremental_load_dataframes(
+    client: bigquery.Client,
+    dataframes: Dict[str, pd.DataFrame],
+    project_id: str,
+    dataset_id: str,
+    watermarks: Optional[Dict[str, Any]] = None,
+) -> Dict[str, int]:
+    """
+    Append only new rows: each table's rows past its high-water mark are loaded
+    into a staging table, deduplicated on the primary key and MERGEd into the
+    target on it, so neither a re-run load nor a batch that repeats a key
+    duplicates rows. When the watermark field is part of the primary key the
+    MERGE only scans target partitions from the earliest new row on; tables
+    keyed by an ID are matched over the whole table. The new watermark is
+    recorded in the same transaction. Tables without a watermark_field are
+    replaced.
+
+    Pass the watermarks read before the first of several chunks (get_load_watermarks)
+    so rows of later chunks are compared against the same marks.
+
+    Returns:
+        Rows appended (or loaded, for replaced tables) per table
+    """
+    if watermarks is None:
+        watermarks = get_load_watermarks(client, project_id, dataset_id)
+    state_id = _ensure_watermark_table(client, project_id, dataset_id)
+
+    replaced = {}
+    staged = {}
+    for table_name, df in dataframes.items():
+        config = TABLE_CONFIGS.get(table_name)
+        if config is None:
+            continue
+        df = prepare_dataframe_for_load(table_name, df)
+        create_configured_table(client, project_id, dataset_id, table_name)
+        field = config.get("watermark_field")
+        if not field:
+            replaced[table_name] = df
+            continue
+
+        new_rows = rows_past_watermark(df, field, watermarks.get(table_name))
+        print(f"{table_name}: {len(new_rows):,} of {len(df):,} rows at or past watermark {watermarks.get(table_name)}")
+        if new_rows.empty:
+            continue
+        # The staging table has no layout; it only feeds the MERGE
+        job, _ = submit_parquet_load(
+            client,
+            new_rows,
+            project_id,
+            dataset_id,
+            f"{table_name}{STAGING_SUFFIX}",
+            write_disposition="WRITE_TRUNCATE",
+            schema_table=table_name,
+        )
+        staged[table_name] = (job, new_rows[field].min(), new_rows[field].max(), len(new_rows))
+
+    loaded = {}
+    merges = []
+    for table_name, (job, earliest, latest, rows) in staged.items():
+        job.result()
+        config = TABLE_CONFIGS[table_name]
+        field = config["watermark_field"]
+        target_id = f"{project_id}.{dataset_id}.{table_name}"
+        staging_id = f"{target_id}{STAGING_SUFFIX}"
+        columns = ", ".join(schema_field.name for schema_field in config["schema"])
+        primary_key = ", ".join(config["primary_key"])
+        match = " AND ".join(f"T.{column} = S.{column}" for column in config["primary_key"])
+        query_parameters = [
+            bigquery.ScalarQueryParameter("table_name", "STRING", table_name),
+            bigquery.ScalarQueryParameter("watermark", "TIMESTAMP", latest.to_pydatetime()),
+        ]
+        # A duplicate of a key that includes the watermark field has the same watermark value,
+        # so only partitions from the earliest new row on are scanned. ID-keyed tables are
+        # matched over the whole table: the generators number IDs by position, so a rerun
+        # can repeat an existing ID at an earlier date
+        if field in config["primary_key"]:
+            match = f"T.{field} >= @earliest AND {match}"
+            query_parameters.append(bigquery.ScalarQueryParameter("earliest", "TIMESTAMP", earliest.to_pydatetime()))
+        job = client.query(
+            "BEGIN TRANSACTION;\n"
+            f"MERGE `{target_id}` T USING (\n"
+            # One source row per key: NOT MATCHED would insert every duplicate within the batch
+            f"  SELECT * FROM `{staging_id}` WHERE TRUE\n"
+            f"  QUALIFY ROW_NUMBER() OVER (PARTITION BY {primary_key} ORDER BY {field} DESC) = 1\n"
+            ") S\n"
+            f"ON {match}\n"
+            f"WHEN NOT MATCHED THEN INSERT ({columns}) VALUES ({columns});\n"
+            # Keep the later mark, so loads of out-of-order chunks never move it back
+            f"DELETE FROM `{state_id}` WHERE table_name = @table_name AND watermark <= @watermark;\n"
+            f"INSERT INTO `{state_id}` (table_name, watermark, loaded_at)\n"
+            "SELECT @table_name, @watermark, CURRENT_TIMESTAMP()\n"
+            f"FROM UNNEST([1]) WHERE NOT EXISTS (SELECT 1 FROM `{state_id}` WHERE table_name = @table_name);\n"
+            "COMMIT TRANSACTION;",
+            job_config=bigquery.QueryJobConfig(query_parameters=query_parameters),
+        )
+        merges.append((table_name, staging_id, rows, job))
+
+    for table_name, staging_id, rows, job in merges:
+        job.result()
+        client.delete_table(staging_id, not_found_ok=True)
+        loaded[table_name] = rows
+        print(f"Appended {rows:,} new rows into {table_name}")
+
+    if replaced:
+        for table_name, stats in bulk_load_dataframes(client, replaced, project_id, dataset_id).items():
+            loaded[table_name] = stats["rows"]
+    return loaded
+
+
+def create_configured_table(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    table_name: str,
+) -> bigquery.Table:
+    """create_table_if_not_exists with the schema and layout from TABLE_CONFIGS"""
+    config = TABLE_CONFIGS[table_name]
+    return create_table_if_not_exists(
+        client,
+        project_id,
+        dataset_id,
+        table_name,
+        config["schema"],
+        config["description"],
+        time_partitioning=build_time_partitioning(config),
+        clustering_fields=config.get("clustering_fields"),
+    )
 
 
 def load_all_synthetic_data(
     project_id: str,
     dataset_id: str = "wendys_hackathon_data",
     credentials_path: Optional[str] = None,
+    engine: str = "python",
+    seed: Optional[int] = None,
+    num_customers: int = 1200,
+    chunk_rows: Optional[int] = None,
+    num_shards: Optional[int] = None,
+    incremental: bool = False,
 ) -> None:
-    """Generate synthetic data and load it into BigQuery"""
+    """
+    Generate synthetic data and load it into BigQuery (see export_to_dataframes for the generation options).
+
+    With chunk_rows set, the data is generated and loaded in chunks of that many
+    rows (streaming_export.iter_table_chunks, numpy engine) so memory stays flat
+    as num_customers grows; engine is then ignored.
+
+    With incremental set, tables are not replaced: only rows past each table's
+    high-water mark are appended, deduplicated on the primary key
+    (incremental_load_dataframes).
+    """
     
-    # Initialize BigQuery client
-    if credentials_path:
-        client = bigquery.Client.from_service_account_json(credentials_path, project=project_id)
-    else:
-        # Use default credentials from environment
-        client = bigquery.Client(project=project_id)
+    # Reuse the shared, pooled BigQuery client (same one the agent tools use)
+    client = get_bigquery_client(project_id, credentials_path)
     
     # Create dataset
     get_or_create_dataset(client, dataset_id, project_id)
     
-    # Generate synthetic data
-    print("\n=== Generating Synthetic Data ===")
-    dataframes = export_to_dataframes()
-    
-    # Load each table
-    print("\n=== Loading Data into BigQuery ===")
-    
-    for table_name, config in TABLE_CONFIGS.items():
-        if table_name in dataframes:
-            df = dataframes[table_name]
-
-            # Normalize datetime columns
-            datetime_columns = {
-                "crm_data": ["visit_date"],
-                "customer_transactions_raw": ["transaction_date"],
-                "redemption_logs": ["redemption_date"],
-                "feedback_data": ["feedback_date"],
-                "customer_feedback_raw": ["feedback_date"],
-                "customer_segments": ["created_at"],
-            }.get(table_name, [])
-
-            for column in datetime_columns:
-                if column in df.columns:
-                    df[column] = pd.to_datetime(df[column])
-
-            # Normalize repeated field columns
-            repeated_columns = {
-                "customer_transactions_raw": ["items"],
-                "feedback_data": ["key_phrases"],
-                "customer_feedback_raw": [],
-                "customer_segments": [
-                    "preferred_mechanics",
-                    "key_messaging_phrases",
-                    "top_time_periods",
-                    "dominant_dayparts",
-                ],
-            }.get(table_name, [])
-
-            if repeated_columns:
-                df = df.copy()
-                for column in repeated_columns:
-                    if column in df.columns:
-                        df[column] = df[column].apply(
-                            lambda value: value if isinstance(value, list) else ([] if pd.isna(value) else [value])
-                        )
-
-            # Create or update table
-            create_table_if_not_exists(
-                client,
-                project_id,
-                dataset_id,
-                table_name,
-                config["schema"],
-                config["description"],
-            )
-
-            # Load data
+    if chunk_rows:
+        print(f"\n=== Streaming Synthetic Data ({chunk_rows:,}-row chunks) ===")
+        # The first chunk of a table replaces it and later chunks append, so
+        # each chunk's load finishes before the next one starts
+        tables: Dict[str, bigquery.Table] = {}
+        watermarks = get_load_watermarks(client, project_id, dataset_id) if incremental else None
+        for table_name, df in iter_table_chunks(num_customers, seed=seed, chunk_rows=chunk_rows):
+            if table_name not in TABLE_CONFIGS:
+                continue
+            if incremental:
+                incremental_load_dataframes(client, {table_name: df}, project_id, dataset_id, watermarks)
+                continue
+            df = prepare_dataframe_for_load(table_name, df)
+            first_chunk = table_name not in tables
+            if first_chunk:
+                tables[table_name] = create_configured_table(client, project_id, dataset_id, table_name)
+            table = tables[table_name]
             load_dataframe_to_bigquery(
                 client,
                 df,
                 project_id,
                 dataset_id,
                 table_name,
-                write_disposition="WRITE_TRUNCATE",  # Change to "WRITE_APPEND" to add more data
+                write_disposition="WRITE_TRUNCATE" if first_chunk else "WRITE_APPEND",
+                # Match the existing table's layout; migrate_table_layout changes it
+                time_partitioning=table.time_partitioning,
+                clustering_fields=table.clustering_fields,
             )
+    else:
+        # Generate synthetic data
+        print("\n=== Generating Synthetic Data ===")
+        dataframes = export_to_dataframes(
+            engine=engine, seed=seed, num_customers=num_customers, num_shards=num_shards
+        )
+        
+        # All tables load concurrently
+        print("\n=== Loading Data into BigQuery ===")
+        if incremental:
+            incremental_load_dataframes(client, dataframes, project_id, dataset_id)
+        else:
+            bulk_load_dataframes(client, dataframes, project_id, dataset_id)
+    
+    # New data changes every partition, so this rebuilds the rollups
+    print("\n=== Refreshing Rollup Tables ===")
+    refresh_all_rollups(client, project_id, dataset_id)
     
     print("\n=== Data Loading Complete ===")
     print(f"All tables are available at: {project_id}.{dataset_id}")
 
 
+def migrate_table_layout(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    table_name: str,
+) -> bool:
+    """
+    Rebuild an existing table with the partitioning and clustering in TABLE_CONFIGS.
+
+    BigQuery cannot change a table's layout in place, so the table is rebuilt
+    with a single CREATE OR REPLACE TABLE ... AS SELECT from itself: one job
+    that either replaces the table or leaves it untouched. BigQuery refuses
+    that statement when the partitioning spec changes; the table is then
+    rebuilt into a staging table and swapped in by renames inside one script
+    whose error handler renames the original back, so the production name
+    never points at a missing table. The original is dropped only after the
+    swap succeeded.
+
+    Returns:
+        True if the table was rebuilt, False if it already had the configured layout
+    """
+    config = TABLE_CONFIGS[table_name]
+    table_id = f"{project_id}.{dataset_id}.{table_name}"
+    staging_id = f"{table_id}__layout_migration"
+    backup_name = f"{table_name}__pre_layout_migration"
+
+    table = client.get_table(table_id)
+    if table_layout_matches(table, build_time_partitioning(config), config.get("clustering_fields")):
+        print(f"Table {table_name} already has the configured layout.")
+        return False
+
+    clauses = []
+    partitioning = config.get("time_partitioning")
+    if partitioning:
+        clauses.append(
+            f"PARTITION BY TIMESTAMP_TRUNC({partitioning['field']}, {partitioning.get('type', 'DAY')})"
+        )
+    if config.get("clustering_fields"):
+        clauses.append(f"CLUSTER BY {', '.join(config['clustering_fields'])}")
+    layout_sql = (
+        "\n".join(clauses)
+        + f"\nOPTIONS(description={json.dumps(table.description or config['description'])})\n"
+        + f"AS SELECT * FROM `{table_id}`"
+    )
+
+    print(f"Migrating {table_name} ({table.num_rows:,} rows)...")
+    try:
+        client.query(f"CREATE OR REPLACE TABLE `{table_id}`\n{layout_sql}").result()
+    except BadRequest as e:
+        if "partitioning spec" not in str(e):
+            raise
+        client.query(f"CREATE OR REPLACE TABLE `{staging_id}`\n{layout_sql}").result()
+        staging = client.get_table(staging_id)
+        if staging.num_rows != table.num_rows:
+            client.delete_table(staging_id)
+            raise RuntimeError(
+                f"Row count mismatch migrating {table_name}: {table.num_rows} -> {staging.num_rows}"
+            )
+        client.query(
+            "BEGIN\n"
+            f"  ALTER TABLE `{table_id}` RENAME TO `{backup_name}`;\n"
+            f"  ALTER TABLE `{staging_id}` RENAME TO `{table_name}`;\n"
+            "EXCEPTION WHEN ERROR THEN\n"
+            f"  IF NOT EXISTS (SELECT 1 FROM `{project_id}.{dataset_id}.INFORMATION_SCHEMA.TABLES`"
+            f" WHERE table_name = '{table_name}') THEN\n"
+            f"    ALTER TABLE `{project_id}.{dataset_id}.{backup_name}` RENAME TO `{table_name}`;\n"
+            "  END IF;\n"
+            "  RAISE USING MESSAGE = @@error.message;\n"
+            "END;"
+        ).result()
+        client.delete_table(f"{project_id}.{dataset_id}.{backup_name}")
+    print(f"Table {table_name} rebuilt with the configured partitioning and clustering.")
+    return True
+
+
+def migrate_all_table_layouts(
+    project_id: str,
+    dataset_id: str = "wendys_hackathon_data",
+    credentials_path: Optional[str] = None,
+) -> None:
+    """Rebuild every existing table whose layout differs from TABLE_CONFIGS"""
+    client = get_bigquery_client(project_id, credentials_path)
+
+    print("\n=== Migrating Table Layouts ===")
+    for table_name in TABLE_CONFIGS:
+        try:
+            migrate_table_layout(client, project_id, dataset_id, table_name)
+        except NotFound:
+            print(f"Table {table_name} does not exist, skipping.")
+
+    print("\n=== Refreshing Rollup Tables ===")
+    refresh_all_rollups(client, project_id, dataset_id)
+
+    print("\n=== Migration Complete ===")
+
+
+USAGE = """Usage: python src/customer_insights/data/bigquery_loader.py [--incremental | --migrate]
+
+Generates the synthetic data and loads it into BigQuery (GOOGLE_CLOUD_PROJECT,
+BIGQUERY_DATASET). SYNTHETIC_DATA_ENGINE, SYNTHETIC_DATA_SEED,
+SYNTHETIC_NUM_CUSTOMERS, SYNTHETIC_CHUNK_ROWS and SYNTHETIC_NUM_SHARDS control
+the generation.
+
+  (no flag)      Replace every table with freshly generated data.
+  --incremental  Append only rows past each table's high-water mark, deduplicated
+                 on the primary key. The generator always produces the same 2025
+                 calendar, so after a first load this appends nothing new for
+                 generated data (at most rows at the exact watermark are staged
+                 and dropped as duplicates); it is meant for sources that keep
+                 producing later rows.
+  --migrate      Rebuild existing tables with the partitioning and clustering in
+                 TABLE_CONFIGS, keeping their data.
+"""
+
+
 if __name__ == "__main__":
     # Example usage
     import sys
     
+    if "--help" in sys.argv or "-h" in sys.argv:
+        print(USAGE)
+        sys.exit(0)
+    
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT") or input("Enter your Google Cloud Project ID: ")
     dataset_id = os.getenv("BIGQUERY_DATASET", "wendys_hackathon_data")
     credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -204,8 +700,23 @@ if __name__ == "__main__":
         print("Error: Please set GOOGLE_CLOUD_PROJECT environment variable or enter project ID")
         sys.exit(1)
     
-    load_all_synthetic_data(
-        project_id=project_id,
-        dataset_id=dataset_id,
-        credentials_path=credentials_path,
-    )
+    if "--migrate" in sys.argv:
+        # Rebuild existing tables with the layouts in TABLE_CONFIGS, keeping their data
+        migrate_all_table_layouts(
+            project_id=project_id,
+            dataset_id=dataset_id,
+            credentials_path=credentials_path,
+        )
+    else:
+        seed = os.getenv("SYNTHETIC_DATA_SEED")
+        load_all_synthetic_data(
+            project_id=project_id,
+            dataset_id=dataset_id,
+            credentials_path=credentials_path,
+            engine=os.getenv("SYNTHETIC_DATA_ENGINE", "python"),
+            seed=int(seed) if seed else None,
+            num_customers=int(os.getenv("SYNTHETIC_NUM_CUSTOMERS", "1200")),
+            chunk_rows=int(os.getenv("SYNTHETIC_CHUNK_ROWS", "0")) or None,
+            num_shards=int(os.getenv("SYNTHETIC_NUM_SHARDS", "0")) or None,
+            incremental="--incremental" in sys.argv,
+        )
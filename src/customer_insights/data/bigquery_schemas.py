@@ -113,31 +113,56 @@ CUSTOMER_SEGMENTS_SCHEMA = [
 ]
 
 # Table configuration
+#
+# Optional keys:
+# - time_partitioning: {"field": <TIMESTAMP column>, "type": "DAY" | "MONTH" | ...}
+# - clustering_fields: Up to four columns, most frequently filtered first
+# - watermark_field: TIMESTAMP column whose high-water mark drives incremental loads
+# - primary_key: Columns identifying a row, used to dedupe incremental loads
+# Tables without a watermark_field are replaced on every load.
+# The synthetic data covers a single year, so monthly partitions keep each
+# partition large enough to be worth pruning.
 TABLE_CONFIGS = {
     "crm_data": {
         "schema": CRM_TABLE_SCHEMA,
         "description": "CRM and loyalty customer visit data",
         "table_id": "crm_data",
+        "time_partitioning": {"field": "visit_date", "type": "MONTH"},
+        "clustering_fields": ["time_period", "is_gen_z", "visit_daypart", "segment_id"],
+        "watermark_field": "visit_date",
+        "primary_key": ["customer_id", "visit_date"],
     },
     "customer_transactions_raw": {
         "schema": CUSTOMER_TRANSACTIONS_RAW_SCHEMA,
         "description": "Raw transactional records with offer redemptions",
         "table_id": "customer_transactions_raw",
+        "watermark_field": "transaction_date",
+        "primary_key": ["transaction_id"],
     },
     "redemption_logs": {
         "schema": REDEMPTION_LOGS_TABLE_SCHEMA,
         "description": "Redemption logs and offer history",
         "table_id": "redemption_logs",
+        "time_partitioning": {"field": "redemption_date", "type": "MONTH"},
+        "clustering_fields": ["time_period", "is_gen_z", "offer_type", "channel"],
+        "watermark_field": "redemption_date",
+        "primary_key": ["redemption_id"],
     },
     "feedback_data": {
         "schema": FEEDBACK_TABLE_SCHEMA,
         "description": "Customer feedback, reviews, and sentiment data",
         "table_id": "feedback_data",
+        "time_partitioning": {"field": "feedback_date", "type": "MONTH"},
+        "clustering_fields": ["time_period", "is_gen_z", "daypart", "segment_id"],
+        "watermark_field": "feedback_date",
+        "primary_key": ["feedback_id"],
     },
     "customer_feedback_raw": {
         "schema": CUSTOMER_FEEDBACK_RAW_SCHEMA,
         "description": "Raw customer feedback verbatims with ratings",
         "table_id": "customer_feedback_raw",
+        "watermark_field": "feedback_date",
+        "primary_key": ["feedback_id"],
     },
     "customer_segments": {
         "schema": CUSTOMER_SEGMENTS_SCHEMA,
@@ -0,0 +1,556 @@
+"""DuckDB stand-in for BigQuery: offline tool execution, CI and benchmarks
+
+DuckDBBackend is the ``duckdb`` query backend (see query_backend.py). It keeps
+the synthetic_data_generator tables in an in-process DuckDB database, created
+with the column types from bigquery_schemas.TABLE_CONFIGS, and answers the
+tools' queries locally without a GCP project.
+
+Tool SQL is written in BigQuery's dialect, so translate_sql rewrites the parts
+the agents and templates use before DuckDB sees them:
+
+- backtick table names: `project.dataset.table` -> "dataset"."table"
+- query parameters: @name -> $name
+- COUNTIF, SAFE_DIVIDE, EXTRACT(DAYOFWEEK/DAYOFYEAR/DATE FROM ...), DATE(),
+  TIMESTAMP_TRUNC/DATE_TRUNC, DATE_DIFF/TIMESTAMP_DIFF, *_ADD/*_SUB,
+  FORMAT_TIMESTAMP/FORMAT_DATE, REGEXP_CONTAINS, ARRAY_LENGTH, SAFE_CAST,
+  INT64/FLOAT64 casts, SELECT * EXCEPT and ``UNNEST(x) AS alias``
+- the summary-mode aggregates APPROX_QUANTILES and APPROX_TOP_COUNT
+- double-quoted and r'' string literals
+
+Queries are not dry-run, cost-checked, cached or routed to rollups: results
+report bytes_processed = 0, rollup = None and cache_hit = False.
+
+Environment (DuckDBBackend.from_environment):
+- LOCAL_DUCKDB_PATH: Database file (default in-memory); an existing file with
+  tables is reused instead of regenerating data
+- SYNTHETIC_NUM_CUSTOMERS / SYNTHETIC_DATA_SEED / SYNTHETIC_DATA_ENGINE: As for
+  bigquery_loader (the engine defaults to "numpy" here)
+- GOOGLE_CLOUD_PROJECT / BIGQUERY_DATASET: Names the tools see (default
+  "local" / "wendys_hackathon_data")
+"""
+import asyncio
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+from google.cloud import bigquery
+
+from .bigquery_schemas import TABLE_CONFIGS
+from .query_runner import MAX_RESULT_BYTES, MAX_RESULT_ROWS, apply_byte_budget
+from .result_summary import build_summary_sql, unpack_summary
+
+LOCAL_PROJECT = "local"
+DEFAULT_DATASET = "wendys_hackathon_data"
+
+# BigQuery column type -> DuckDB column type
+DUCKDB_TYPES = {
+    "STRING": "VARCHAR",
+    "INTEGER": "BIGINT",
+    "INT64": "BIGINT",
+    "FLOAT": "DOUBLE",
+    "FLOAT64": "DOUBLE",
+    "NUMERIC": "DECIMAL(38, 9)",
+    "BOOLEAN": "BOOLEAN",
+    "BOOL": "BOOLEAN",
+    "TIMESTAMP": "TIMESTAMP",
+    "DATETIME": "TIMESTAMP",
+    "DATE": "DATE",
+    "TIME": "TIME",
+}
+
+# BigQuery type names DuckDB does not know as cast targets
+_CAST_TYPES = {"INT64": "BIGINT", "FLOAT64": "DOUBLE", "BIGNUMERIC": "DECIMAL(38, 9)"}
+
+# EXTRACT parts whose BigQuery name differs from DuckDB's
+_EXTRACT_PARTS = {"DAYOFYEAR": "DOY", "ISOWEEK": "WEEK"}
+
+_LITERAL_PATTERN = re.compile(r"""(?P<raw>(?<!\w)[rR])?(?P<quote>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")""")
+_PLACEHOLDER_PATTERN = re.compile(r"\x00(\d+)\x00")
+_BACKTICK_PATTERN = re.compile(r"`([^`]+)`")
+_PARAMETER_PATTERN = re.compile(r"(?<![@\w])@(\w+)")
+_CAST_TYPE_PATTERN = re.compile(r"\bAS\s+(INT64|FLOAT64|BIGNUMERIC)\b", re.IGNORECASE)
+_UNNEST_ALIAS_PATTERN = re.compile(r"\bUNNEST\s*\(([^()]*)\)\s+AS\s+(\w+)(?!\s*\()", re.IGNORECASE)
+_EXCEPT_PATTERN = re.compile(r"\*\s*EXCEPT\s*\(", re.IGNORECASE)
+_EXTRACT_ARG_PATTERN = re.compile(r"^\s*(\w+)\s+FROM\s+(.*)$", re.IGNORECASE | re.DOTALL)
+
+
+def _matching_paren(sql_query: str, open_index: int) -> Optional[int]:
+    depth = 0
+    for index in range(open_index, len(sql_query)):
+        if sql_query[index] == "(":
+            depth += 1
+        elif sql_query[index] == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    return None
+
+
+def _split_args(text: str) -> List[str]:
+    """Split a call's argument list on top-level commas"""
+    args, depth, start = [], 0, 0
+    for index, char in enumerate(text):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            args.append(text[start:index].strip())
+            start = index + 1
+    args.append(text[start:].strip())
+    return args
+
+
+def _rewrite_calls(sql_query: str, name: str, rewrite: Callable[[List[str]], Optional[str]]) -> str:
+    """
+    Replace every ``name(...)`` call with ``rewrite(args)``.
+
+    Calls are rewritten from the last to the first, so nested calls are
+    translated before the call that contains them. A rewrite returning None
+    leaves that call unchanged.
+    """
+    pattern = re.compile(rf"\b{name}\s*\(", re.IGNORECASE)
+    for match in reversed(list(pattern.finditer(sql_query))):
+        close_index = _matching_paren(sql_query, match.end() - 1)
+        if close_index is None:
+            continue
+        replacement = rewrite(_split_args(sql_query[match.end():close_index]))
+        if replacement is not None:
+            sql_query = sql_query[:match.start()] + replacement + sql_query[close_index + 1:]
+    return sql_query
+
+
+def _is_date_part(arg: str) -> bool:
+    return re.fullmatch(r"[A-Za-z]+", arg) is not None
+
+
+def _rewrite_extract(args: List[str]) -> Optional[str]:
+    match = _EXTRACT_ARG_PATTERN.match(args[0]) if len(args) == 1 else None
+    if match is None:
+        return None
+    part, expression = match.group(1).upper(), match.group(2)
+    if part == "DAYOFWEEK":
+        # BigQuery numbers Sunday as 1, DuckDB's DOW as 0
+        return f"(EXTRACT(DOW FROM {expression}) + 1)"
+    if part == "DATE":
+        return f"CAST({expression} AS DATE)"
+    return f"EXTRACT({_EXTRACT_PARTS.get(part, part)} FROM {expression})"
+
+
+def _rewrite_trunc(args: List[str]) -> Optional[str]:
+    # DATE_TRUNC('month', x) is already DuckDB's form
+    if len(args) != 2 or not _is_date_part(args[1]):
+        return None
+    return f"DATE_TRUNC('{args[1].lower()}', {args[0]})"
+
+
+def _rewrite_diff(args: List[str]) -> Optional[str]:
+    if len(args) != 3 or not _is_date_part(args[2]):
+        return None
+    return f"DATE_DIFF('{args[2].lower()}', {args[1]}, {args[0]})"
+
+
+def _rewrite_approx_quantiles(args: List[str]) -> Optional[str]:
+    if len(args) != 2 or not args[1].isdigit():
+        return None
+    buckets = int(args[1])
+    fractions = ", ".join(str(step / buckets) for step in range(buckets + 1))
+    return f"QUANTILE_DISC({args[0]}, [{fractions}])"
+
+
+def _rewrite_approx_top_count(args: List[str]) -> Optional[str]:
+    if len(args) != 2:
+        return None
+    # Exact counts, most frequent first, as a list of {value, count} structs
+    return (
+        f"LIST_SLICE(LIST_REVERSE_SORT(LIST_TRANSFORM(MAP_ENTRIES(HISTOGRAM({args[0]})), "
+        f"entry -> {{'count': entry.value, 'value': entry.key}})), 1, {args[1]})"
+    )
+
+
+# (function name, rewrite) pairs applied in order by translate_sql
+_CALL_REWRITES = [
+    ("COUNTIF", lambda args: f"COUNT_IF({', '.join(args)})"),
+    ("SAFE_DIVIDE", lambda args: f"(({args[0]}) / NULLIF({args[1]}, 0))" if len(args) == 2 else None),
+    ("EXTRACT", _rewrite_extract),
+    ("DATE", lambda args: f"CAST({args[0]} AS DATE)" if len(args) == 1 else None),
+    ("TIMESTAMP_TRUNC", _rewrite_trunc),
+    ("DATETIME_TRUNC", _rewrite_trunc),
+    ("DATE_TRUNC", _rewrite_trunc),
+    ("TIMESTAMP_DIFF", _rewrite_diff),
+    ("DATETIME_DIFF", _rewrite_diff),
+    ("DATE_DIFF", _rewrite_diff),
+    ("TIMESTAMP_ADD", lambda args: f"({args[0]} + {args[1]})" if len(args) == 2 else None),
+    ("DATETIME_ADD", lambda args: f"({args[0]} + {args[1]})" if len(args) == 2 else None),
+    ("DATE_ADD", lambda args: f"({args[0]} + {args[1]})" if len(args) == 2 else None),
+    ("TIMESTAMP_SUB", lambda args: f"({args[0]} - {args[1]})" if len(args) == 2 else None),
+    ("DATETIME_SUB", lambda args: f"({args[0]} - {args[1]})" if len(args) == 2 else None),
+    ("DATE_SUB", lambda args: f"({args[0]} - {args[1]})" if len(args) == 2 else None),
+    ("FORMAT_TIMESTAMP", lambda args: f"STRFTIME({args[1]}, {args[0]})" if len(args) == 2 else None),
+    ("FORMAT_DATE", lambda args: f"STRFTIME({args[1]}, {args[0]})" if len(args) == 2 else None),
+    ("REGEXP_CONTAINS", lambda args: f"REGEXP_MATCHES({', '.join(args)})"),
+    ("ARRAY_LENGTH", lambda args: f"LEN({', '.join(args)})"),
+    ("SAFE_CAST", lambda args: f"TRY_CAST({', '.join(args)})"),
+    ("CURRENT_TIMESTAMP", lambda args: "CURRENT_TIMESTAMP" if args == [""] else None),
+    ("APPROX_QUANTILES", _rewrite_approx_quantiles),
+    ("APPROX_TOP_COUNT", _rewrite_approx_top_count),
+]
+
+
+def translate_sql(sql_query: str) -> str:
+    """
+    Rewrite a BigQuery Standard SQL statement into DuckDB SQL.
+
+    Only the dialect differences the tools, templates and summary mode rely on
+    are translated (see the module docstring); everything else is passed
+    through, since most of the agents' SQL is valid in both dialects.
+    """
+    # Keep string literals out of the rewrites
+    literals: List[str] = []
+
+    def stash(match: "re.Match[str]") -> str:
+        # DuckDB only knows single-quoted literals with '' as the quote escape
+        body = match.group("quote")[1:-1]
+        if not match.group("raw"):
+            body = body.replace("\\'", "'").replace('\\"', '"')
+        literals.append("'" + body.replace("'", "''") + "'")
+        return f"\x00{len(literals) - 1}\x00"
+
+    sql_query = _LITERAL_PATTERN.sub(stash, sql_query)
+
+    # `project.dataset.table` and `dataset.table` -> "dataset"."table"
+    sql_query = _BACKTICK_PATTERN.sub(
+        lambda match: ".".join(f'"{part}"' for part in match.group(1).split(".")[-2:]),
+        sql_query,
+    )
+    sql_query = _PARAMETER_PATTERN.sub(r"$\1", sql_query)
+
+    for name, rewrite in _CALL_REWRITES:
+        sql_query = _rewrite_calls(sql_query, name, rewrite)
+
+    sql_query = _CAST_TYPE_PATTERN.sub(lambda match: f"AS {_CAST_TYPES[match.group(1).upper()]}", sql_query)
+    # BigQuery names the element column after the alias; DuckDB needs it spelled out
+    sql_query = _UNNEST_ALIAS_PATTERN.sub(r"UNNEST(\1) AS \2(\2)", sql_query)
+    sql_query = _EXCEPT_PATTERN.sub("* EXCLUDE (", sql_query)
+
+    return _PLACEHOLDER_PATTERN.sub(lambda match: literals[int(match.group(1))], sql_query)
+
+
+def _bigquery_field(field: pa.Field) -> bigquery.SchemaField:
+    """BigQuery SchemaField for an Arrow result column (used to build summary SQL)"""
+    arrow_type, mode = field.type, "NULLABLE"
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        arrow_type, mode = arrow_type.value_type, "REPEATED"
+    if pa.types.is_boolean(arrow_type):
+        field_type = "BOOLEAN"
+    elif pa.types.is_integer(arrow_type):
+        field_type = "INTEGER"
+    elif pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+        field_type = "FLOAT"
+    elif pa.types.is_timestamp(arrow_type):
+        field_type = "TIMESTAMP"
+    elif pa.types.is_date(arrow_type):
+        field_type = "DATE"
+    elif pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        field_type = "STRING"
+    else:
+        field_type = "RECORD"
+    return bigquery.SchemaField(field.name, field_type, mode=mode)
+
+
+def _bigquery_arrow_type(arrow_type: pa.DataType) -> Optional[pa.DataType]:
+    """
+    Arrow type BigQuery would return instead of a DuckDB decimal, or None to keep it.
+
+    DuckDB sums and counts integers as HUGEINT (decimal in Arrow), where
+    BigQuery returns INT64; other decimals become FLOAT64.
+    """
+    if pa.types.is_decimal(arrow_type):
+        return pa.int64() if arrow_type.scale == 0 else pa.float64()
+    if pa.types.is_list(arrow_type):
+        value_type = _bigquery_arrow_type(arrow_type.value_type)
+        return pa.list_(value_type) if value_type is not None else None
+    return None
+
+
+def _column_type(field: bigquery.SchemaField) -> str:
+    column_type = DUCKDB_TYPES[field.field_type.upper()]
+    return f"{column_type}[]" if field.mode == "REPEATED" else column_type
+
+
+class DuckDBBackend:
+    """Runs tool queries on a local DuckDB database of synthetic data"""
+
+    name = "duckdb"
+
+    def __init__(
+        self,
+        database: str = ":memory:",
+        project: str = LOCAL_PROJECT,
+        dataset_id: str = DEFAULT_DATASET,
+    ):
+        """
+        Args:
+            database: DuckDB database file, or ":memory:"
+            project: Project ID reported to the tools (it only appears in table names)
+            dataset_id: Default dataset; unqualified table names resolve against it
+        """
+        self.connection = duckdb.connect(database)
+        self.project = project
+        self.dataset_id = dataset_id
+        self._write_lock = threading.Lock()
+        self.connection.execute(f'CREATE SCHEMA IF NOT EXISTS "{dataset_id}"')
+
+    @classmethod
+    def from_environment(cls) -> "DuckDBBackend":
+        """Open LOCAL_DUCKDB_PATH and load synthetic data into it unless it already has tables"""
+        backend = cls(
+            database=os.getenv("LOCAL_DUCKDB_PATH", ":memory:"),
+            project=os.getenv("GOOGLE_CLOUD_PROJECT", LOCAL_PROJECT),
+            dataset_id=os.getenv("BIGQUERY_DATASET", DEFAULT_DATASET),
+        )
+        if not backend.table_names():
+            seed = os.getenv("SYNTHETIC_DATA_SEED")
+            backend.load_synthetic_data(
+                num_customers=int(os.getenv("SYNTHETIC_NUM_CUSTOMERS", "1200")),
+                seed=int(seed) if seed else None,
+                engine=os.getenv("SYNTHETIC_DATA_ENGINE", "numpy"),
+            )
+        return backend
+
+    def _cursor(self) -> duckdb.DuckDBPyConnection:
+        # A cursor per call: DuckDB connections must not be shared across threads
+        cursor = self.connection.cursor()
+        cursor.execute(f"SET schema = '{self.dataset_id}'")
+        return cursor
+
+    def table_names(self, dataset_id: Optional[str] = None) -> List[str]:
+        """Tables in a dataset (default: the backend's dataset)"""
+        cursor = self.connection.cursor()
+        try:
+            rows = cursor.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_schema = ? ORDER BY table_name",
+                [dataset_id or self.dataset_id],
+            ).fetchall()
+        finally:
+            cursor.close()
+        return [row[0] for row in rows]
+
+    def load_synthetic_data(
+        self,
+        num_customers: int = 1200,
+        seed: Optional[int] = None,
+        engine: str = "numpy",
+    ) -> Dict[str, int]:
+        """Generate the synthetic tables with export_to_dataframes and load them; returns row counts"""
+        from .synthetic_data_generator import export_to_dataframes
+
+        dataframes = export_to_dataframes(engine=engine, seed=seed, num_customers=num_customers)
+        return self.load_dataframes(dataframes)
+
+    def load_dataframes(
+        self,
+        dataframes: Dict[str, pd.DataFrame],
+        dataset_id: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """
+        Replace tables with the given DataFrames.
+
+        Tables in TABLE_CONFIGS are created with their bigquery_schemas column
+        types (REPEATED STRING becomes VARCHAR[]); other tables keep the
+        DataFrame's types.
+
+        Returns:
+            Row count per table
+        """
+        return {
+            table_name: self._write_table(dataset_id or self.dataset_id, table_name, df, replace=True)
+            for table_name, df in dataframes.items()
+        }
+
+    def _write_table(self, dataset_id: str, table_name: str, df: pd.DataFrame, replace: bool) -> int:
+        table_ref = f'"{dataset_id}"."{table_name}"'
+        source = pa.Table.from_pandas(df, preserve_index=False)
+        config = TABLE_CONFIGS.get(table_name)
+        verb = "CREATE OR REPLACE TABLE" if replace else "CREATE TABLE IF NOT EXISTS"
+        with self._write_lock:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{dataset_id}"')
+                cursor.register("_source", source)
+                if config is None:
+                    cursor.execute(f"{verb} {table_ref} AS SELECT * FROM _source LIMIT 0")
+                    cursor.execute(f"INSERT INTO {table_ref} BY NAME SELECT * FROM _source")
+                else:
+                    columns = ", ".join(f'"{field.name}" {_column_type(field)}' for field in config["schema"])
+                    cursor.execute(f"{verb} {table_ref} ({columns})")
+                    # Schema columns missing from the DataFrame are left NULL, extra columns dropped
+                    selected = ", ".join(
+                        f'CAST("{field.name}" AS {_column_type(field)}) AS "{field.name}"'
+                        for field in config["schema"]
+                        if field.name in source.column_names
+                    )
+                    cursor.execute(f"INSERT INTO {table_ref} BY NAME SELECT {selected} FROM _source")
+                cursor.unregister("_source")
+            finally:
+                cursor.close()
+        return len(df)
+
+    def run_query(
+        self,
+        sql_query: str,
+        dataset_id: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute a tool query locally.
+
+        Takes the same arguments (BigQuery SQL and ScalarQueryParameters) and
+        returns the same dictionary as query_runner.run_query, with the same
+        row and byte budgets.
+        """
+        max_rows = MAX_RESULT_ROWS if max_rows is None else max_rows
+        max_bytes = MAX_RESULT_BYTES if max_bytes is None else max_bytes
+
+        result = self._execute(sql_query, query_parameters)
+        columns = result.column_names
+        total_rows = result.num_rows
+        data = result.slice(0, max_rows).to_pydict()
+        row_count = min(total_rows, max_rows)
+
+        truncation_reason = "max_rows" if total_rows > row_count else None
+        data, budget_rows = apply_byte_budget(data, row_count, max_bytes)
+        if budget_rows < row_count:
+            truncation_reason = "max_bytes"
+            row_count = budget_rows
+
+        return {
+            "columns": columns,
+            "data": data,
+            "row_count": row_count,
+            "total_rows": total_rows,
+            "truncated": truncation_reason is not None,
+            "truncation_reason": truncation_reason,
+            "bytes_processed": 0,
+            "rollup": None,
+            "cache_hit": False,
+        }
+
+    def run_summary_query(
+        self,
+        sql_query: str,
+        dataset_id: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+    ) -> Dict[str, Any]:
+        """Summarize a query's full result set; returns the same dictionary as query_runner.run_summary_query"""
+        # The result schema comes from running the query with LIMIT 0 instead of a dry run
+        base_sql = sql_query.strip().rstrip(";")
+        schema = self._execute(f"SELECT * FROM (\n{base_sql}\n) LIMIT 0", query_parameters).schema
+        summary_sql = build_summary_sql(sql_query, [_bigquery_field(field) for field in schema])
+        result = self.run_query(summary_sql, dataset_id, query_parameters, max_rows=1)
+        return {
+            "summary": unpack_summary(result["columns"], result["data"]),
+            "summary_query": summary_sql,
+            "bytes_processed": 0,
+            "cache_hit": False,
+        }
+
+    async def run_query_async(
+        self,
+        sql_query: str,
+        dataset_id: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """run_query on a worker thread (DuckDB releases the GIL while it executes)"""
+        return await asyncio.to_thread(self.run_query, sql_query, dataset_id, query_parameters, max_rows, max_bytes)
+
+    async def run_summary_query_async(
+        self,
+        sql_query: str,
+        dataset_id: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+    ) -> Dict[str, Any]:
+        """run_summary_query on a worker thread"""
+        return await asyncio.to_thread(self.run_summary_query, sql_query, dataset_id, query_parameters)
+
+    def insert_rows(self, table_id: str, rows: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Append JSON rows to ``[project.]dataset.table``, creating the table if needed.
+
+        Mirrors bigquery.Client.insert_rows_json: returns a list of errors, which
+        is always empty because a failed insert raises instead.
+        """
+        parts = table_id.split(".")
+        dataset_id = parts[-2] if len(parts) > 1 else self.dataset_id
+        if rows:
+            self._write_table(dataset_id, parts[-1], pd.DataFrame(rows), replace=False)
+        return []
+
+    def write_segments(
+        self,
+        table_id: str,
+        rows: List[Dict[str, Any]],
+        run_at: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upsert customer segment rows on (segment_id, created_at), like SegmentWriter.
+
+        Writes are immediate, so nothing is ever pending; returns the same
+        dictionary as SegmentWriter.write.
+        """
+        from .segment_writer import SEGMENT_KEY, dedupe_on_key, with_created_at
+
+        rows = dedupe_on_key(with_created_at(rows, run_at))
+        if not rows:
+            return {"rows_written": 0, "rows_pending": 0, "errors": []}
+        parts = table_id.split(".")
+        dataset_id = parts[-2] if len(parts) > 1 else self.dataset_id
+        table_ref = f'"{dataset_id}"."{parts[-1]}"'
+        df = pd.DataFrame(rows)
+        # TIMESTAMP columns hold naive UTC times
+        df["created_at"] = pd.to_datetime(df["created_at"], utc=True, format="ISO8601").dt.tz_localize(None)
+        keys = df[list(SEGMENT_KEY)]
+        with self._write_lock:
+            cursor = self.connection.cursor()
+            try:
+                cursor.register("_keys", keys)
+                cursor.execute(
+                    f"DELETE FROM {table_ref} USING _keys "
+                    f"WHERE {table_ref}.segment_id = _keys.segment_id AND {table_ref}.created_at = _keys.created_at"
+                )
+                cursor.unregister("_keys")
+            except duckdb.CatalogException:
+                # The table does not exist yet; _write_table creates it
+                pass
+            finally:
+                cursor.close()
+        self._write_table(dataset_id, parts[-1], df, replace=False)
+        return {"rows_written": len(rows), "rows_pending": 0, "errors": []}
+
+    def _execute(
+        self,
+        sql_query: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+    ) -> pa.Table:
+        local_sql = translate_sql(sql_query)
+        # DuckDB rejects bound parameters the statement does not use
+        referenced = set(re.findall(r"\$(\w+)", local_sql))
+        parameters = {param.name: param.value for param in query_parameters or [] if param.name in referenced}
+        cursor = self._cursor()
+        try:
+            result = cursor.execute(local_sql, parameters or None).fetch_arrow_table()
+        finally:
+            cursor.close()
+        for index, field in enumerate(result.schema):
+            target = _bigquery_arrow_type(field.type)
+            if target is not None:
+                result = result.set_column(index, field.name, result.column(index).cast(target))
+        return result
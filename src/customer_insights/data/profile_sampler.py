@@ -0,0 +1,95 @@
+"""Batch sampling of customer profiles for redemption and feedback generation
+
+Redemption and feedback rows each belong to a random customer. Drawing those
+customers one DataFrame.sample(1) call at a time costs an index shuffle plus a
+Series per row; ProfileSampler instead reads the profile columns into NumPy
+arrays once and draws all row indices for a batch in one call, optionally
+weighted (for example towards heavy redeemers).
+"""
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Relative redemption propensity by segment; segments not listed weigh 1.0
+HEAVY_REDEEMER_WEIGHTS: Dict[str, float] = {
+    "discount-hunter": 3.0,
+    "loyal-repeater": 2.0,
+    "value-driven-lunch-buyer": 1.5,
+}
+
+
+def segment_weights(customer_profiles: pd.DataFrame, weights_by_segment: Dict[str, float]) -> np.ndarray:
+    """Per-profile sampling weights from a segment -> weight mapping (unlisted segments weigh 1.0)"""
+    return customer_profiles["segment_id"].map(weights_by_segment).fillna(1.0).to_numpy(dtype=float)
+
+
+class ProfileSampler:
+    """
+    Draws customer profiles in batches, as column arrays.
+
+    Args:
+        customer_profiles: One row per customer (customer_id, segment_id, generation, ...)
+        weights: Optional relative sampling weight per profile row; None samples uniformly
+        rng: NumPy random generator; None uses NumPy's global random state, as
+             DataFrame.sample does, so np.random.seed still makes it reproducible
+    """
+
+    def __init__(
+        self,
+        customer_profiles: pd.DataFrame,
+        weights: Optional[Sequence[float]] = None,
+        rng: Optional[np.random.Generator] = None,
+    ):
+        if customer_profiles.empty:
+            raise ValueError("ProfileSampler requires at least one customer profile")
+        self.size = len(customer_profiles)
+        self.columns: Dict[str, np.ndarray] = {
+            column: customer_profiles[column].to_numpy() for column in customer_profiles.columns
+        }
+        self.rng = rng
+        self._cdf: Optional[np.ndarray] = None
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)
+            if len(weights) != self.size or (weights < 0).any() or weights.sum() <= 0:
+                raise ValueError("weights must be one non-negative value per profile with a positive total")
+            self._cdf = np.cumsum(weights / weights.sum())
+            self._cdf[-1] = 1.0
+        self._codes: Dict[str, np.ndarray] = {}
+
+    def sample_indices(self, size: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Draw `size` profile row indices (with replacement); `rng` overrides the sampler's generator"""
+        rng = rng if rng is not None else self.rng
+        uniforms = (rng if rng is not None else np.random).random(size)
+        if self._cdf is None:
+            return np.minimum((uniforms * self.size).astype(np.int64), self.size - 1)
+        return np.searchsorted(self._cdf, uniforms, side="right")
+
+    def sample(
+        self,
+        size: int,
+        columns: Optional[List[str]] = None,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Draw `size` profiles; returns column name -> array of the drawn values"""
+        indices = self.sample_indices(size, rng)
+        return {column: self.columns[column][indices] for column in columns or self.columns}
+
+    def codes(self, column: str, categories: List[str]) -> np.ndarray:
+        """Integer code of each profile's value in `categories` (-1 if absent), computed once per column"""
+        if column not in self._codes:
+            self._codes[column] = pd.Categorical(self.columns[column], categories=categories).codes.astype(np.int64)
+        return self._codes[column]
+
+
+def as_profile_sampler(
+    customer_profiles: Union[pd.DataFrame, ProfileSampler],
+    weights: Optional[Sequence[float]] = None,
+    rng: Optional[np.random.Generator] = None,
+) -> ProfileSampler:
+    """Wrap a profiles DataFrame in a ProfileSampler; an existing sampler is returned unchanged"""
+    if isinstance(customer_profiles, ProfileSampler):
+        if weights is not None:
+            raise ValueError("Pass weights when building the ProfileSampler, not with an existing one")
+        return customer_profiles
+    return ProfileSampler(customer_profiles, weights=weights, rng=rng)
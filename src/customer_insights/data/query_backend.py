@@ -0,0 +1,170 @@
+"""Pluggable query backend for the Customer Insights tools
+
+crm_database_tool, redemption_log_tool, feedback_database_tool and
+save_customer_segments_tool no longer talk to a ``bigquery.Client`` directly.
+They ask get_query_backend() for the process-wide backend and call its
+``run_query``, ``run_summary_query`` (and their ``_async`` variants),
+``insert_rows`` and ``write_segments`` methods, which return the same
+dictionaries whichever engine answers them.
+
+Backends (selected with CUSTOMER_INSIGHTS_QUERY_BACKEND):
+- ``bigquery`` (default): the shared BigQuery client with the result cache,
+  dry-run cost checks and rollup routing of query_runner.py
+- ``duckdb``: an in-process DuckDB database loaded with synthetic data, for
+  offline tool execution, CI and load tests (see duckdb_backend.py)
+
+Usage:
+    from customer_insights.data.query_backend import get_query_backend
+    backend = get_query_backend()
+    result = backend.run_query(sql, dataset_id)
+"""
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from google.cloud import bigquery
+
+from . import query_runner
+
+BACKEND_ENV_VAR = "CUSTOMER_INSIGHTS_QUERY_BACKEND"
+BACKENDS = ("bigquery", "duckdb")
+
+_lock = threading.Lock()
+_backends: Dict[str, Any] = {}
+_installed: Optional[Any] = None
+
+
+class BigQueryBackend:
+    """Runs tool queries on BigQuery through query_runner"""
+
+    name = "bigquery"
+
+    def __init__(self, client: Optional[bigquery.Client] = None):
+        if client is None:
+            from .bigquery_client import get_bigquery_client
+
+            client = get_bigquery_client()
+        self.client = client
+
+    @property
+    def project(self) -> str:
+        return self.client.project
+
+    def run_query(
+        self,
+        sql_query: str,
+        dataset_id: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """See query_runner.run_query"""
+        return query_runner.run_query(
+            self.client,
+            sql_query,
+            dataset_id,
+            max_rows=max_rows,
+            max_bytes=max_bytes,
+            query_parameters=query_parameters,
+        )
+
+    def run_summary_query(
+        self,
+        sql_query: str,
+        dataset_id: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+    ) -> Dict[str, Any]:
+        """See query_runner.run_summary_query"""
+        return query_runner.run_summary_query(self.client, sql_query, dataset_id, query_parameters)
+
+    async def run_query_async(
+        self,
+        sql_query: str,
+        dataset_id: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """See query_runner.run_query_async"""
+        return await query_runner.run_query_async(
+            self.client,
+            sql_query,
+            dataset_id,
+            max_rows=max_rows,
+            max_bytes=max_bytes,
+            query_parameters=query_parameters,
+        )
+
+    async def run_summary_query_async(
+        self,
+        sql_query: str,
+        dataset_id: str,
+        query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+    ) -> Dict[str, Any]:
+        """See query_runner.run_summary_query_async"""
+        return await query_runner.run_summary_query_async(self.client, sql_query, dataset_id, query_parameters)
+
+    def insert_rows(self, table_id: str, rows: List[Dict[str, Any]]) -> List[Any]:
+        """Stream JSON rows into ``project.dataset.table``; returns per-row errors (empty on success)"""
+        return self.client.insert_rows_json(table_id, rows)
+
+    def write_segments(
+        self,
+        table_id: str,
+        rows: List[Dict[str, Any]],
+        run_at: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Upsert customer segment rows through the table's shared SegmentWriter (see segment_writer.py)"""
+        from .segment_writer import get_segment_writer
+
+        return get_segment_writer(self.client, table_id).write(rows, run_at)
+
+
+def _create_backend(name: str) -> Any:
+    if name == "bigquery":
+        return BigQueryBackend()
+    # Imported lazily so the duckdb package is only needed for local runs
+    from .duckdb_backend import DuckDBBackend
+
+    return DuckDBBackend.from_environment()
+
+
+def get_query_backend(name: Optional[str] = None) -> Any:
+    """
+    Get the shared query backend.
+
+    Backends are created lazily on first use and then reused by every tool in
+    the process, like the shared BigQuery client. A backend installed with
+    set_query_backend takes precedence when no name is given.
+
+    Args:
+        name: "bigquery" or "duckdb". Defaults to CUSTOMER_INSIGHTS_QUERY_BACKEND,
+            then "bigquery".
+
+    Returns:
+        A backend exposing ``project``, ``run_query``, ``run_summary_query``,
+        ``run_query_async``, ``run_summary_query_async``, ``insert_rows`` and
+        ``write_segments``
+    """
+    if name is None and _installed is not None:
+        return _installed
+    name = (name or os.getenv(BACKEND_ENV_VAR) or "bigquery").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown query backend '{name}'; use one of {', '.join(BACKENDS)}")
+
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+    with _lock:
+        backend = _backends.get(name)
+        if backend is None:
+            backend = _create_backend(name)
+            _backends[name] = backend
+        return backend
+
+
+def set_query_backend(backend: Optional[Any]) -> None:
+    """Install a backend (e.g. a pre-loaded DuckDBBackend) for every tool; None restores the default"""
+    global _installed
+    with _lock:
+        _installed = backend
@@ -0,0 +1,189 @@
+"""LRU + TTL result cache for read-only BigQuery tool queries
+
+Entries are keyed on the normalized SQL text plus the dataset (and any query
+parameters). Each entry remembers the ``modified`` timestamp of every table it
+read, so a reload of ``crm_data`` invalidates all cached results built from it.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Quoted strings and backticked identifiers are kept verbatim during normalization
+_QUOTED_PATTERN = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside literals and drop a trailing semicolon"""
+    parts = _QUOTED_PATTERN.split(sql)
+    for i in range(0, len(parts), 2):
+        parts[i] = _WHITESPACE_PATTERN.sub(" ", parts[i])
+    normalized = "".join(parts).strip()
+    while normalized.endswith(";"):
+        normalized = normalized[:-1].rstrip()
+    return normalized
+
+
+def is_read_only_sql(sql: str) -> bool:
+    """Only SELECT / WITH statements are safe to serve from the cache"""
+    head = normalize_sql(sql).lstrip("(").upper()
+    return head.startswith("SELECT") or head.startswith("WITH")
+
+
+def make_cache_key(sql: str, dataset_id: str, params: Optional[Any] = None) -> str:
+    """Build a stable cache key from normalized SQL, dataset and parameters"""
+    payload = json.dumps(
+        {"sql": normalize_sql(sql), "dataset": dataset_id or "", "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class QueryResultCache:
+    """
+    Thread-safe result cache bounded by entry count and approximate bytes.
+
+    Least recently used entries are evicted first. Entries expire after
+    ``ttl_seconds`` and are dropped when any table they read has a newer
+    ``modified`` timestamp than the one recorded when they were stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 600.0,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, key: str, table_versions: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """
+        Return the cached value for ``key`` or None on a miss.
+
+        Args:
+            key: Cache key from make_cache_key
+            table_versions: Current ``modified`` timestamps of the tables the
+                query reads. Entries recorded with a different version are
+                treated as stale.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            if time.monotonic() - entry["stored_at"] > self.ttl_seconds:
+                self._drop(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            if table_versions:
+                for table_id, modified in entry["table_versions"].items():
+                    if table_versions.get(table_id, modified) != modified:
+                        self._drop(key)
+                        self._stats["invalidations"] += 1
+                        self._stats["misses"] += 1
+                        return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry["value"]
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        table_versions: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Store a value, evicting least recently used entries to stay in budget"""
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = {
+                "value": value,
+                "size": size,
+                "stored_at": time.monotonic(),
+                "table_versions": dict(table_versions or {}),
+            }
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._drop(oldest_key)
+                self._stats["evictions"] += 1
+
+    def invalidate_table(self, table_id: str) -> int:
+        """Drop every entry that read ``table_id``; returns the number dropped"""
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if table_id in e["table_versions"]]
+            for key in stale:
+                self._drop(key)
+            self._stats["invalidations"] += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current size"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+
+
+_query_cache: Optional[QueryResultCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryResultCache:
+    """Get the process-wide result cache configured from environment variables"""
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                _query_cache = QueryResultCache(
+                    max_entries=int(os.getenv("BQ_RESULT_CACHE_MAX_ENTRIES", "256")),
+                    max_bytes=int(os.getenv("BQ_RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+                    ttl_seconds=float(os.getenv("BQ_RESULT_CACHE_TTL_SECONDS", "600")),
+                )
+    return _query_cache
@@ -0,0 +1,606 @@
+"""Shared query execution for the Customer Insights BigQuery tools
+
+crm_database_tool, redemption_log_tool and feedback_database_tool all run their
+final SQL through run_query() so that identical read-only queries (such as the
+mandatory Gen Z cohort-size checks) are answered from the result cache instead
+of being sent to BigQuery again. Every query that does reach BigQuery is dry-run
+first and rejected when it would scan more than BQ_MAX_BYTES_BILLED. Simple
+cohort aggregates over crm_data and redemption_logs are answered from the
+precomputed rollup tables (see rollups.py) when those are up to date.
+
+The tools are async: run_query_async and run_summary_query_async submit the
+job and poll it on the event loop, so the ParallelAgent's sub-agents overlap
+their BigQuery work instead of blocking each other.
+"""
+import asyncio
+import functools
+import itertools
+import json
+import os
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from google.cloud import bigquery
+
+from .bigquery_client import get_bqstorage_client
+from .query_cache import get_query_cache, is_read_only_sql, make_cache_key
+from .result_summary import build_summary_sql, unpack_summary
+from .rollups import route_to_rollup
+
+RESULT_CACHE_ENABLED = os.getenv("BQ_RESULT_CACHE_ENABLED", "true").lower() not in {"0", "false", "no"}
+ROLLUP_ROUTING_ENABLED = os.getenv("BQ_ROLLUP_ROUTING_ENABLED", "true").lower() not in {"0", "false", "no"}
+
+# Budget for what a single tool call may hand back to the model
+MAX_RESULT_ROWS = int(os.getenv("BQ_TOOL_MAX_ROWS", "200"))
+MAX_RESULT_BYTES = int(os.getenv("BQ_TOOL_MAX_RESULT_BYTES", "60000"))
+
+# Byte ceiling for a single tool query (0 disables the guardrail). Queries whose
+# dry-run estimate exceeds it are rejected, and the real job carries it as
+# maximum_bytes_billed so BigQuery enforces it too.
+MAX_BYTES_BILLED = int(os.getenv("BQ_MAX_BYTES_BILLED", str(1024 ** 3)))
+
+# How long a table's ``modified`` timestamp is trusted before get_table is called again
+TABLE_VERSION_CHECK_SECONDS = float(os.getenv("BQ_RESULT_CACHE_VALIDATION_SECONDS", "30"))
+
+# Async tools: BigQuery jobs in flight per event loop, and the job status poll interval
+ASYNC_MAX_CONCURRENT_QUERIES = int(os.getenv("BQ_ASYNC_MAX_CONCURRENT_QUERIES", "8"))
+ASYNC_POLL_INITIAL_SECONDS = float(os.getenv("BQ_ASYNC_POLL_INITIAL_SECONDS", "0.1"))
+ASYNC_POLL_MAX_SECONDS = float(os.getenv("BQ_ASYNC_POLL_MAX_SECONDS", "1.0"))
+
+_TABLE_REF_PATTERN = re.compile(r"`([\w-]+(?:\.[\w-]+){1,2})`")
+
+_table_versions: Dict[str, Tuple[float, Any]] = {}
+_table_versions_lock = threading.Lock()
+
+# The client library is blocking; its short HTTP calls (job insert, status,
+# result download) run here so they never occupy the event loop or its default executor
+_io_executor = ThreadPoolExecutor(
+    max_workers=2 * ASYNC_MAX_CONCURRENT_QUERIES,
+    thread_name_prefix="bigquery-io",
+)
+_query_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+_cost_lock = threading.Lock()
+_cost_stats = {
+    "dry_runs": 0,
+    "queries_rejected": 0,
+    "bytes_estimated": 0,
+    "bytes_billed": 0,
+}
+
+
+class QueryCostError(Exception):
+    """Raised when a query's dry-run estimate exceeds the byte ceiling"""
+
+    def __init__(self, bytes_processed: int, max_bytes_billed: int):
+        self.bytes_processed = bytes_processed
+        self.max_bytes_billed = max_bytes_billed
+        super().__init__(
+            f"Query would scan {format_bytes(bytes_processed)}, above the "
+            f"{format_bytes(max_bytes_billed)} limit. Select only the columns you need, "
+            "filter on time_period/visit_date, or aggregate in SQL, then try again."
+        )
+
+
+def format_bytes(num_bytes: int) -> str:
+    """Human-readable byte count (e.g. 1.5 GiB)"""
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    size = float(num_bytes)
+    for unit in ("KiB", "MiB", "GiB"):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} TiB"
+
+
+def referenced_tables(sql_query: str, project_id: str) -> List[str]:
+    """Extract fully-qualified table IDs from backticked references in the SQL"""
+    tables = set()
+    for reference in _TABLE_REF_PATTERN.findall(sql_query):
+        parts = reference.split(".")
+        if len(parts) == 2:
+            parts = [project_id] + parts
+        tables.add(".".join(parts))
+    return sorted(tables)
+
+
+def resolve_rollup(client: bigquery.Client, sql_query: str, dataset_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Find a rollup that can answer the query, if it is at least as fresh as its source.
+
+    Freshness is judged from the tables' ``modified`` timestamps: a rollup that
+    has not been refreshed since its source last changed is not used.
+    """
+    rollup = route_to_rollup(sql_query, client.project, dataset_id)
+    if rollup is None:
+        return None
+    versions = get_table_versions(client, [rollup["source_table_id"], rollup["rollup_table_id"]])
+    source_modified = versions[rollup["source_table_id"]]
+    rollup_modified = versions[rollup["rollup_table_id"]]
+    if source_modified is None or rollup_modified is None or rollup_modified < source_modified:
+        return None
+    return rollup
+
+
+def get_table_versions(client: bigquery.Client, table_ids: List[str]) -> Dict[str, Any]:
+    """Look up (and briefly memoize) the ``modified`` timestamp of each table"""
+    now = time.monotonic()
+    versions: Dict[str, Any] = {}
+    for table_id in table_ids:
+        with _table_versions_lock:
+            checked = _table_versions.get(table_id)
+        if checked and now - checked[0] < TABLE_VERSION_CHECK_SECONDS:
+            versions[table_id] = checked[1]
+            continue
+        try:
+            modified = client.get_table(table_id).modified
+        except Exception:
+            modified = None
+        with _table_versions_lock:
+            _table_versions[table_id] = (now, modified)
+        versions[table_id] = modified
+    return versions
+
+
+def results_to_columns(
+    results: Any,
+    bqstorage_client: Optional[Any] = None,
+    max_rows: Optional[int] = None,
+) -> Dict[str, List[Any]]:
+    """
+    Convert a query RowIterator into a columnar ``{column: [values]}`` mapping.
+
+    Results are downloaded as an Arrow table (through the Storage Read API when
+    a read client is available and the result is large) and converted column
+    by column, avoiding per-cell Python work. With ``max_rows``, the download
+    stops once that many rows have arrived and the table is sliced to them.
+    Falls back to iterating rows when pyarrow is not installed.
+    """
+    columns = [field.name for field in results.schema]
+    try:
+        if max_rows is None or (results.total_rows is not None and results.total_rows <= max_rows):
+            arrow_table = results.to_arrow(
+                bqstorage_client=bqstorage_client,
+                create_bqstorage_client=False,
+            )
+        else:
+            arrow_table = _head_arrow(results, bqstorage_client, max_rows)
+    except (ValueError, ImportError):
+        # pyarrow is not installed
+        values = [tuple(row.values()) for row in itertools.islice(results, max_rows)]
+        return {col: [row[i] for row in values] for i, col in enumerate(columns)}
+    return arrow_table.to_pydict()
+
+
+def _head_arrow(results: Any, bqstorage_client: Optional[Any], max_rows: int) -> Any:
+    """First max_rows rows of a result as an Arrow table, abandoning the download after them"""
+    import pyarrow as pa
+
+    batches, row_count = [], 0
+    for batch in results.to_arrow_iterable(bqstorage_client=bqstorage_client):
+        batches.append(batch)
+        row_count += batch.num_rows
+        if row_count >= max_rows:
+            break
+    if not batches:
+        return results.to_arrow(bqstorage_client=bqstorage_client, create_bqstorage_client=False)
+    return pa.Table.from_batches(batches).slice(0, max_rows)
+
+
+def columns_to_rows(columns: List[str], data: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Expand a columnar result into row dictionaries (only when rows are needed)"""
+    return [dict(zip(columns, values)) for values in zip(*(data[col] for col in columns))]
+
+
+def _parameter_values(
+    query_parameters: Optional[List[bigquery.ScalarQueryParameter]],
+) -> List[Tuple[str, str, Any]]:
+    return sorted((param.name, param.type_, param.value) for param in query_parameters or [])
+
+
+def _json_size(data: Dict[str, List[Any]]) -> int:
+    return len(json.dumps(data, default=str))
+
+
+def apply_byte_budget(
+    data: Dict[str, List[Any]],
+    row_count: int,
+    max_bytes: int,
+) -> Tuple[Dict[str, List[Any]], int]:
+    """Drop trailing rows until the serialized result fits within max_bytes"""
+    size = _json_size(data)
+    keep = row_count
+    while keep > 0 and size > max_bytes:
+        keep = min(keep - 1, int(keep * max_bytes / size))
+        data = {col: values[:keep] for col, values in data.items()}
+        size = _json_size(data)
+    return data, keep
+
+
+def format_result(result: Dict[str, Any], result_format: str = "columnar") -> Dict[str, Any]:
+    """
+    Shape a run_query result for a tool response.
+
+    ``columnar`` (default) returns ``data`` as column name -> list of values,
+    which is far more compact for the model. ``rows`` expands the result into a
+    list of row dictionaries for callers that need per-row records. Truncation
+    by the row or byte budget is always reported explicitly.
+    """
+    payload: Dict[str, Any] = {
+        "columns": result["columns"],
+        "row_count": result["row_count"],
+        "total_rows": result["total_rows"],
+        "truncated": result["truncated"],
+    }
+    if result.get("rollup"):
+        payload["rollup"] = result["rollup"]
+    if result["truncated"]:
+        payload["truncation_note"] = (
+            f"Returned {result['row_count']} of {result['total_rows']} rows "
+            f"(limit: {result['truncation_reason']}). Aggregate in SQL or use mode='summary' "
+            "to see the full result set."
+        )
+    if result_format == "rows":
+        payload["rows"] = columns_to_rows(result["columns"], result["data"])
+        payload["result_format"] = "rows"
+    else:
+        payload["data"] = result["data"]
+        payload["result_format"] = "columnar"
+    return payload
+
+
+def dry_run_query(
+    client: bigquery.Client,
+    sql_query: str,
+    query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+) -> bigquery.QueryJob:
+    """
+    Validate a query without running it.
+
+    The returned job carries the result schema and ``total_bytes_processed``,
+    BigQuery's estimate of the bytes the query would scan (dry runs are free).
+    """
+    job_config = bigquery.QueryJobConfig(
+        dry_run=True,
+        use_query_cache=False,
+        query_parameters=query_parameters or [],
+    )
+    query_job = client.query(sql_query, job_config=job_config)
+    with _cost_lock:
+        _cost_stats["dry_runs"] += 1
+        _cost_stats["bytes_estimated"] += query_job.total_bytes_processed or 0
+    return query_job
+
+
+def check_query_cost(
+    client: bigquery.Client,
+    sql_query: str,
+    max_bytes_billed: Optional[int] = None,
+    query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+) -> int:
+    """
+    Dry-run a query and enforce the byte ceiling.
+
+    Args:
+        client: Shared BigQuery client
+        sql_query: SQL statement to check
+        max_bytes_billed: Byte ceiling (defaults to BQ_MAX_BYTES_BILLED; 0 disables)
+        query_parameters: Bound parameters for a parameterized query
+
+    Returns:
+        The estimated bytes processed
+
+    Raises:
+        QueryCostError: If the estimate exceeds the ceiling
+    """
+    max_bytes_billed = MAX_BYTES_BILLED if max_bytes_billed is None else max_bytes_billed
+    bytes_processed = dry_run_query(client, sql_query, query_parameters).total_bytes_processed or 0
+    if max_bytes_billed and bytes_processed > max_bytes_billed:
+        with _cost_lock:
+            _cost_stats["queries_rejected"] += 1
+        raise QueryCostError(bytes_processed, max_bytes_billed)
+    return bytes_processed
+
+
+def get_query_cost_stats() -> Dict[str, Any]:
+    """Dry-run, rejection and bytes counters since process start"""
+    with _cost_lock:
+        return {**_cost_stats, "max_bytes_billed": MAX_BYTES_BILLED}
+
+
+def run_query(
+    client: bigquery.Client,
+    sql_query: str,
+    dataset_id: str,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    max_bytes_billed: Optional[int] = None,
+    query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+) -> Dict[str, Any]:
+    """
+    Execute a tool query, serving identical read-only repeats from the cache.
+
+    Aggregate queries that a fresh rollup table can answer are rewritten to
+    read the rollup instead. Queries that miss the cache are dry-run first and rejected with
+    QueryCostError when the scan estimate exceeds ``max_bytes_billed``; the
+    real job also carries the ceiling as ``maximum_bytes_billed``.
+
+    At most ``max_rows`` rows are downloaded and the returned data is trimmed
+    to ``max_bytes`` of JSON, so a runaway SELECT cannot flood the model
+    context. The full result size is still reported in ``total_rows``.
+
+    Args:
+        client: Shared BigQuery client
+        sql_query: Final SQL statement to execute
+        dataset_id: Dataset the tool targeted (part of the cache key)
+        max_rows: Row budget (defaults to BQ_TOOL_MAX_ROWS)
+        max_bytes: Serialized size budget (defaults to BQ_TOOL_MAX_RESULT_BYTES)
+        max_bytes_billed: Scan ceiling in bytes (defaults to BQ_MAX_BYTES_BILLED; 0 disables)
+        query_parameters: Bound parameters for a parameterized (template) query;
+            they are part of the cache key
+
+    Returns:
+        Dictionary containing:
+        - columns: Column names
+        - data: Columnar results (column name -> list of values)
+        - row_count: Number of rows returned
+        - total_rows: Number of rows the query produced
+        - truncated: Whether rows were dropped to fit the budget
+        - truncation_reason: "max_rows" or "max_bytes" when truncated
+        - bytes_processed: Dry-run scan estimate for the query
+        - rollup: Rollup name, rewritten SQL and whether counts are approximate (None if not routed)
+        - cache_hit: Whether the result came from the result cache
+
+    Raises:
+        QueryCostError: If the dry-run estimate exceeds the byte ceiling
+    """
+    max_rows = MAX_RESULT_ROWS if max_rows is None else max_rows
+    max_bytes = MAX_RESULT_BYTES if max_bytes is None else max_bytes
+    max_bytes_billed = MAX_BYTES_BILLED if max_bytes_billed is None else max_bytes_billed
+
+    plan = _plan_query(client, sql_query, dataset_id, max_rows, query_parameters)
+    if plan["cached"] is not None:
+        fetched = _copy_cached(plan["cached"])
+    else:
+        bytes_processed = check_query_cost(client, plan["sql"], max_bytes_billed, query_parameters)
+        query_job = client.query(plan["sql"], job_config=_job_config(max_bytes_billed, query_parameters))
+        fetched = _collect_results(client, plan, query_job, max_rows, bytes_processed)
+    return _finish_result(plan, fetched, max_bytes)
+
+
+def _plan_query(
+    client: bigquery.Client,
+    sql_query: str,
+    dataset_id: str,
+    max_rows: int,
+    query_parameters: Optional[List[bigquery.ScalarQueryParameter]],
+) -> Dict[str, Any]:
+    """Route to a rollup and look the query up in the result cache"""
+    rollup = resolve_rollup(client, sql_query, dataset_id) if ROLLUP_ROUTING_ENABLED else None
+    if rollup is not None:
+        sql_query = rollup["sql"]
+
+    plan: Dict[str, Any] = {
+        "sql": sql_query,
+        "rollup": rollup,
+        "cacheable": RESULT_CACHE_ENABLED and is_read_only_sql(sql_query),
+        "cached": None,
+    }
+    if plan["cacheable"]:
+        plan["cache_key"] = make_cache_key(
+            sql_query,
+            dataset_id,
+            {"max_rows": max_rows, "query_parameters": _parameter_values(query_parameters)},
+        )
+        plan["table_versions"] = get_table_versions(client, referenced_tables(sql_query, client.project))
+        plan["cached"] = get_query_cache().get(plan["cache_key"], plan["table_versions"])
+    return plan
+
+
+def _job_config(
+    max_bytes_billed: int,
+    query_parameters: Optional[List[bigquery.ScalarQueryParameter]],
+) -> bigquery.QueryJobConfig:
+    return bigquery.QueryJobConfig(
+        maximum_bytes_billed=max_bytes_billed or None,
+        query_parameters=query_parameters or [],
+    )
+
+
+def _copy_cached(cached: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "columns": list(cached["columns"]),
+        "data": {col: list(values) for col, values in cached["data"].items()},
+        "row_count": cached["row_count"],
+        "total_rows": cached["total_rows"],
+        "bytes_processed": cached["bytes_processed"],
+    }
+
+
+def _collect_results(
+    client: bigquery.Client,
+    plan: Dict[str, Any],
+    query_job: bigquery.QueryJob,
+    max_rows: int,
+    bytes_processed: int,
+) -> Dict[str, Any]:
+    """Download at most max_rows rows of a job's result and store it in the result cache"""
+    # Not max_results: the client library never uses the Storage Read API for a
+    # capped RowIterator. page_size keeps the first REST page to the row budget;
+    # larger results stream through Storage Read and stop after max_rows.
+    results = query_job.result(page_size=max_rows)
+    with _cost_lock:
+        _cost_stats["bytes_billed"] += query_job.total_bytes_billed or 0
+
+    columns = [field.name for field in results.schema]
+    data = results_to_columns(results, get_bqstorage_client(client), max_rows=max_rows)
+    row_count = len(data[columns[0]]) if columns else 0
+    fetched = {
+        "columns": columns,
+        "data": data,
+        "row_count": row_count,
+        "total_rows": results.total_rows if results.total_rows is not None else row_count,
+        "bytes_processed": bytes_processed,
+    }
+    if plan["cacheable"]:
+        get_query_cache().put(plan["cache_key"], fetched, plan["table_versions"])
+        # The cache keeps its own copy of the lists; byte budgeting trims ours
+        fetched = _copy_cached(fetched)
+    return fetched
+
+
+def _finish_result(plan: Dict[str, Any], fetched: Dict[str, Any], max_bytes: int) -> Dict[str, Any]:
+    """Apply the row and byte budgets and build run_query's result dictionary"""
+    row_count = fetched["row_count"]
+    total_rows = fetched["total_rows"]
+    truncation_reason = "max_rows" if total_rows > row_count else None
+    data, budget_rows = apply_byte_budget(fetched["data"], row_count, max_bytes)
+    if budget_rows < row_count:
+        truncation_reason = "max_bytes"
+        row_count = budget_rows
+
+    rollup = plan["rollup"]
+    return {
+        "columns": fetched["columns"],
+        "data": data,
+        "row_count": row_count,
+        "total_rows": total_rows,
+        "truncated": truncation_reason is not None,
+        "truncation_reason": truncation_reason,
+        "bytes_processed": fetched["bytes_processed"],
+        "rollup": (
+            {"name": rollup["rollup"], "sql": rollup["sql"], "approximate": rollup["approximate"]}
+            if rollup else None
+        ),
+        "cache_hit": plan["cached"] is not None,
+    }
+
+
+def run_summary_query(
+    client: bigquery.Client,
+    sql_query: str,
+    dataset_id: str,
+    query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+) -> Dict[str, Any]:
+    """
+    Summarize a query's full result set server-side instead of returning rows.
+
+    The query is dry-run to learn its result schema, then wrapped by
+    build_summary_sql so BigQuery computes counts, averages, percentiles and
+    top-k values per column.
+
+    Returns:
+        Dictionary containing:
+        - summary: {"row_count": n, "columns": {column: {stat: value}}}
+        - summary_query: The aggregation SQL that was executed
+        - bytes_processed: Dry-run scan estimate for the summary query
+        - cache_hit: Whether the summary came from the result cache
+    """
+    schema = dry_run_query(client, sql_query, query_parameters).schema or []
+    summary_sql = build_summary_sql(sql_query, schema)
+    result = run_query(client, summary_sql, dataset_id, max_rows=1, query_parameters=query_parameters)
+    return {
+        "summary": unpack_summary(result["columns"], result["data"]),
+        "summary_query": summary_sql,
+        "bytes_processed": result["bytes_processed"],
+        "cache_hit": result["cache_hit"],
+    }
+
+
+async def _in_io_thread(function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, functools.partial(function, *args, **kwargs))
+
+
+def _query_semaphore() -> asyncio.Semaphore:
+    """The running event loop's bound on concurrent BigQuery jobs"""
+    loop = asyncio.get_running_loop()
+    semaphore = _query_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(ASYNC_MAX_CONCURRENT_QUERIES)
+        _query_semaphores[loop] = semaphore
+    return semaphore
+
+
+async def wait_for_job(query_job: bigquery.QueryJob) -> None:
+    """Poll a job until it finishes, sleeping on the event loop between status checks"""
+    interval = ASYNC_POLL_INITIAL_SECONDS
+    while not await _in_io_thread(query_job.done):
+        await asyncio.sleep(interval)
+        interval = min(interval * 2, ASYNC_POLL_MAX_SECONDS)
+
+
+async def run_query_async(
+    client: bigquery.Client,
+    sql_query: str,
+    dataset_id: str,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    max_bytes_billed: Optional[int] = None,
+    query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+) -> Dict[str, Any]:
+    """
+    Async run_query: the same caching, rollup routing, cost check and budgets.
+
+    The job is submitted without waiting for it and polled with asyncio
+    sleeps, so other coroutines (parallel sub-agents) run while BigQuery
+    works. At most BQ_ASYNC_MAX_CONCURRENT_QUERIES queries per event loop
+    are in flight; further calls wait for a slot.
+    """
+    max_rows = MAX_RESULT_ROWS if max_rows is None else max_rows
+    max_bytes = MAX_RESULT_BYTES if max_bytes is None else max_bytes
+    max_bytes_billed = MAX_BYTES_BILLED if max_bytes_billed is None else max_bytes_billed
+
+    async with _query_semaphore():
+        plan = await _in_io_thread(_plan_query, client, sql_query, dataset_id, max_rows, query_parameters)
+        if plan["cached"] is not None:
+            fetched = _copy_cached(plan["cached"])
+        else:
+            bytes_processed = await _in_io_thread(
+                check_query_cost, client, plan["sql"], max_bytes_billed, query_parameters
+            )
+            query_job = await _in_io_thread(
+                client.query, plan["sql"], job_config=_job_config(max_bytes_billed, query_parameters)
+            )
+            await wait_for_job(query_job)
+            fetched = await _in_io_thread(_collect_results, client, plan, query_job, max_rows, bytes_processed)
+    return _finish_result(plan, fetched, max_bytes)
+
+
+async def run_summary_query_async(
+    client: bigquery.Client,
+    sql_query: str,
+    dataset_id: str,
+    query_parameters: Optional[List[bigquery.ScalarQueryParameter]] = None,
+) -> Dict[str, Any]:
+    """Async run_summary_query; returns the same dictionary"""
+    dry_run = await _in_io_thread(dry_run_query, client, sql_query, query_parameters)
+    summary_sql = build_summary_sql(sql_query, dry_run.schema or [])
+    result = await run_query_async(client, summary_sql, dataset_id, max_rows=1, query_parameters=query_parameters)
+    return {
+        "summary": unpack_summary(result["columns"], result["data"]),
+        "summary_query": summary_sql,
+        "bytes_processed": result["bytes_processed"],
+        "cache_hit": result["cache_hit"],
+    }
+
+
+def run_blocking(tool_function: Callable[..., Awaitable[Any]]) -> Callable[..., Any]:
+    """
+    Blocking wrapper of an async tool, for scripts and other callers without an event loop.
+
+    Must not be called from a running event loop; await the tool there instead.
+    """
+    @functools.wraps(tool_function)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        return asyncio.run(tool_function(*args, **kwargs))
+
+    return run
+
@@ -0,0 +1,345 @@
+"""Named, parameterized query templates for the Customer Insights tools
+
+The natural-language fallbacks in the BigQuery tools used to interpolate the
+whole request into ``LIKE '%...%'`` predicates, which scanned every row and
+produced a different SQL string per request. Instead, they now pick one of the
+templates below and bind the filters they recognize as query parameters. The
+SQL text of a template never changes, so the same logical question always maps
+to the same (SQL, parameters) pair and is answered from BigQuery's cache and
+our own result cache.
+
+Optional filters are written as ``(@param IS NULL OR column = @param)`` so a
+template runs with any subset of its parameters bound.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.cloud import bigquery
+
+from .synthetic_data_generator import (
+    CHANNELS,
+    DAYPART_HOURS,
+    OFFER_TYPES,
+    REFERENCE_YEAR,
+    SEGMENTS,
+)
+
+# BigQuery parameter type for every filter a template can take
+PARAMETER_TYPES = {
+    "segment_id": "STRING",
+    "offer_type": "STRING",
+    "channel": "STRING",
+    "time_period": "STRING",
+    "daypart": "STRING",
+    "is_gen_z": "BOOL",
+}
+
+QUERY_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "segment_summary": {
+        "description": "Visits, customers and spend per segment",
+        "table": "crm_data",
+        "parameters": ["segment_id", "channel", "time_period", "daypart", "is_gen_z"],
+        "keywords": [],
+        "sql": """
+SELECT
+    segment_id,
+    COUNT(*) AS visits,
+    COUNT(DISTINCT customer_id) AS unique_customers,
+    AVG(spend) AS avg_spend,
+    SUM(spend) AS total_spend
+FROM {table}
+WHERE (@segment_id IS NULL OR segment_id = @segment_id)
+    AND (@channel IS NULL OR channel = @channel)
+    AND (@time_period IS NULL OR time_period = @time_period)
+    AND (@daypart IS NULL OR visit_daypart = @daypart)
+    AND (@is_gen_z IS NULL OR is_gen_z = @is_gen_z)
+GROUP BY segment_id
+ORDER BY visits DESC
+""",
+    },
+    "cohort_comparison": {
+        "description": "Gen Z vs non-Gen Z visits, customers and spend",
+        "table": "crm_data",
+        "parameters": ["segment_id", "channel", "time_period", "daypart"],
+        "keywords": ["compare", "comparison", " vs", "versus", "cohort", "non-gen z", "non gen z"],
+        "sql": """
+SELECT
+    IF(is_gen_z, 'Gen Z', 'Non-Gen Z') AS cohort,
+    COUNT(*) AS visits,
+    COUNT(DISTINCT customer_id) AS unique_customers,
+    SAFE_DIVIDE(COUNT(*), COUNT(DISTINCT customer_id)) AS visits_per_customer,
+    AVG(spend) AS avg_spend
+FROM {table}
+WHERE (@segment_id IS NULL OR segment_id = @segment_id)
+    AND (@channel IS NULL OR channel = @channel)
+    AND (@time_period IS NULL OR time_period = @time_period)
+    AND (@daypart IS NULL OR visit_daypart = @daypart)
+GROUP BY cohort
+ORDER BY cohort
+""",
+    },
+    "daypart_breakdown": {
+        "description": "Visits and spend per daypart",
+        "table": "crm_data",
+        "parameters": ["segment_id", "channel", "time_period", "is_gen_z"],
+        "keywords": ["daypart", "time of day", "by hour"],
+        "sql": """
+SELECT
+    visit_daypart,
+    COUNT(*) AS visits,
+    COUNT(DISTINCT customer_id) AS unique_customers,
+    AVG(spend) AS avg_spend
+FROM {table}
+WHERE (@segment_id IS NULL OR segment_id = @segment_id)
+    AND (@channel IS NULL OR channel = @channel)
+    AND (@time_period IS NULL OR time_period = @time_period)
+    AND (@is_gen_z IS NULL OR is_gen_z = @is_gen_z)
+GROUP BY visit_daypart
+ORDER BY visits DESC
+""",
+    },
+    "transaction_summary": {
+        "description": "Transactions, customers and spend per channel and redeemed offer type",
+        "table": "customer_transactions_raw",
+        "parameters": ["segment_id", "offer_type", "channel", "time_period", "daypart", "is_gen_z"],
+        "keywords": [],
+        "sql": """
+SELECT
+    channel,
+    offer_type,
+    COUNT(*) AS transactions,
+    COUNT(DISTINCT customer_id) AS unique_customers,
+    AVG(total_spend) AS avg_spend
+FROM {table}
+WHERE (@segment_id IS NULL OR segment_id = @segment_id)
+    AND (@offer_type IS NULL OR offer_type = @offer_type)
+    AND (@channel IS NULL OR channel = @channel)
+    AND (@time_period IS NULL OR time_period = @time_period)
+    AND (@daypart IS NULL OR visit_daypart = @daypart)
+    AND (@is_gen_z IS NULL OR is_gen_z = @is_gen_z)
+GROUP BY channel, offer_type
+ORDER BY transactions DESC
+""",
+    },
+    "offer_lift_by_channel": {
+        "description": "Average lift, redemptions and value per offer type and channel",
+        "table": "redemption_logs",
+        "parameters": ["segment_id", "offer_type", "channel", "time_period", "daypart", "is_gen_z"],
+        "keywords": [],
+        "sql": """
+SELECT
+    offer_type,
+    channel,
+    AVG(lift_multiplier) AS avg_lift,
+    COUNT(*) AS redemption_count,
+    COUNT(DISTINCT customer_id) AS unique_customers,
+    AVG(redemption_value) AS avg_redemption_value
+FROM {table}
+WHERE (@segment_id IS NULL OR segment_id = @segment_id)
+    AND (@offer_type IS NULL OR offer_type = @offer_type)
+    AND (@channel IS NULL OR channel = @channel)
+    AND (@time_period IS NULL OR time_period = @time_period)
+    AND (@daypart IS NULL OR daypart = @daypart)
+    AND (@is_gen_z IS NULL OR is_gen_z = @is_gen_z)
+GROUP BY offer_type, channel
+ORDER BY avg_lift DESC
+""",
+    },
+    "feedback_sentiment": {
+        "description": "Structured reviews with sentiment scores and key phrases",
+        "table": "feedback_data",
+        "parameters": ["segment_id", "offer_type", "channel", "time_period", "daypart", "is_gen_z"],
+        "keywords": [],
+        "sql": """
+SELECT
+    feedback_id,
+    segment_id,
+    offer_type,
+    review_text,
+    sentiment_score,
+    key_phrases,
+    source,
+    channel
+FROM {table}
+WHERE (@segment_id IS NULL OR segment_id = @segment_id)
+    AND (@offer_type IS NULL OR offer_type = @offer_type)
+    AND (@channel IS NULL OR channel = @channel)
+    AND (@time_period IS NULL OR time_period = @time_period)
+    AND (@daypart IS NULL OR daypart = @daypart)
+    AND (@is_gen_z IS NULL OR is_gen_z = @is_gen_z)
+ORDER BY sentiment_score DESC
+{row_limit}
+""",
+    },
+    "feedback_verbatims": {
+        "description": "Raw feedback text with ratings",
+        "table": "customer_feedback_raw",
+        "parameters": ["segment_id", "channel", "time_period", "daypart", "is_gen_z"],
+        "keywords": [],
+        "sql": """
+SELECT
+    feedback_id,
+    customer_id,
+    feedback_date,
+    rating,
+    feedback_text,
+    channel
+FROM {table}
+WHERE (@segment_id IS NULL OR segment_id = @segment_id)
+    AND (@channel IS NULL OR channel = @channel)
+    AND (@time_period IS NULL OR time_period = @time_period)
+    AND (@daypart IS NULL OR daypart = @daypart)
+    AND (@is_gen_z IS NULL OR is_gen_z = @is_gen_z)
+ORDER BY rating DESC, feedback_date DESC
+{row_limit}
+""",
+    },
+}
+
+_YEAR_QUARTER_PATTERN = re.compile(r"\b(?P<year>20\d\d)[\s-]?q(?P<quarter>[1-4])\b")
+_QUARTER_YEAR_PATTERN = re.compile(r"\bq(?P<quarter>[1-4])[\s-]?(?P<year>20\d\d)\b")
+_QUARTER_PATTERN = re.compile(r"\bq(?P<quarter>[1-4])\b")
+_NON_GEN_Z_PATTERN = re.compile(r"\b(?:non|not)[\s-]?gen[\s-]?z\b")
+_GEN_Z_PATTERN = re.compile(r"\bgen[\s-]?z\b")
+
+
+def _contains_phrase(text: str, phrase: str) -> bool:
+    """Whole-word match that treats hyphens and spaces alike"""
+    words = re.split(r"[\s-]+", phrase.lower())
+    pattern = r"\b" + r"[\s-]?".join(re.escape(word) for word in words) + r"\b"
+    return re.search(pattern, text) is not None
+
+
+def extract_parameters(text: str) -> Dict[str, Any]:
+    """
+    Pull template filters out of a natural-language request.
+
+    Only values that exist in the data (segments, offer types, channels,
+    dayparts, quarters) are recognized; everything else in the text is ignored.
+    """
+    text = text.lower()
+    params: Dict[str, Any] = {}
+
+    for segment in SEGMENTS:
+        if _contains_phrase(text, segment):
+            params["segment_id"] = segment
+            break
+
+    for offer_type in OFFER_TYPES:
+        if _contains_phrase(text, offer_type):
+            params["offer_type"] = offer_type
+            break
+
+    # "App Exclusive" is an offer type, not a request to filter on the app channel
+    channel_text = re.sub(r"\bapp[\s-]?exclusive\b", " ", text)
+    for channel in CHANNELS:
+        if _contains_phrase(channel_text, channel) or (
+            channel == "drive-thru" and _contains_phrase(channel_text, "drive-through")
+        ):
+            params["channel"] = channel
+            break
+
+    for daypart in DAYPART_HOURS:
+        if _contains_phrase(text, daypart):
+            params["daypart"] = daypart
+            break
+
+    for pattern in (_YEAR_QUARTER_PATTERN, _QUARTER_YEAR_PATTERN, _QUARTER_PATTERN):
+        match = pattern.search(text)
+        if match:
+            year = match.groupdict().get("year") or REFERENCE_YEAR
+            params["time_period"] = f"{year}-Q{match.group('quarter')}"
+            break
+
+    if _NON_GEN_Z_PATTERN.search(text):
+        params["is_gen_z"] = False
+    elif _GEN_Z_PATTERN.search(text):
+        params["is_gen_z"] = True
+
+    return params
+
+
+def match_template(text: str, table_name: str) -> Optional[str]:
+    """
+    Pick the template for a natural-language request against ``table_name``.
+
+    A template whose keywords appear in the text wins; otherwise the table's
+    first template (which has no keywords) is used. Returns None when no
+    template reads from the table.
+    """
+    text = f" {text.lower()}"
+    candidates = [name for name, template in QUERY_TEMPLATES.items() if template["table"] == table_name]
+    for name in candidates:
+        if any(keyword in text for keyword in QUERY_TEMPLATES[name]["keywords"]):
+            return name
+    return candidates[0] if candidates else None
+
+
+def render_template(
+    name: str,
+    project_id: str,
+    dataset_id: str,
+    params: Optional[Dict[str, Any]] = None,
+    row_limit: str = "LIMIT 100",
+) -> Tuple[str, List[bigquery.ScalarQueryParameter]]:
+    """
+    Build the SQL and bound parameters for a named template.
+
+    Every parameter the template declares is bound (NULL when not supplied),
+    so the SQL text is identical for every call of the same template.
+
+    Args:
+        name: Template name from QUERY_TEMPLATES
+        project_id: GCP project ID
+        dataset_id: BigQuery dataset ID
+        params: Filter values keyed by parameter name; unknown keys are ignored
+        row_limit: LIMIT clause for row-returning templates ("" for none)
+
+    Returns:
+        Tuple of (sql, query_parameters)
+    """
+    if name not in QUERY_TEMPLATES:
+        raise ValueError(f"Unknown query template '{name}'. Available: {', '.join(QUERY_TEMPLATES)}")
+
+    template = QUERY_TEMPLATES[name]
+    params = params or {}
+    sql_query = template["sql"].format(
+        table=f"`{project_id}.{dataset_id}.{template['table']}`",
+        row_limit=row_limit,
+    ).strip()
+    query_parameters = [
+        bigquery.ScalarQueryParameter(param, PARAMETER_TYPES[param], params.get(param))
+        for param in template["parameters"]
+    ]
+    return sql_query, query_parameters
+
+
+def template_query_from_text(
+    text: str,
+    table_name: str,
+    project_id: str,
+    dataset_id: str,
+    row_limit: str = "LIMIT 100",
+) -> Optional[Dict[str, Any]]:
+    """
+    Translate a natural-language request into a parameterized template query.
+
+    Returns:
+        None when no template reads from ``table_name``, otherwise a dictionary containing:
+        - template: Name of the selected template
+        - sql: Template SQL
+        - query_parameters: Bound ScalarQueryParameters
+        - parameters: The filter values that were recognized in the text
+    """
+    name = match_template(text, table_name)
+    if name is None:
+        return None
+    declared = QUERY_TEMPLATES[name]["parameters"]
+    params = {key: value for key, value in extract_parameters(text).items() if key in declared}
+    sql_query, query_parameters = render_template(name, project_id, dataset_id, params, row_limit)
+    return {
+        "template": name,
+        "sql": sql_query,
+        "query_parameters": query_parameters,
+        "parameters": params,
+    }
@@ -0,0 +1,120 @@
+"""Server-side summary aggregation for Customer Insights tool queries
+
+In summary mode the tools never ship raw rows to the model. The tool's SQL is
+wrapped as a CTE and BigQuery computes per-column aggregates instead:
+
+- numeric columns: count, avg, min, max and p25/p50/p75/p90
+- string columns: distinct count and the top-k values with counts
+- repeated string columns (e.g. key_phrases): top-k values across all arrays
+- boolean columns: count of TRUE values
+- date/time columns: min and max
+
+The single summary row is unpacked into ``{column: {stat: value}}``.
+"""
+import os
+from typing import Any, Dict, List
+
+SUMMARY_TOP_K = int(os.getenv("BQ_SUMMARY_TOP_K", "5"))
+
+NUMERIC_TYPES = {"INTEGER", "INT64", "FLOAT", "FLOAT64", "NUMERIC", "BIGNUMERIC"}
+STRING_TYPES = {"STRING"}
+BOOLEAN_TYPES = {"BOOLEAN", "BOOL"}
+TEMPORAL_TYPES = {"TIMESTAMP", "DATE", "DATETIME", "TIME"}
+
+# APPROX_QUANTILES(x, 20) returns 21 boundaries; these offsets are p25/p50/p75/p90
+_QUANTILE_BUCKETS = 20
+_PERCENTILE_OFFSETS = {"p25": 5, "p50": 10, "p75": 15, "p90": 18}
+
+_SEPARATOR = "__"
+
+
+def _strip_trailing_semicolon(sql_query: str) -> str:
+    sql_query = sql_query.strip()
+    while sql_query.endswith(";"):
+        sql_query = sql_query[:-1].rstrip()
+    return sql_query
+
+
+def build_summary_sql(sql_query: str, schema: List[Any], top_k: int = SUMMARY_TOP_K) -> str:
+    """
+    Wrap a query so BigQuery returns one row of per-column aggregates.
+
+    Args:
+        sql_query: The tool's SELECT statement
+        schema: Result schema of sql_query (list of bigquery.SchemaField)
+        top_k: Number of most frequent values to keep for string columns
+
+    Returns:
+        A SQL statement returning a single summary row
+    """
+    expressions = ["COUNT(*) AS row_count"]
+    for field in schema:
+        name = field.name
+        column = f"`{name}`"
+        prefix = f"{name}{_SEPARATOR}"
+        field_type = field.field_type.upper()
+
+        if field.mode == "REPEATED":
+            if field_type in STRING_TYPES:
+                expressions.append(
+                    f"(SELECT APPROX_TOP_COUNT(item, {top_k}) FROM base, UNNEST(base.{column}) AS item) AS {prefix}top"
+                )
+            continue
+
+        if field_type in NUMERIC_TYPES:
+            expressions.extend(
+                [
+                    f"COUNT({column}) AS {prefix}count",
+                    f"AVG({column}) AS {prefix}avg",
+                    f"MIN({column}) AS {prefix}min",
+                    f"MAX({column}) AS {prefix}max",
+                    f"APPROX_QUANTILES({column}, {_QUANTILE_BUCKETS}) AS {prefix}quantiles",
+                ]
+            )
+        elif field_type in STRING_TYPES:
+            expressions.extend(
+                [
+                    f"COUNT(DISTINCT {column}) AS {prefix}distinct",
+                    f"APPROX_TOP_COUNT({column}, {top_k}) AS {prefix}top",
+                ]
+            )
+        elif field_type in BOOLEAN_TYPES:
+            expressions.append(f"COUNTIF({column}) AS {prefix}true_count")
+        elif field_type in TEMPORAL_TYPES:
+            expressions.extend(
+                [
+                    f"MIN({column}) AS {prefix}min",
+                    f"MAX({column}) AS {prefix}max",
+                ]
+            )
+
+    select_list = ",\n    ".join(expressions)
+    return f"WITH base AS (\n{_strip_trailing_semicolon(sql_query)}\n)\nSELECT\n    {select_list}\nFROM base"
+
+
+def unpack_summary(columns: List[str], data: Dict[str, List[Any]]) -> Dict[str, Any]:
+    """
+    Turn the single summary row into ``{"row_count": n, "columns": {col: {stat: value}}}``.
+    """
+    summary: Dict[str, Any] = {"row_count": 0, "columns": {}}
+    if not columns or not data.get(columns[0]):
+        return summary
+
+    for alias in columns:
+        value = data[alias][0]
+        if alias == "row_count":
+            summary["row_count"] = value
+            continue
+        name, _, stat = alias.rpartition(_SEPARATOR)
+        stats = summary["columns"].setdefault(name, {})
+        if stat == "quantiles":
+            quantiles = value or []
+            for label, offset in _PERCENTILE_OFFSETS.items():
+                stats[label] = quantiles[offset] if len(quantiles) > offset else None
+        elif stat == "top":
+            stats["top"] = [
+                {"value": item["value"], "count": item["count"]} for item in (value or [])
+            ]
+        else:
+            stats[stat] = value
+    return summary
@@ -0,0 +1,416 @@
+"""Precomputed cohort rollup tables for the Customer Insights tools
+
+BehavioralAnalysisAgent asks the same aggregate questions of ``crm_data`` and
+``redemption_logs`` on every run (Gen Z vs non-Gen Z by time_period, daypart,
+channel, segment and offer type). The rollups below pre-aggregate those tables
+at exactly that grain, one row per (month, dimension combination), with sums,
+counts and an HLL sketch of customer_id for distinct counts.
+
+Refresh is incremental: the source table's partitions are read from
+INFORMATION_SCHEMA.PARTITIONS, and only months whose ``last_modified_time``
+moved since the previous refresh are deleted and re-aggregated. Refresh state
+is kept in the ``_rollup_refresh_state`` table in the same dataset.
+
+route_to_rollup() rewrites a simple aggregate query over a source table
+(filters and GROUP BY on rollup dimensions, supported aggregates only) into the
+equivalent query over its rollup. run_query uses it automatically when the
+rollup is at least as fresh as its source.
+"""
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from google.cloud import bigquery
+from google.cloud.exceptions import NotFound
+
+from .query_cache import normalize_sql
+
+REFRESH_STATE_TABLE = "_rollup_refresh_state"
+
+# Pseudo partition ID used when the source table is not partitioned by month
+_WHOLE_TABLE = "__ALL__"
+
+ROLLUP_CONFIGS: Dict[str, Dict[str, Any]] = {
+    "crm_cohort_rollup": {
+        "source": "crm_data",
+        "date_field": "visit_date",
+        "description": "Visits, spend and customers per month and cohort (from crm_data)",
+        "dimensions": ["time_period", "is_gen_z", "generation", "visit_daypart", "channel", "segment_id"],
+        "clustering_fields": ["time_period", "is_gen_z", "visit_daypart", "segment_id"],
+        "measures": {
+            "visits": "COUNT(*)",
+            "total_spend": "SUM(spend)",
+            "min_spend": "MIN(spend)",
+            "max_spend": "MAX(spend)",
+            "customers_sketch": "HLL_COUNT.INIT(customer_id)",
+        },
+        # (function, argument pattern, expression over the rollup)
+        "aggregates": [
+            ("COUNT", r"(?:\*|1)", "COALESCE(SUM(visits), 0)"),
+            ("SUM", r"spend", "SUM(total_spend)"),
+            ("AVG", r"spend", "SAFE_DIVIDE(SUM(total_spend), SUM(visits))"),
+            ("MIN", r"spend", "MIN(min_spend)"),
+            ("MAX", r"spend", "MAX(max_spend)"),
+            ("COUNT", r"DISTINCT\s+customer_id", "COALESCE(HLL_COUNT.MERGE(customers_sketch), 0)"),
+            ("APPROX_COUNT_DISTINCT", r"customer_id", "COALESCE(HLL_COUNT.MERGE(customers_sketch), 0)"),
+        ],
+    },
+    "redemption_cohort_rollup": {
+        "source": "redemption_logs",
+        "date_field": "redemption_date",
+        "description": "Redemptions, lift and value per month and cohort (from redemption_logs)",
+        "dimensions": [
+            "time_period",
+            "is_gen_z",
+            "generation",
+            "daypart",
+            "channel",
+            "segment_id",
+            "offer_type",
+            "is_time_boxed",
+            "is_app_exclusive",
+        ],
+        "clustering_fields": ["time_period", "is_gen_z", "offer_type", "channel"],
+        "measures": {
+            "redemptions": "COUNT(*)",
+            "total_lift": "SUM(lift_multiplier)",
+            "total_redemption_value": "SUM(redemption_value)",
+            "customers_sketch": "HLL_COUNT.INIT(customer_id)",
+        },
+        "aggregates": [
+            ("COUNT", r"(?:\*|1)", "COALESCE(SUM(redemptions), 0)"),
+            ("SUM", r"lift_multiplier", "SUM(total_lift)"),
+            ("AVG", r"lift_multiplier", "SAFE_DIVIDE(SUM(total_lift), SUM(redemptions))"),
+            ("SUM", r"redemption_value", "SUM(total_redemption_value)"),
+            ("AVG", r"redemption_value", "SAFE_DIVIDE(SUM(total_redemption_value), SUM(redemptions))"),
+            ("COUNT", r"DISTINCT\s+customer_id", "COALESCE(HLL_COUNT.MERGE(customers_sketch), 0)"),
+            ("APPROX_COUNT_DISTINCT", r"customer_id", "COALESCE(HLL_COUNT.MERGE(customers_sketch), 0)"),
+        ],
+    },
+}
+
+# Words that may appear in a routable query besides dimensions and aliases
+_ALLOWED_WORDS = {
+    "AND", "OR", "NOT", "IN", "IS", "NULL", "TRUE", "FALSE", "BETWEEN", "LIKE",
+    "ASC", "DESC", "AS", "CASE", "WHEN", "THEN", "ELSE", "END", "IF", "IFNULL",
+    "COALESCE", "ROUND", "SAFE_DIVIDE", "CAST", "FLOAT64", "INT64", "NUMERIC", "STRING",
+}
+
+_QUERY_PATTERN = re.compile(
+    r"^SELECT\s+(?P<select>.+?)\s+FROM\s+(?P<table>`[^`]+`|[\w.-]+)"
+    r"(?:\s+WHERE\s+(?P<where>.+?))?"
+    r"(?:\s+GROUP\s+BY\s+(?P<group>.+?))?"
+    r"(?:\s+ORDER\s+BY\s+(?P<order>.+?))?"
+    r"(?:\s+LIMIT\s+(?P<limit>\d+))?$",
+    re.IGNORECASE | re.DOTALL,
+)
+_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_WORD_PATTERN = re.compile(r"\b[A-Za-z_]\w*\b")
+_ALIAS_PATTERN = re.compile(r"\s+AS\s+(\w+)$", re.IGNORECASE)
+_DISALLOWED_PATTERN = re.compile(r"\b(?:JOIN|UNION|HAVING|WINDOW|OVER|QUALIFY|SELECT)\b", re.IGNORECASE)
+_AGGREGATE_PLACEHOLDER = "__rollup_aggregate__"
+
+
+def rollup_for_source(table_name: str) -> Optional[str]:
+    """Name of the rollup built from ``table_name``, if any"""
+    for name, config in ROLLUP_CONFIGS.items():
+        if config["source"] == table_name:
+            return name
+    return None
+
+
+def _rollup_select(config: Dict[str, Any]) -> str:
+    """SELECT that aggregates the source table to the rollup grain"""
+    columns = [f"DATE(TIMESTAMP_TRUNC({config['date_field']}, MONTH)) AS partition_month"]
+    columns += config["dimensions"]
+    columns += [f"{expression} AS {alias}" for alias, expression in config["measures"].items()]
+    group_by = ", ".join(["partition_month"] + config["dimensions"])
+    return "SELECT\n    " + ",\n    ".join(columns) + "\nFROM {source}\nWHERE {where}\nGROUP BY " + group_by
+
+
+def _month_from_partition_id(partition_id: str) -> date:
+    return date(int(partition_id[:4]), int(partition_id[4:6]), 1)
+
+
+def get_source_partitions(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    table_name: str,
+) -> Dict[str, Any]:
+    """
+    Map each monthly partition of a source table to its last modified time.
+
+    Tables that are not partitioned by month are reported as a single
+    pseudo-partition, which forces a full rebuild whenever they change.
+    """
+    rows = client.query(
+        f"SELECT partition_id, last_modified_time FROM `{project_id}.{dataset_id}.INFORMATION_SCHEMA.PARTITIONS` "
+        "WHERE table_name = @table_name",
+        job_config=bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ScalarQueryParameter("table_name", "STRING", table_name)]
+        ),
+    ).result()
+    partitions = {row["partition_id"]: row["last_modified_time"] for row in rows}
+    if not partitions or not all(
+        partition_id and re.fullmatch(r"\d{6}", partition_id) for partition_id in partitions
+    ):
+        table = client.get_table(f"{project_id}.{dataset_id}.{table_name}")
+        return {_WHOLE_TABLE: table.modified}
+    return partitions
+
+
+def _ensure_state_table(client: bigquery.Client, project_id: str, dataset_id: str) -> str:
+    state_id = f"{project_id}.{dataset_id}.{REFRESH_STATE_TABLE}"
+    client.query(
+        f"CREATE TABLE IF NOT EXISTS `{state_id}` ("
+        "rollup_name STRING NOT NULL, partition_id STRING NOT NULL, "
+        "source_last_modified TIMESTAMP, refreshed_at TIMESTAMP)"
+    ).result()
+    return state_id
+
+
+def refresh_rollup(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    rollup_name: str,
+    full_refresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Bring one rollup table up to date with its source.
+
+    Only months whose source partition changed since the last refresh are
+    re-aggregated (delete + insert in one transaction). The rollup is rebuilt
+    from scratch when it does not exist yet, when the source is not partitioned
+    by month, or when ``full_refresh`` is set.
+
+    Returns:
+        Dictionary containing:
+        - rollup: Rollup name
+        - mode: "full", "incremental" or "up_to_date"
+        - months_refreshed: Number of months re-aggregated (incremental mode)
+    """
+    config = ROLLUP_CONFIGS[rollup_name]
+    source_id = f"{project_id}.{dataset_id}.{config['source']}"
+    rollup_id = f"{project_id}.{dataset_id}.{rollup_name}"
+    state_id = _ensure_state_table(client, project_id, dataset_id)
+
+    partitions = get_source_partitions(client, project_id, dataset_id, config["source"])
+    recorded = {
+        row["partition_id"]: row["source_last_modified"]
+        for row in client.query(
+            f"SELECT partition_id, source_last_modified FROM `{state_id}` WHERE rollup_name = @rollup_name",
+            job_config=bigquery.QueryJobConfig(
+                query_parameters=[bigquery.ScalarQueryParameter("rollup_name", "STRING", rollup_name)]
+            ),
+        ).result()
+    }
+
+    try:
+        client.get_table(rollup_id)
+    except NotFound:
+        full_refresh = True
+    if _WHOLE_TABLE in partitions or _WHOLE_TABLE in recorded:
+        full_refresh = full_refresh or partitions != recorded
+
+    changed = sorted(
+        partition_id
+        for partition_id in set(partitions) | set(recorded)
+        if partitions.get(partition_id) != recorded.get(partition_id)
+    )
+    if not full_refresh and not changed:
+        return {"rollup": rollup_name, "mode": "up_to_date", "months_refreshed": 0}
+
+    select_sql = _rollup_select(config)
+    partition_ids = sorted(partitions)
+    state_parameters = [
+        bigquery.ScalarQueryParameter("rollup_name", "STRING", rollup_name),
+        bigquery.ArrayQueryParameter("partition_ids", "STRING", partition_ids),
+        bigquery.ArrayQueryParameter("modified_times", "TIMESTAMP", [partitions[p] for p in partition_ids]),
+    ]
+    record_state = f"""
+DELETE FROM `{state_id}` WHERE rollup_name = @rollup_name;
+INSERT INTO `{state_id}` (rollup_name, partition_id, source_last_modified, refreshed_at)
+SELECT @rollup_name, partition_id, modified_time, CURRENT_TIMESTAMP()
+FROM UNNEST(@partition_ids) AS partition_id WITH OFFSET AS i
+JOIN UNNEST(@modified_times) AS modified_time WITH OFFSET AS j ON i = j;
+"""
+
+    if full_refresh:
+        clustering = ", ".join(config["clustering_fields"])
+        client.query(
+            f"CREATE OR REPLACE TABLE `{rollup_id}`\n"
+            f"PARTITION BY partition_month\nCLUSTER BY {clustering}\n"
+            f"OPTIONS(description='{config['description']}')\nAS\n"
+            + select_sql.format(source=f"`{source_id}`", where="TRUE")
+        ).result()
+        client.query(record_state, job_config=bigquery.QueryJobConfig(query_parameters=state_parameters)).result()
+        return {"rollup": rollup_name, "mode": "full", "months_refreshed": len(partitions)}
+
+    months = [_month_from_partition_id(partition_id) for partition_id in changed]
+    insert_columns = ", ".join(["partition_month"] + config["dimensions"] + list(config["measures"]))
+    where = f"DATE(TIMESTAMP_TRUNC({config['date_field']}, MONTH)) IN UNNEST(@months)"
+    client.query(
+        "BEGIN TRANSACTION;\n"
+        f"DELETE FROM `{rollup_id}` WHERE partition_month IN UNNEST(@months);\n"
+        f"INSERT INTO `{rollup_id}` ({insert_columns})\n"
+        + select_sql.format(source=f"`{source_id}`", where=where)
+        + ";\n"
+        + record_state
+        + "COMMIT TRANSACTION;",
+        job_config=bigquery.QueryJobConfig(
+            query_parameters=state_parameters + [bigquery.ArrayQueryParameter("months", "DATE", months)]
+        ),
+    ).result()
+    return {"rollup": rollup_name, "mode": "incremental", "months_refreshed": len(months)}
+
+
+def refresh_all_rollups(
+    client: bigquery.Client,
+    project_id: str,
+    dataset_id: str,
+    full_refresh: bool = False,
+) -> List[Dict[str, Any]]:
+    """Refresh every rollup whose source table exists"""
+    results = []
+    for rollup_name, config in ROLLUP_CONFIGS.items():
+        try:
+            client.get_table(f"{project_id}.{dataset_id}.{config['source']}")
+        except NotFound:
+            print(f"Source table {config['source']} does not exist, skipping {rollup_name}.")
+            continue
+        result = refresh_rollup(client, project_id, dataset_id, rollup_name, full_refresh)
+        print(f"Rollup {rollup_name}: {result['mode']} ({result['months_refreshed']} month(s))")
+        results.append(result)
+    return results
+
+
+def _rewrite_expression(expression: str, config: Dict[str, Any], names: set) -> Optional[str]:
+    """Swap supported aggregates for rollup expressions; None if anything else is referenced"""
+    if "`" in expression or "." in _LITERAL_PATTERN.sub("''", re.sub(r"\b\d+\.\d+\b", "0", expression)):
+        return None
+
+    rewritten = expression
+    replacements = []
+    for function, argument, replacement in config["aggregates"]:
+        pattern = re.compile(rf"\b{function}\s*\(\s*{argument}\s*\)", re.IGNORECASE)
+        while pattern.search(rewritten):
+            rewritten = pattern.sub(f"{_AGGREGATE_PLACEHOLDER}{len(replacements)}", rewritten, count=1)
+            replacements.append(replacement)
+
+    for word in _WORD_PATTERN.findall(_LITERAL_PATTERN.sub("''", rewritten)):
+        if word.startswith(_AGGREGATE_PLACEHOLDER) or word in names or word.upper() in _ALLOWED_WORDS:
+            continue
+        return None
+
+    for index in reversed(range(len(replacements))):
+        rewritten = rewritten.replace(f"{_AGGREGATE_PLACEHOLDER}{index}", replacements[index])
+    return rewritten
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas that are not inside parentheses or string literals"""
+    parts, depth, current, quote = [], 0, [], None
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current).strip())
+    return parts
+
+
+def route_to_rollup(sql_query: str, project_id: str, dataset_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Rewrite an aggregate query over a rollup source into a query over the rollup.
+
+    Only single-table queries whose filters, grouping and ordering use rollup
+    dimensions, and whose aggregates are all listed in the rollup config, are
+    routed. Everything else returns None and runs against the source.
+
+    Returns:
+        None when the query cannot be answered from a rollup, otherwise a dictionary containing:
+        - rollup: Rollup name
+        - sql: Rewritten query over the rollup table
+        - source_table_id / rollup_table_id: Fully-qualified table IDs
+        - approximate: Whether a distinct count is served from an HLL sketch
+    """
+    normalized = normalize_sql(sql_query)
+    match = _QUERY_PATTERN.match(normalized)
+    if not match:
+        return None
+    if len(_DISALLOWED_PATTERN.findall(_LITERAL_PATTERN.sub("''", normalized))) != 1:
+        return None
+
+    table_parts = match.group("table").strip("`").split(".")
+    if len(table_parts) == 3 and table_parts[:2] != [project_id, dataset_id]:
+        return None
+    if len(table_parts) == 2 and table_parts[0] != dataset_id:
+        return None
+    rollup_name = rollup_for_source(table_parts[-1])
+    if rollup_name is None:
+        return None
+    config = ROLLUP_CONFIGS[rollup_name]
+    dimensions = set(config["dimensions"])
+
+    select_items = []
+    aliases = set()
+    has_aggregate = False
+    for item in _split_top_level(match.group("select")):
+        alias_match = _ALIAS_PATTERN.search(item)
+        expression = item[: alias_match.start()] if alias_match else item
+        rewritten = _rewrite_expression(expression, config, dimensions)
+        if rewritten is None:
+            return None
+        if rewritten != expression:
+            has_aggregate = True
+        if alias_match:
+            aliases.add(alias_match.group(1))
+            rewritten = f"{rewritten} AS {alias_match.group(1)}"
+        select_items.append(rewritten)
+    if not has_aggregate:
+        return None
+
+    where = match.group("where")
+    if where and _rewrite_expression(where, {"aggregates": []}, dimensions) is None:
+        return None
+
+    group = match.group("group")
+    if group and any(column.strip() not in dimensions for column in _split_top_level(group)):
+        return None
+
+    order = match.group("order")
+    if order:
+        order = _rewrite_expression(order, config, dimensions | aliases)
+        if order is None:
+            return None
+
+    rollup_table_id = f"{project_id}.{dataset_id}.{rollup_name}"
+    rewritten_sql = f"SELECT {', '.join(select_items)} FROM `{rollup_table_id}`"
+    if where:
+        rewritten_sql += f" WHERE {where}"
+    if group:
+        rewritten_sql += f" GROUP BY {group}"
+    if order:
+        rewritten_sql += f" ORDER BY {order}"
+    if match.group("limit"):
+        rewritten_sql += f" LIMIT {match.group('limit')}"
+
+    return {
+        "rollup": rollup_name,
+        "sql": rewritten_sql,
+        "source_table_id": f"{project_id}.{dataset_id}.{config['source']}",
+        "rollup_table_id": rollup_table_id,
+        "approximate": "HLL_COUNT.MERGE" in rewritten_sql,
+    }
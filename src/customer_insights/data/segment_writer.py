@@ -0,0 +1,457 @@
+"""Buffered, retrying writes of synthesized customer segments
+
+save_customer_segments_tool used to send every call's rows with one
+insert_rows_json streaming insert: billed per row, subject to streaming
+quotas, only visible to DML after the streaming buffer drains, and a partial
+failure came back as a raw error list that nobody retried.
+
+SegmentWriter buffers rows and writes them in batches of ``batch_size``. Each
+batch goes to a short-lived staging table and is MERGEd into the target on
+(segment_id, created_at), so writing the same rows twice (a retried batch, a
+repeated tool call) updates them instead of adding duplicates. Rows without a
+created_at are stamped with the caller's ``run_at`` (save_customer_segments_tool
+passes one timestamp per ADK invocation), or with the time this process
+started when there is none, so the key never depends on when a retry happens.
+The staging write uses one of two methods:
+
+- ``load`` (default): a Parquet load job (free, batch-priced)
+- ``storage_write``: a Storage Write API committed stream, appended with
+  explicit offsets so a retried append is never applied twice (needs
+  google-cloud-bigquery-storage)
+
+Transient errors are retried with exponential backoff and jitter. A batch is
+the unit of retry: batches that were written are not sent again. With
+Storage Write, rows the API rejects are dropped from the append and reported,
+and only the remaining rows are retried.
+
+Configuration (get_segment_writer):
+- SEGMENT_WRITER_METHOD: "load" or "storage_write"
+- SEGMENT_WRITER_BATCH_SIZE: Rows per staging write and MERGE (default 500)
+- SEGMENT_WRITER_MAX_DELAY_SECONDS: How long rows may wait in the buffer for a
+  fuller batch (default 0: every write is flushed before it returns). Rows
+  still buffered at exit are flushed then.
+- SEGMENT_WRITER_MAX_ATTEMPTS: Attempts per operation (default 5)
+"""
+import atexit
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from google.api_core import exceptions as api_exceptions
+from google.cloud import bigquery
+
+from .bigquery_schemas import CUSTOMER_SEGMENTS_SCHEMA
+
+SEGMENT_KEY = ("segment_id", "created_at")
+WRITE_METHODS = ("load", "storage_write")
+STAGING_SUFFIX = "__segment_writes"
+# Staging tables left behind by a crashed writer expire on their own
+STAGING_EXPIRATION = timedelta(hours=1)
+
+# created_at for rows written without one when the caller passes no run_at
+PROCESS_RUN_AT = datetime.now(timezone.utc).isoformat()
+
+DEFAULT_BATCH_SIZE = int(os.getenv("SEGMENT_WRITER_BATCH_SIZE", "500"))
+DEFAULT_MAX_DELAY_SECONDS = float(os.getenv("SEGMENT_WRITER_MAX_DELAY_SECONDS", "0"))
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("SEGMENT_WRITER_MAX_ATTEMPTS", "5"))
+INITIAL_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 30.0
+
+TRANSIENT_ERRORS = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.InternalServerError,
+    api_exceptions.BadGateway,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.GatewayTimeout,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.Aborted,
+    ConnectionError,
+)
+
+_lock = threading.Lock()
+_writers: Dict[Tuple[int, str], "SegmentWriter"] = {}
+
+
+def with_retries(
+    operation: Callable[[], Any],
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    initial_backoff: float = INITIAL_BACKOFF_SECONDS,
+) -> Any:
+    """Run an idempotent operation, retrying transient errors with exponential backoff and jitter"""
+    delay = initial_backoff
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return operation()
+        except TRANSIENT_ERRORS:
+            if attempt == max_attempts:
+                raise
+            time.sleep(delay * (1 + random.random()))
+            delay = min(delay * 2, MAX_BACKOFF_SECONDS)
+
+
+def dedupe_on_key(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the last row per (segment_id, created_at), as MERGE accepts one source row per key"""
+    latest = {tuple(row.get(column) for column in SEGMENT_KEY): row for row in rows}
+    return list(latest.values())
+
+
+def with_created_at(rows: List[Dict[str, Any]], run_at: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Stamp rows without a created_at with the run's timestamp, so every row has a full upsert key.
+
+    The stamp is fixed for a logical write (``run_at``, else PROCESS_RUN_AT) rather
+    than the current time, so writing the same segments again updates them.
+    """
+    run_at = run_at or PROCESS_RUN_AT
+    return [row if row.get("created_at") else {**row, "created_at": run_at} for row in rows]
+
+
+def merge_sql(target_id: str, staging_id: str) -> str:
+    """Upsert the staging table into the target on (segment_id, created_at)"""
+    columns = [field.name for field in CUSTOMER_SEGMENTS_SCHEMA]
+    match = " AND ".join(f"T.{column} = S.{column}" for column in SEGMENT_KEY)
+    updates = ", ".join(f"{column} = S.{column}" for column in columns if column not in SEGMENT_KEY)
+    column_list = ", ".join(columns)
+    return (
+        f"MERGE `{target_id}` T USING `{staging_id}` S\n"
+        f"ON {match}\n"
+        f"WHEN MATCHED THEN UPDATE SET {updates}\n"
+        f"WHEN NOT MATCHED THEN INSERT ({column_list}) VALUES ({column_list})"
+    )
+
+
+class SegmentWriter:
+    """
+    Buffers customer segment rows and upserts them into one table in batches.
+
+    Thread-safe: concurrent sub-agents can share one writer per table.
+    """
+
+    def __init__(
+        self,
+        client: bigquery.Client,
+        table_id: str,
+        method: str = "load",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_delay_seconds: float = DEFAULT_MAX_DELAY_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        """
+        Args:
+            client: Shared BigQuery client
+            table_id: Target table as project.dataset.table
+            method: "load" (Parquet load jobs) or "storage_write" (Storage Write API)
+            batch_size: Rows per staging write and MERGE
+            max_delay_seconds: How long rows may wait for a fuller batch (0 flushes every write)
+            max_attempts: Attempts per staging write and MERGE
+        """
+        if method not in WRITE_METHODS:
+            raise ValueError(f"Unknown segment write method '{method}'; use one of {', '.join(WRITE_METHODS)}")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self.client = client
+        self.table_id = table_id
+        self.method = method
+        self.batch_size = batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self.max_attempts = max_attempts
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._buffer_lock = threading.Lock()
+        # One flush at a time, so batches reach the target in the order they were written
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        # Rows a background (timer or exit) flush could not write, reported by the next write()
+        self._failed: List[Dict[str, Any]] = []
+        self._write_client = None
+        self._row_message = None
+        self.stats = {"rows_written": 0, "batches": 0, "retries": 0, "rows_failed": 0}
+
+    def write(self, rows: List[Dict[str, Any]], run_at: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Buffer rows and flush full batches (or everything, when max_delay_seconds is 0).
+
+        Args:
+            rows: customer_segments rows
+            run_at: ISO timestamp of the synthesis run, used as created_at for rows without one
+
+        Returns:
+            Dictionary containing:
+            - rows_written: Rows upserted into the target by this call
+            - rows_pending: Rows still buffered for a later flush
+            - errors: Rows that could not be written, each as {"row": ..., "errors": [...]},
+              including failures of earlier background flushes
+        """
+        rows = with_created_at(rows, run_at)
+        with self._buffer_lock:
+            self._buffer.extend(rows)
+            if self.max_delay_seconds <= 0:
+                ready, self._buffer = self._buffer, []
+            else:
+                full = len(self._buffer) - len(self._buffer) % self.batch_size
+                ready, self._buffer = self._buffer[:full], self._buffer[full:]
+                if self._buffer and self._timer is None:
+                    self._timer = threading.Timer(self.max_delay_seconds, self._background_flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+            pending = len(self._buffer)
+
+        written, errors = self._write_batches(ready)
+        with self._buffer_lock:
+            errors, self._failed = self._failed + errors, []
+        return {"rows_written": written, "rows_pending": pending, "errors": errors}
+
+    def flush(self) -> Dict[str, Any]:
+        """Write everything buffered now; returns the same dictionary as write()"""
+        with self._buffer_lock:
+            ready, self._buffer = self._buffer, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        written, errors = self._write_batches(ready)
+        with self._buffer_lock:
+            errors, self._failed = self._failed + errors, []
+        return {"rows_written": written, "rows_pending": 0, "errors": errors}
+
+    def _background_flush(self) -> None:
+        with self._buffer_lock:
+            ready, self._buffer = self._buffer, []
+            self._timer = None
+        _, errors = self._write_batches(ready)
+        with self._buffer_lock:
+            self._failed.extend(errors)
+
+    def _write_batches(self, rows: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        written, errors = 0, []
+        if not rows:
+            return written, errors
+        with self._flush_lock:
+            for start in range(0, len(rows), self.batch_size):
+                batch = dedupe_on_key(rows[start:start + self.batch_size])
+                try:
+                    batch_written, batch_errors = self._write_batch(batch)
+                except Exception as e:
+                    batch_written, batch_errors = 0, [{"row": row, "errors": [str(e)]} for row in batch]
+                written += batch_written
+                errors.extend(batch_errors)
+        self.stats["rows_written"] += written
+        self.stats["rows_failed"] += len(errors)
+        return written, errors
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """Stage one batch, MERGE it into the target and drop the staging table"""
+        staging_id = f"{self.table_id}{STAGING_SUFFIX}_{uuid.uuid4().hex[:12]}"
+        try:
+            if self.method == "storage_write":
+                staged, errors = self._stage_with_storage_write(staging_id, rows)
+            else:
+                staged, errors = self._stage_with_load_job(staging_id, rows), []
+            if staged:
+                self._retry(lambda: self.client.query(merge_sql(self.table_id, staging_id)).result())
+            self.stats["batches"] += 1
+            return staged, errors
+        finally:
+            self.client.delete_table(staging_id, not_found_ok=True)
+
+    def _retry(self, operation: Callable[[], Any]) -> Any:
+        attempts = {"count": 0}
+
+        def counted() -> Any:
+            attempts["count"] += 1
+            return operation()
+
+        try:
+            return with_retries(counted, self.max_attempts)
+        finally:
+            self.stats["retries"] += attempts["count"] - 1
+
+    def _stage_with_load_job(self, staging_id: str, rows: List[Dict[str, Any]]) -> int:
+        # Imported here: bigquery_loader pulls in the synthetic data generator
+        from .bigquery_loader import dataframe_to_parquet
+
+        df = pd.DataFrame(rows, columns=[field.name for field in CUSTOMER_SEGMENTS_SCHEMA])
+        df["created_at"] = pd.to_datetime(df["created_at"], utc=True, format="ISO8601")
+        for field in CUSTOMER_SEGMENTS_SCHEMA:
+            if field.mode == "REPEATED":
+                # A REPEATED column cannot be NULL; missing arrays load as empty ones
+                df[field.name] = [list(value) if isinstance(value, (list, tuple)) else [] for value in df[field.name]]
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            schema=CUSTOMER_SEGMENTS_SCHEMA,
+            write_disposition="WRITE_TRUNCATE",
+        )
+        parquet_options = bigquery.ParquetOptions()
+        parquet_options.enable_list_inference = True
+        job_config.parquet_options = parquet_options
+        buffer = dataframe_to_parquet("customer_segments", df)
+
+        def load() -> None:
+            # WRITE_TRUNCATE makes a retried load replace, not append to, the staging table
+            self.client.load_table_from_file(buffer, staging_id, job_config=job_config, rewind=True).result()
+
+        self._retry(load)
+        return len(rows)
+
+    def _get_write_client(self) -> Any:
+        if self._write_client is None:
+            try:
+                from google.cloud import bigquery_storage_v1
+            except ImportError as e:
+                raise ImportError(
+                    "The storage_write method needs google-cloud-bigquery-storage; "
+                    "install it or set SEGMENT_WRITER_METHOD=load"
+                ) from e
+            self._write_client = bigquery_storage_v1.BigQueryWriteClient(credentials=self.client._credentials)
+        return self._write_client
+
+    def _stage_with_storage_write(
+        self,
+        staging_id: str,
+        rows: List[Dict[str, Any]],
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Append rows to a new staging table through a committed write stream.
+
+        Every append carries the stream offset it expects to write at, so an
+        append retried after an ambiguous failure is rejected as ALREADY_EXISTS
+        instead of duplicating rows. When the API rejects individual rows the
+        whole append fails; those rows are reported and the rest appended again.
+        """
+        from google.cloud.bigquery_storage_v1 import types
+
+        write_client = self._get_write_client()
+        staging_table = bigquery.Table(staging_id, schema=CUSTOMER_SEGMENTS_SCHEMA)
+        staging_table.expires = datetime.now(timezone.utc) + STAGING_EXPIRATION
+        self._retry(lambda: self.client.create_table(staging_table, exists_ok=True))
+        parent = f"projects/{staging_table.project}/datasets/{staging_table.dataset_id}/tables/{staging_table.table_id}"
+        stream = self._retry(
+            lambda: write_client.create_write_stream(
+                parent=parent,
+                write_stream=types.WriteStream(type_=types.WriteStream.Type.COMMITTED),
+            )
+        )
+
+        descriptor, message_class = self._get_row_message()
+        remaining = list(rows)
+        errors: List[Dict[str, Any]] = []
+        while remaining:
+            request = types.AppendRowsRequest(
+                write_stream=stream.name,
+                offset=0,
+                proto_rows=types.AppendRowsRequest.ProtoData(
+                    writer_schema=types.ProtoSchema(proto_descriptor=descriptor),
+                    rows=types.ProtoRows(serialized_rows=[_to_message(message_class, row) for row in remaining]),
+                ),
+            )
+
+            def append() -> Any:
+                try:
+                    return next(iter(write_client.append_rows(iter([request]))))
+                except api_exceptions.AlreadyExists:
+                    # An earlier attempt of this append was applied
+                    return None
+
+            response = self._retry(append)
+            if response is None:
+                break
+            if not response.row_errors:
+                if response.error.code:
+                    raise RuntimeError(f"Storage Write append failed: {response.error.message}")
+                break
+            rejected = {row_error.index: row_error.message for row_error in response.row_errors}
+            errors.extend({"row": remaining[index], "errors": [message]} for index, message in rejected.items())
+            remaining = [row for index, row in enumerate(remaining) if index not in rejected]
+
+        self._retry(lambda: write_client.finalize_write_stream(name=stream.name))
+        return len(remaining), errors
+
+    def _get_row_message(self) -> Tuple[Any, Any]:
+        """Proto descriptor and message class for a customer_segments row"""
+        if self._row_message is None:
+            from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+            proto_types = {
+                "STRING": descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+                "FLOAT": descriptor_pb2.FieldDescriptorProto.TYPE_DOUBLE,
+                "INTEGER": descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+                "BOOLEAN": descriptor_pb2.FieldDescriptorProto.TYPE_BOOL,
+                # Storage Write takes TIMESTAMP as microseconds since the epoch
+                "TIMESTAMP": descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+            }
+            descriptor = descriptor_pb2.DescriptorProto(name="SegmentRow")
+            for number, field in enumerate(CUSTOMER_SEGMENTS_SCHEMA, start=1):
+                descriptor.field.add(
+                    name=field.name,
+                    number=number,
+                    type=proto_types[field.field_type],
+                    label=(
+                        descriptor_pb2.FieldDescriptorProto.LABEL_REPEATED
+                        if field.mode == "REPEATED"
+                        else descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL
+                    ),
+                )
+            file_proto = descriptor_pb2.FileDescriptorProto(name="segment_row.proto", syntax="proto2")
+            file_proto.message_type.add().CopyFrom(descriptor)
+            pool = descriptor_pool.DescriptorPool()
+            pool.Add(file_proto)
+            message_class = message_factory.GetMessageClass(pool.FindMessageTypeByName("SegmentRow"))
+            self._row_message = (descriptor, message_class)
+        return self._row_message
+
+
+def _timestamp_micros(value: Any) -> int:
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize("UTC")
+    return timestamp.value // 1000
+
+
+def _to_message(message_class: Any, row: Dict[str, Any]) -> bytes:
+    """Serialize a row for the Storage Write API (None fields are left unset)"""
+    message = message_class()
+    for field in CUSTOMER_SEGMENTS_SCHEMA:
+        value = row.get(field.name)
+        if value is None:
+            continue
+        if field.mode == "REPEATED":
+            getattr(message, field.name).extend(value)
+        elif field.field_type == "TIMESTAMP":
+            setattr(message, field.name, _timestamp_micros(value))
+        else:
+            setattr(message, field.name, value)
+    return message.SerializeToString()
+
+
+def get_segment_writer(client: bigquery.Client, table_id: str) -> SegmentWriter:
+    """
+    Get the shared writer for a table, configured from the SEGMENT_WRITER_* variables.
+
+    One writer per (client, table) is kept for the process, so rows from many
+    tool calls share its buffer and batches.
+    """
+    key = (id(client), table_id)
+    writer = _writers.get(key)
+    if writer is not None:
+        return writer
+    with _lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = SegmentWriter(
+                client,
+                table_id,
+                method=os.getenv("SEGMENT_WRITER_METHOD", "load"),
+            )
+            _writers[key] = writer
+        return writer
+
+
+@atexit.register
+def flush_all_segment_writers() -> None:
+    """Flush every shared writer's buffer (runs at interpreter exit)"""
+    for writer in list(_writers.values()):
+        writer.flush()
@@ -0,0 +1,110 @@
+"""
+Multi-process sharded synthetic data generation.
+
+Customers are split into num_shards contiguous ID ranges. Each shard runs in
+a process pool with its own random streams: a NumPy generator and a
+random-module seed, both spawned from one SeedSequence(seed) by shard index.
+Shard outputs are concatenated in shard order, so for a given seed and shard
+count the tables are identical however many workers run them (only
+customer_segments.created_at carries the wall clock).
+
+Shards reuse streaming_export.generate_customer_batch, so as in the streaming
+export each redemption and review belongs to a customer of its own shard.
+"""
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .streaming_export import STREAMED_TABLES, generate_customer_batch
+from .synthetic_data_generator import generate_customer_segments
+
+
+def shard_ranges(num_customers: int, num_shards: int) -> List[Tuple[int, int]]:
+    """(customer_offset, num_customers) per shard, as even as possible and in ID order"""
+    if num_shards <= 0:
+        raise ValueError("num_shards must be positive")
+    num_shards = min(num_shards, max(num_customers, 1))
+    bounds = [num_customers * shard // num_shards for shard in range(num_shards + 1)]
+    return [(start, end - start) for start, end in zip(bounds, bounds[1:])]
+
+
+def _generate_shard(
+    task: Tuple[int, int, np.random.SeedSequence, Optional[Dict[str, float]]],
+) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame]:
+    """Process pool entry point: generate one shard from its own seed sequence"""
+    customer_offset, num_customers, seed_sequence, redemption_weights = task
+    numpy_seed, random_seed = seed_sequence.spawn(2)
+    # Workers are reused across shards, so the random module is reseeded per shard
+    random.seed(int(random_seed.generate_state(1, dtype=np.uint64)[0]))
+    return generate_customer_batch(
+        customer_offset,
+        num_customers,
+        np.random.default_rng(numpy_seed),
+        redemption_weights=redemption_weights,
+    )
+
+
+def generate_sharded(
+    num_customers: int = 1200,
+    seed: Optional[int] = None,
+    num_shards: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    redemption_weights: Optional[Dict[str, float]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Generate all synthetic tables across a process pool.
+
+    Args:
+        num_customers: Number of customers in crm_data
+        seed: Seed for reproducible output; None draws fresh entropy
+        num_shards: Number of customer ID ranges (defaults to the CPU count).
+                    Output depends on seed and num_shards, not on max_workers
+        max_workers: Pool size (defaults to min(num_shards, CPU count)); 1 runs in-process
+        redemption_weights: As for export_to_dataframes
+
+    Returns:
+        The same tables as export_to_dataframes
+    """
+    cpu_count = os.cpu_count() or 1
+    ranges = shard_ranges(num_customers, num_shards or cpu_count)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(ranges))
+    tasks = [
+        (customer_offset, shard_customers, seed_sequence, redemption_weights)
+        for (customer_offset, shard_customers), seed_sequence in zip(ranges, seed_sequences)
+    ]
+
+    max_workers = max_workers or min(len(tasks), cpu_count)
+    print(f"Generating {num_customers:,} customers in {len(tasks)} shards ({max_workers} workers)...")
+    if max_workers == 1:
+        shards = [_generate_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            # map returns results in shard order
+            shards = list(pool.map(_generate_shard, tasks))
+
+    dataframes = {
+        table_name: pd.concat([tables[table_name] for tables, _ in shards], ignore_index=True)
+        for table_name in STREAMED_TABLES
+    }
+    customer_profiles = pd.concat([profiles for _, profiles in shards], ignore_index=True)
+    del shards
+
+    # Shards number transactions from zero; only the merged order fixes the IDs
+    transactions_df = dataframes["customer_transactions_raw"]
+    transactions_df["transaction_id"] = [f"txn_{i+1:07d}" for i in range(len(transactions_df))]
+
+    print("Synthesizing baseline segment summaries...")
+    # Only used when a segment has no redemptions
+    random.seed(seed)
+    dataframes["customer_segments"] = generate_customer_segments(
+        dataframes["crm_data"],
+        transactions_df,
+        dataframes["redemption_logs"],
+        dataframes["feedback_data"],
+        customer_profiles,
+    )
+    return dataframes
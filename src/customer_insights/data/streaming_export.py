@@ -0,0 +1,305 @@
+"""
+Streaming, chunked export of the synthetic data.
+
+export_to_dataframes keeps every table resident at once, so peak memory is
+several times the final data size. The functions here generate customers in
+batches with the numpy engine and hand each table to a sink in fixed-size
+chunks instead:
+
+- Redemptions and feedback for a batch are drawn from that batch's customers
+  only, so customer_transactions_raw and customer_feedback_raw are derived
+  batch by batch, with the same per-customer semantics as the in-memory path.
+- customer_segments is the only table that needs the whole dataset; it is
+  built from running per-segment counts (SegmentSummaryAccumulator), whose
+  size depends on the number of segments and categories, not rows.
+
+Peak memory is one customer batch plus at most one chunk buffered per table,
+whatever num_customers is. Batch-local sampling is the one difference from
+export_to_dataframes: a redemption or review never belongs to a customer from
+another batch.
+"""
+import random
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .profile_sampler import segment_weights
+from .synthetic_data_generator import (
+    generate_customer_feedback_raw,
+    generate_customer_transactions_raw,
+    order_segment_ids,
+    segment_summary_row,
+)
+from .vectorized_generator import generate_crm_frame, generate_feedback_frame, generate_redemption_frame
+
+DEFAULT_CHUNK_ROWS = 100_000
+DEFAULT_BATCH_CUSTOMERS = 1_000
+
+# Tables in the order their chunks are emitted for each batch
+STREAMED_TABLES = [
+    "crm_data",
+    "customer_transactions_raw",
+    "redemption_logs",
+    "feedback_data",
+    "customer_feedback_raw",
+]
+
+
+class SegmentSummaryAccumulator:
+    """
+    Running per-segment counts that produce the same columns as
+    generate_customer_segments without holding the underlying tables.
+    """
+
+    def __init__(self):
+        self.visits: Counter = Counter()
+        self.spend: Dict[str, float] = defaultdict(float)
+        self.customers: Counter = Counter()
+        self.redemptions: Counter = Counter()
+        self.lift: Dict[str, float] = defaultdict(float)
+        self.channels: Dict[str, Counter] = defaultdict(Counter)
+        self.offer_types: Dict[str, Counter] = defaultdict(Counter)
+        self.phrases: Dict[str, Counter] = defaultdict(Counter)
+        self.generations: Dict[str, Counter] = defaultdict(Counter)
+        self.time_periods: Dict[str, Counter] = defaultdict(Counter)
+        self.dayparts: Dict[str, Counter] = defaultdict(Counter)
+
+    @staticmethod
+    def _add_counts(target: Dict[str, Counter], df: pd.DataFrame, column: str) -> None:
+        """Add value counts of `column` per segment_id into `target`"""
+        for (segment, value), count in df.groupby(["segment_id", column]).size().items():
+            target[segment][value] += int(count)
+
+    def update(
+        self,
+        crm_df: pd.DataFrame,
+        redemption_df: pd.DataFrame,
+        feedback_df: pd.DataFrame,
+        customer_profiles: pd.DataFrame,
+    ) -> None:
+        """Fold in one batch; customers must not repeat across batches"""
+        by_segment = crm_df.groupby("segment_id")
+        self.visits.update(by_segment.size().to_dict())
+        self.customers.update(by_segment["customer_id"].nunique().to_dict())
+        for segment, spend in by_segment["spend"].sum().items():
+            self.spend[segment] += float(spend)
+        self._add_counts(self.channels, crm_df, "channel")
+        self._add_counts(self.time_periods, crm_df, "time_period")
+        self._add_counts(self.dayparts, crm_df, "visit_daypart")
+
+        self.redemptions.update(redemption_df.groupby("segment_id").size().to_dict())
+        for segment, lift in redemption_df.groupby("segment_id")["lift_multiplier"].sum().items():
+            self.lift[segment] += float(lift)
+        self._add_counts(self.offer_types, redemption_df, "offer_type")
+
+        for segment, phrases in zip(feedback_df["segment_id"], feedback_df["key_phrases"]):
+            self.phrases[segment].update(phrases if isinstance(phrases, list) else [phrases])
+
+        self._add_counts(self.generations, customer_profiles, "generation")
+
+    def to_frame(self) -> pd.DataFrame:
+        """customer_segments rows for every segment seen so far, in generate_customer_segments order"""
+        segments = []
+        for segment in order_segment_ids(segment for segment, visits in self.visits.items() if visits):
+            visits = self.visits[segment]
+            redemptions = self.redemptions[segment]
+            profiles = sum(self.generations[segment].values())
+            segments.append(
+                segment_summary_row(
+                    segment,
+                    visits=visits,
+                    customers=self.customers[segment],
+                    avg_spend=self.spend[segment] / visits,
+                    # One transaction is derived per CRM visit
+                    transactions=visits,
+                    redemptions=redemptions,
+                    lift_estimate=self.lift[segment] / redemptions if redemptions else 1.0,
+                    top_channels=[value for value, _ in self.channels[segment].most_common(3)],
+                    preferred_mechanics=[value for value, _ in self.offer_types[segment].most_common(3)],
+                    key_messaging_phrases=[value for value, _ in self.phrases[segment].most_common(5)],
+                    generation_mix={
+                        generation: round(count / profiles, 3)
+                        for generation, count in self.generations[segment].most_common()
+                    },
+                    top_time_periods=[value for value, _ in self.time_periods[segment].most_common(3)],
+                    dominant_dayparts=[value for value, _ in self.dayparts[segment].most_common(3)],
+                )
+            )
+
+        return pd.DataFrame(segments)
+
+
+class _Rechunker:
+    """Buffers frames of any size and releases them as chunks of exactly chunk_rows (the last may be shorter)"""
+
+    def __init__(self, chunk_rows: int):
+        self.chunk_rows = chunk_rows
+        self.pending: List[pd.DataFrame] = []
+        self.pending_rows = 0
+
+    def push(self, df: pd.DataFrame) -> Iterator[pd.DataFrame]:
+        self.pending.append(df)
+        self.pending_rows += len(df)
+        while self.pending_rows >= self.chunk_rows:
+            buffered = pd.concat(self.pending, ignore_index=True)
+            yield buffered.iloc[: self.chunk_rows].reset_index(drop=True)
+            rest = buffered.iloc[self.chunk_rows :].reset_index(drop=True)
+            self.pending = [rest] if len(rest) else []
+            self.pending_rows = len(rest)
+
+    def flush(self) -> Iterator[pd.DataFrame]:
+        if self.pending_rows:
+            yield pd.concat(self.pending, ignore_index=True)
+        self.pending = []
+        self.pending_rows = 0
+
+
+def generate_customer_batch(
+    customer_offset: int,
+    num_customers: int,
+    rng: np.random.Generator,
+    transaction_start: int = 0,
+    redemption_weights: Optional[Dict[str, float]] = None,
+) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame]:
+    """
+    Generate every streamed table for customers [customer_offset, customer_offset + num_customers).
+
+    Redemption and review counts keep export_to_dataframes' per-customer ratios,
+    rounded cumulatively so batch totals add up to the in-memory defaults and
+    redemption_id / feedback_id numbering follows from customer_offset alone.
+    transaction_id numbering starts at transaction_start, since it depends on
+    the visit counts of earlier batches. customer_feedback_raw uses the random module.
+
+    Returns:
+        ({table name: DataFrame} for STREAMED_TABLES, customer_profiles)
+    """
+    customer_end = customer_offset + num_customers
+    redemption_start = round(customer_offset * 5500 / 1200)
+    review_start = round(customer_offset * 2200 / 1200)
+
+    crm_df, customer_profiles = generate_crm_frame(num_customers, rng, start_index=customer_offset)
+    weights = segment_weights(customer_profiles, redemption_weights) if redemption_weights else None
+    redemption_df = generate_redemption_frame(
+        round(customer_end * 5500 / 1200) - redemption_start,
+        customer_profiles,
+        rng,
+        start_index=redemption_start,
+        weights=weights,
+    )
+    feedback_df = generate_feedback_frame(
+        round(customer_end * 2200 / 1200) - review_start, customer_profiles, rng, start_index=review_start
+    )
+    return {
+        "crm_data": crm_df,
+        "customer_transactions_raw": generate_customer_transactions_raw(
+            crm_df, redemption_df, start_index=transaction_start, rng=rng
+        ),
+        "redemption_logs": redemption_df,
+        "feedback_data": feedback_df,
+        "customer_feedback_raw": generate_customer_feedback_raw(feedback_df),
+    }, customer_profiles
+
+
+def iter_synthetic_batches(
+    num_customers: int = 1200,
+    seed: Optional[int] = None,
+    batch_customers: int = DEFAULT_BATCH_CUSTOMERS,
+    redemption_weights: Optional[Dict[str, float]] = None,
+) -> Iterator[Tuple[Dict[str, pd.DataFrame], pd.DataFrame]]:
+    """
+    Generate the synthetic data one customer batch at a time (numpy engine).
+
+    Yields:
+        generate_customer_batch output per batch
+    """
+    if batch_customers <= 0:
+        raise ValueError("batch_customers must be positive")
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    transaction_start = 0
+    for customer_offset in range(0, num_customers, batch_customers):
+        tables, customer_profiles = generate_customer_batch(
+            customer_offset,
+            min(batch_customers, num_customers - customer_offset),
+            rng,
+            transaction_start=transaction_start,
+            redemption_weights=redemption_weights,
+        )
+        transaction_start += len(tables["customer_transactions_raw"])
+        yield tables, customer_profiles
+
+
+def iter_table_chunks(
+    num_customers: int = 1200,
+    seed: Optional[int] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    batch_customers: int = DEFAULT_BATCH_CUSTOMERS,
+    redemption_weights: Optional[Dict[str, float]] = None,
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Stream every synthetic table as (table name, chunk) pairs of at most chunk_rows rows.
+
+    Chunks of one table arrive in row order but interleaved with other tables;
+    customer_segments comes last, as a single chunk.
+    """
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows must be positive")
+    rechunkers = {table_name: _Rechunker(chunk_rows) for table_name in STREAMED_TABLES}
+    summary = SegmentSummaryAccumulator()
+
+    for tables, customer_profiles in iter_synthetic_batches(
+        num_customers, seed=seed, batch_customers=batch_customers, redemption_weights=redemption_weights
+    ):
+        summary.update(tables["crm_data"], tables["redemption_logs"], tables["feedback_data"], customer_profiles)
+        for table_name in STREAMED_TABLES:
+            for chunk in rechunkers[table_name].push(tables.pop(table_name)):
+                yield table_name, chunk
+
+    for table_name in STREAMED_TABLES:
+        for chunk in rechunkers[table_name].flush():
+            yield table_name, chunk
+    yield "customer_segments", summary.to_frame()
+
+
+def export_to_parquet(
+    output_dir: str,
+    num_customers: int = 1200,
+    seed: Optional[int] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    batch_customers: int = DEFAULT_BATCH_CUSTOMERS,
+    redemption_weights: Optional[Dict[str, float]] = None,
+    on_chunk: Optional[Callable[[str, int, pd.DataFrame], None]] = None,
+) -> Dict[str, int]:
+    """
+    Stream the synthetic tables to Parquet, one file per chunk.
+
+    Files are written as <output_dir>/<table>/part-00000.parquet, part-00001.parquet, ...
+
+    Args:
+        output_dir: Directory to write into (created if missing)
+        on_chunk: Optional callback(table name, part number, chunk) after each file is written
+
+    Returns:
+        Rows written per table
+    """
+    parts: Counter = Counter()
+    rows: Counter = Counter()
+    for table_name, chunk in iter_table_chunks(
+        num_customers,
+        seed=seed,
+        chunk_rows=chunk_rows,
+        batch_customers=batch_customers,
+        redemption_weights=redemption_weights,
+    ):
+        table_dir = Path(output_dir) / table_name
+        table_dir.mkdir(parents=True, exist_ok=True)
+        chunk.to_parquet(table_dir / f"part-{parts[table_name]:05d}.parquet", index=False)
+        if on_chunk:
+            on_chunk(table_name, parts[table_name], chunk)
+        parts[table_name] += 1
+        rows[table_name] += len(chunk)
+    return dict(rows)
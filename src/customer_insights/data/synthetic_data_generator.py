@@ -2,9 +2,13 @@
 import json
 import random
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+
+from .profile_sampler import ProfileSampler, as_profile_sampler, segment_weights
 
 # Segment definitions
 SEGMENTS = [
@@ -202,6 +206,38 @@ GENERATION_CONFIGS = [
 
 GENERATION_LOOKUP = {config["name"]: config for config in GENERATION_CONFIGS}
 
+# Monthly visit count range and spend-per-visit range for each segment
+SEGMENT_VISIT_PROFILES: Dict[str, Dict[str, Tuple]] = {
+    "value-driven-lunch-buyer": {"monthly_visits": (9, 16), "spend_per_visit": (8.0, 14.0)},
+    "discount-hunter": {"monthly_visits": (12, 20), "spend_per_visit": (5.0, 10.0)},
+    "loyal-repeater": {"monthly_visits": (15, 26), "spend_per_visit": (10.0, 16.0)},
+    "convenience-driven": {"monthly_visits": (7, 13), "spend_per_visit": (9.0, 13.0)},
+    "premium-seeker": {"monthly_visits": (5, 10), "spend_per_visit": (11.0, 18.0)},
+}
+DEFAULT_VISIT_PROFILE = {"monthly_visits": (6, 12), "spend_per_visit": (7.0, 15.0)}
+
+SEGMENT_PHRASES: Dict[str, List[str]] = {
+    "value-driven-lunch-buyer": [
+        "time-boxed", "app-exclusive", "quick redemption", "easy to use",
+        "perfect for lunch break", "convenient", "no hassle"
+    ],
+    "discount-hunter": [
+        "great deal", "saved money", "value", "worth it",
+        "affordable", "discount", "budget-friendly"
+    ],
+    "convenience-driven": [
+        "easy to use", "fast", "quick", "no hassle",
+        "app makes it simple", "smooth process", "effortless"
+    ],
+    "loyal-repeater": [
+        "always great", "consistent quality", "trustworthy",
+        "reliable", "my go-to", "never disappoints"
+    ],
+}
+DEFAULT_PHRASES = ["good", "nice", "enjoyed"]
+REVIEW_VERBS = ["loved", "appreciated", "enjoyed"]
+FEEDBACK_SOURCES = ["app_review", "campaign_feedback", "social_comment", "survey"]
+
 
 def weighted_choice(options: List[str], weights: List[float]) -> str:
     if not options:
@@ -291,17 +327,8 @@ def get_quarter_label(timestamp: datetime) -> str:
 
 
 def segment_visit_profile(segment: str) -> Tuple[int, float]:
-    if segment == "value-driven-lunch-buyer":
-        return random.randint(9, 16), round(random.uniform(8.0, 14.0), 2)
-    if segment == "discount-hunter":
-        return random.randint(12, 20), round(random.uniform(5.0, 10.0), 2)
-    if segment == "loyal-repeater":
-        return random.randint(15, 26), round(random.uniform(10.0, 16.0), 2)
-    if segment == "convenience-driven":
-        return random.randint(7, 13), round(random.uniform(9.0, 13.0), 2)
-    if segment == "premium-seeker":
-        return random.randint(5, 10), round(random.uniform(11.0, 18.0), 2)
-    return random.randint(6, 12), round(random.uniform(7.0, 15.0), 2)
+    profile = SEGMENT_VISIT_PROFILES.get(segment, DEFAULT_VISIT_PROFILE)
+    return random.randint(*profile["monthly_visits"]), round(random.uniform(*profile["spend_per_visit"]), 2)
 
 
 def generate_crm_data(num_customers: int = 1200) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
@@ -372,17 +399,21 @@ def generate_crm_data(num_customers: int = 1200) -> Tuple[List[Dict[str, Any]],
     return crm_rows, customer_profiles
 
 
-def generate_redemption_logs(num_redemptions: int, customer_profiles: pd.DataFrame) -> List[Dict[str, Any]]:
-    """Generate synthetic redemption log data aligned to customer profiles."""
+def generate_redemption_logs(
+    num_redemptions: int,
+    customer_profiles: Union[pd.DataFrame, ProfileSampler],
+    weights: Optional[Sequence[float]] = None,
+) -> List[Dict[str, Any]]:
+    """Generate synthetic redemption log data aligned to customer profiles (optionally weighted per profile)."""
     data = []
+    profiles = as_profile_sampler(customer_profiles, weights).sample(num_redemptions)
     for i in range(num_redemptions):
-        profile = customer_profiles.sample(1).iloc[0]
-        generation = profile["generation"]
+        generation = profiles["generation"][i]
         generation_config = GENERATION_LOOKUP[generation]
-        segment = profile["segment_id"]
-        birth_year = int(profile["birth_year"])
-        age = int(profile["age"])
-        is_gen_z = bool(profile["is_gen_z"])
+        segment = profiles["segment_id"][i]
+        birth_year = int(profiles["birth_year"][i])
+        age = int(profiles["age"][i])
+        is_gen_z = bool(profiles["is_gen_z"][i])
 
         offer_type = random.choice(OFFER_TYPES)
 
@@ -407,7 +438,7 @@ def generate_redemption_logs(num_redemptions: int, customer_profiles: pd.DataFra
         data.append(
             {
                 "redemption_id": f"redemption_{i+1:05d}",
-                "customer_id": profile["customer_id"],
+                "customer_id": profiles["customer_id"][i],
                 "segment_id": segment,
                 "offer_type": offer_type,
                 "redemption_date": redemption_dt.isoformat(),
@@ -430,42 +461,28 @@ def generate_redemption_logs(num_redemptions: int, customer_profiles: pd.DataFra
     return data
 
 
-def generate_feedback_data(num_reviews: int, customer_profiles: pd.DataFrame) -> List[Dict[str, Any]]:
-    """Generate synthetic feedback and review data."""
+def generate_feedback_data(
+    num_reviews: int,
+    customer_profiles: Union[pd.DataFrame, ProfileSampler],
+    weights: Optional[Sequence[float]] = None,
+) -> List[Dict[str, Any]]:
+    """Generate synthetic feedback and review data (optionally weighted per profile)."""
     data = []
-    segment_phrases = {
-        "value-driven-lunch-buyer": [
-            "time-boxed", "app-exclusive", "quick redemption", "easy to use",
-            "perfect for lunch break", "convenient", "no hassle"
-        ],
-        "discount-hunter": [
-            "great deal", "saved money", "value", "worth it",
-            "affordable", "discount", "budget-friendly"
-        ],
-        "convenience-driven": [
-            "easy to use", "fast", "quick", "no hassle",
-            "app makes it simple", "smooth process", "effortless"
-        ],
-        "loyal-repeater": [
-            "always great", "consistent quality", "trustworthy",
-            "reliable", "my go-to", "never disappoints"
-        ],
-    }
-
+    profiles = as_profile_sampler(customer_profiles, weights).sample(num_reviews)
     for i in range(num_reviews):
-        profile = customer_profiles.sample(1).iloc[0]
-        generation_config = GENERATION_LOOKUP[profile["generation"]]
-        segment = profile["segment_id"]
+        generation = profiles["generation"][i]
+        generation_config = GENERATION_LOOKUP[generation]
+        segment = profiles["segment_id"][i]
         time_period = sample_time_period(generation_config)
         daypart = sample_daypart(generation_config)
         feedback_dt = sample_datetime(time_period, daypart)
 
         offer_type = random.choice(OFFER_TYPES)
-        phrases = segment_phrases.get(segment, ["good", "nice", "enjoyed"])
+        phrases = SEGMENT_PHRASES.get(segment, DEFAULT_PHRASES)
         selected_phrases = random.sample(phrases, k=min(len(phrases), random.randint(2, 4)))
 
         review_templates = [
-            f"I {random.choice(['loved', 'appreciated', 'enjoyed'])} the {offer_type.lower()} offer. {random.choice(selected_phrases)}!",
+            f"I {random.choice(REVIEW_VERBS)} the {offer_type.lower()} offer. {random.choice(selected_phrases)}!",
             f"The {offer_type.lower()} was {selected_phrases[0]}. {selected_phrases[1] if len(selected_phrases) > 1 else 'Great experience!'}",
             f"Really {selected_phrases[0]} how {selected_phrases[1] if len(selected_phrases) > 1 else 'smooth'} the {offer_type.lower()} was.",
         ]
@@ -475,13 +492,13 @@ def generate_feedback_data(num_reviews: int, customer_profiles: pd.DataFrame) ->
         if offer_type == "Time-Boxed" and daypart == "breakfast":
             review_text += " Perfect timing for my morning rush."
 
-        sentiment_base = 0.88 if profile["generation"] == "Gen Z" and offer_type in {"App Exclusive", "Time-Boxed"} else 0.75
+        sentiment_base = 0.88 if generation == "Gen Z" and offer_type in {"App Exclusive", "Time-Boxed"} else 0.75
         sentiment_score = max(0.45, min(0.98, random.gauss(sentiment_base, 0.08)))
 
         data.append(
             {
                 "feedback_id": f"feedback_{i+1:05d}",
-                "customer_id": profile["customer_id"],
+                "customer_id": profiles["customer_id"][i],
                 "segment_id": segment,
                 "offer_type": offer_type,
                 "feedback_date": feedback_dt.isoformat(),
@@ -489,47 +506,131 @@ def generate_feedback_data(num_reviews: int, customer_profiles: pd.DataFrame) ->
                 "sentiment_score": round(sentiment_score, 2),
                 "key_phrases": selected_phrases,
                 "channel": sample_channel(generation_config),
-                "source": random.choice(["app_review", "campaign_feedback", "social_comment", "survey"]),
+                "source": random.choice(FEEDBACK_SOURCES),
                 "time_period": time_period,
                 "daypart": daypart,
-                "birth_year": int(profile["birth_year"]),
-                "age": int(profile["age"]),
-                "generation": profile["generation"],
-                "is_gen_z": bool(profile["is_gen_z"]),
+                "birth_year": int(profiles["birth_year"][i]),
+                "age": int(profiles["age"][i]),
+                "generation": generation,
+                "is_gen_z": bool(profiles["is_gen_z"][i]),
             }
         )
     return data
 
 
-def generate_customer_transactions_raw(crm_df: pd.DataFrame, redemption_df: pd.DataFrame) -> pd.DataFrame:
-    """Create raw transaction records derived from CRM visits."""
-    transactions_df = crm_df.copy()
-    transactions_df["transaction_date"] = pd.to_datetime(transactions_df["visit_date"])
-    transactions_df["transaction_id"] = [f"txn_{i+1:07d}" for i in range(len(transactions_df))]
-    transactions_df["total_spend"] = transactions_df["spend"]
+# Daypart of each hour 0-23 and period label of each quarter 1-4, as lookup arrays
+HOUR_DAYPARTS = np.array([determine_daypart_from_hour(hour) for hour in range(24)], dtype=object)
+QUARTER_LABELS = np.array(
+    [None] + [get_quarter_label(datetime(REFERENCE_YEAR, 3 * quarter, 1)) for quarter in range(1, 5)], dtype=object
+)
 
-    offers_by_customer = redemption_df.groupby("customer_id")["offer_type"].apply(list).to_dict()
 
-    def pick_offer(customer_id: str) -> str:
-        offers = offers_by_customer.get(customer_id)
-        if offers and random.random() < 0.65:
-            return random.choice(offers)
-        if random.random() < 0.25:
-            return random.choice(OFFER_TYPES)
-        return None
+def _sample_redeemed_offers(
+    customer_ids: np.ndarray,
+    redemption_df: pd.DataFrame,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Vectorized pick_offer: with probability 0.65 one of the customer's own
+    redeemed offer types (weighted by how often they redeemed it), otherwise a
+    random offer type with probability 0.25, otherwise None.
+
+    Each customer's offer types are laid out contiguously (sorted by customer),
+    so a pick is offsets[customer] + floor(uniform * count[customer]).
+    """
+    customers = pd.Index(pd.unique(redemption_df["customer_id"]))
+    redemption_codes = customers.get_indexer(redemption_df["customer_id"])
+    order = np.argsort(redemption_codes, kind="stable")
+    offers = np.asarray(redemption_df["offer_type"], dtype=object)[order]
+    counts = np.bincount(redemption_codes, minlength=len(customers))
+    starts = np.cumsum(counts) - counts
+
+    size = len(customer_ids)
+    codes = customers.get_indexer(customer_ids)
+    has_offers = codes >= 0
+    own = has_offers & (rng.random(size) < 0.65)
+    fallback = ~own & (rng.random(size) < 0.25)
+
+    redeemed = np.full(size, None, dtype=object)
+    own_codes = codes[own]
+    picks = starts[own_codes] + (rng.random(len(own_codes)) * counts[own_codes]).astype(np.int64)
+    redeemed[own] = offers[picks]
+    redeemed[fallback] = np.asarray(OFFER_TYPES, dtype=object)[rng.integers(0, len(OFFER_TYPES), fallback.sum())]
+    return redeemed
+
+
+def _sample_items(size: int, rng: np.random.Generator) -> List[List[str]]:
+    """
+    Vectorized random.sample(MENU_ITEMS, k=randint(1, 3)) per row.
+
+    Up to three distinct items are drawn per row by sampling without
+    replacement (each draw skips the items already taken) and decoded through
+    one Arrow list array. The result is a Python list per row, as before: an
+    Arrow-backed pandas column cannot be read back from the Parquet files
+    pandas writes (streaming_export), since pandas records its dtype as
+    list<item: string>[pyarrow].
+    """
+    max_items = min(3, len(MENU_ITEMS))
+    counts = rng.integers(1, max_items + 1, size=size)
+    draws = np.empty((size, max_items), dtype=np.int64)
+    for position in range(max_items):
+        code = rng.integers(0, len(MENU_ITEMS) - position, size=size)
+        # Shift past every earlier pick at or below the code, smallest first
+        for taken in np.sort(draws[:, :position], axis=1).T:
+            code += code >= taken
+        draws[:, position] = code
+
+    offsets = np.zeros(size + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    flat_codes = draws[np.arange(max_items) < counts[:, None]]
+    values = pa.DictionaryArray.from_arrays(
+        pa.array(flat_codes, type=pa.int32()), pa.array(MENU_ITEMS, type=pa.string())
+    ).dictionary_decode()
+    return pa.ListArray.from_arrays(pa.array(offsets), values).to_pylist()
+
+
+def generate_customer_transactions_raw(
+    crm_df: pd.DataFrame,
+    redemption_df: pd.DataFrame,
+    start_index: int = 0,
+    rng: Optional[np.random.Generator] = None,
+) -> pd.DataFrame:
+    """
+    Create raw transaction records derived from CRM visits.
+
+    Every derived column is drawn for the whole frame at once (NumPy draws and
+    lookup arrays); items holds a list of menu items per row. Only the CRM columns
+    carried into the output are copied. start_index offsets transaction_id
+    numbering, so chunks of crm_data can be derived one at a time (the
+    redemptions must cover the chunk's customers). rng defaults to a generator
+    seeded from NumPy's global random state, which export_to_dataframes seeds.
+    """
+    if rng is None:
+        rng = np.random.default_rng(np.random.randint(0, 2**31))
+    size = len(crm_df)
+    transactions_df = crm_df[
+        ["customer_id", "segment_id", "spend", "channel", "birth_year", "age", "generation", "is_gen_z"]
+    ].copy()
+    transaction_dates = pd.to_datetime(crm_df["visit_date"])
+    transactions_df["transaction_date"] = transaction_dates
+    transactions_df["transaction_id"] = [
+        f"txn_{i+1:07d}" for i in range(start_index, start_index + size)
+    ]
+    transactions_df["total_spend"] = transactions_df["spend"]
 
-    transactions_df["redeemed_offer"] = transactions_df["customer_id"].apply(pick_offer)
-    transactions_df["offer_type"] = transactions_df["redeemed_offer"].fillna(
-        transactions_df["segment_id"].map(lambda _: random.choice(OFFER_TYPES))
-    )
-    transactions_df["payment_method"] = [random.choice(PAYMENT_METHODS) for _ in range(len(transactions_df))]
-    transactions_df["items"] = [
-        random.sample(MENU_ITEMS, k=random.randint(1, min(3, len(MENU_ITEMS))))
-        for _ in range(len(transactions_df))
+    redeemed = _sample_redeemed_offers(np.asarray(crm_df["customer_id"], dtype=object), redemption_df, rng)
+    transactions_df["redeemed_offer"] = redeemed
+    offer_type = np.asarray(OFFER_TYPES, dtype=object)[rng.integers(0, len(OFFER_TYPES), size=size)]
+    has_redeemed = pd.notna(redeemed)
+    offer_type[has_redeemed] = redeemed[has_redeemed]
+    transactions_df["offer_type"] = offer_type
+    transactions_df["payment_method"] = np.asarray(PAYMENT_METHODS, dtype=object)[
+        rng.integers(0, len(PAYMENT_METHODS), size=size)
     ]
+    transactions_df["items"] = pd.Series(_sample_items(size, rng), index=transactions_df.index, dtype=object)
 
-    transactions_df["visit_daypart"] = transactions_df["transaction_date"].dt.hour.apply(determine_daypart_from_hour)
-    transactions_df["time_period"] = transactions_df["transaction_date"].apply(get_quarter_label)
+    transactions_df["visit_daypart"] = HOUR_DAYPARTS[transaction_dates.dt.hour.to_numpy()]
+    transactions_df["time_period"] = QUARTER_LABELS[transaction_dates.dt.quarter.to_numpy()]
 
     return transactions_df[
         [
@@ -585,6 +686,79 @@ def generate_customer_feedback_raw(feedback_df: pd.DataFrame) -> pd.DataFrame:
     ]
 
 
+def _top_values_by_segment(df: pd.DataFrame, column: str, k: int) -> Dict[str, List[Any]]:
+    """The k most frequent values of `column` within each segment_id, most frequent first"""
+    if df.empty:
+        return {}
+    counts = df.groupby(["segment_id", column], sort=False, observed=True).size().reset_index(name="count")
+    counts = counts.sort_values(["segment_id", "count"], ascending=[True, False], kind="stable")
+    return counts.groupby("segment_id", sort=False).head(k).groupby("segment_id", sort=False)[column].agg(list).to_dict()
+
+
+def order_segment_ids(segment_ids: Iterable[str]) -> List[str]:
+    """Segments in SEGMENTS order, followed by any other segment_id sorted by name"""
+    present = set(segment_ids)
+    return [segment for segment in SEGMENTS if segment in present] + sorted(present - set(SEGMENTS))
+
+
+def segment_summary_row(
+    segment: str,
+    *,
+    visits: int,
+    customers: int,
+    avg_spend: float,
+    transactions: int,
+    redemptions: int,
+    lift_estimate: float,
+    top_channels: List[Any],
+    preferred_mechanics: List[Any],
+    key_messaging_phrases: List[Any],
+    generation_mix: Dict[str, float],
+    top_time_periods: List[Any],
+    dominant_dayparts: List[Any],
+) -> Dict[str, Any]:
+    """
+    One customer_segments row from a segment's aggregated metrics.
+
+    Shared by generate_customer_segments and the streaming export's
+    SegmentSummaryAccumulator, so both produce identical rows.
+    """
+    visits_per_customer = visits / customers
+    redemption_rate = redemptions / (transactions or 1)
+    primary_generation = max(generation_mix, key=generation_mix.get) if generation_mix else None
+    gen_z_share = generation_mix.get("Gen Z", 0.0)
+
+    description = (
+        f"{segment.replace('-', ' ').title()} segment averaging ${avg_spend:0.2f} per visit "
+        f"and {visits_per_customer:0.1f} visits per month."
+    )
+
+    empirical_metrics = {
+        "avg_monthly_visits": round(float(visits_per_customer), 1),
+        "avg_spend": round(float(avg_spend), 2),
+        "segment_size": int(customers),
+        "top_channels": top_channels,
+        "generation_mix": generation_mix,
+        "top_time_periods": top_time_periods,
+        "dominant_dayparts": dominant_dayparts,
+    }
+
+    return {
+        "segment_id": segment,
+        "description": description,
+        "preferred_mechanics": preferred_mechanics or random.sample(OFFER_TYPES, k=3),
+        "key_messaging_phrases": key_messaging_phrases,
+        "redemption_rate": round(redemption_rate, 3),
+        "lift_estimate": round(lift_estimate, 2),
+        "empirical_metrics": json.dumps(empirical_metrics),
+        "created_at": datetime.utcnow().isoformat(),
+        "primary_generation": primary_generation,
+        "gen_z_share": round(float(gen_z_share), 3),
+        "top_time_periods": top_time_periods,
+        "dominant_dayparts": dominant_dayparts,
+    }
+
+
 def generate_customer_segments(
     crm_df: pd.DataFrame,
     transactions_df: pd.DataFrame,
@@ -592,106 +766,135 @@ def generate_customer_segments(
     feedback_df: pd.DataFrame,
     customer_profiles: pd.DataFrame,
 ) -> pd.DataFrame:
-    """Aggregate synthesized metrics by segment for initial seed data."""
-    segments = []
-
-    for segment in SEGMENTS:
-        crm_segment = crm_df[crm_df["segment_id"] == segment]
-        if crm_segment.empty:
-            continue
-
-        transactions_segment = transactions_df[transactions_df["segment_id"] == segment]
-        redemption_segment = redemption_df[redemption_df["segment_id"] == segment]
-        feedback_segment = feedback_df[feedback_df["segment_id"] == segment]
-        profile_segment = customer_profiles[customer_profiles["segment_id"] == segment]
-
-        visits_per_customer = (
-            crm_segment.groupby("customer_id")["visit_date"].count().mean()
-            if not crm_segment.empty
-            else 0
-        )
-        avg_spend = crm_segment["spend"].mean() if not crm_segment.empty else 0
-        transaction_count = len(transactions_segment) or 1
-        redemption_rate = len(redemption_segment) / transaction_count
-        lift_estimate = (
-            redemption_segment["lift_multiplier"].mean() if not redemption_segment.empty else 1.0
-        )
-
-        top_channels = crm_segment["channel"].value_counts().head(3).index.tolist()
-        preferred_mechanics = (
-            redemption_segment["offer_type"].value_counts().head(3).index.tolist()
-            if not redemption_segment.empty
-            else random.sample(OFFER_TYPES, k=3)
-        )
-
-        phrases = []
-        if not feedback_segment.empty and "key_phrases" in feedback_segment:
-            for value in feedback_segment["key_phrases"]:
-                phrases.extend(value if isinstance(value, list) else [value])
-        key_messaging_phrases = (
-            pd.Series(phrases).value_counts().head(5).index.tolist() if phrases else []
-        )
-
-        generation_mix = (
-            profile_segment["generation"].value_counts(normalize=True).round(3).to_dict()
-            if not profile_segment.empty
-            else {}
-        )
-        primary_generation = max(generation_mix, key=generation_mix.get) if generation_mix else None
-        gen_z_share = generation_mix.get("Gen Z", 0.0)
-
-        top_time_periods = crm_segment["time_period"].value_counts().head(3).index.tolist()
-        dominant_dayparts = crm_segment["visit_daypart"].value_counts().head(3).index.tolist()
+    """
+    Aggregate synthesized metrics by segment for initial seed data.
+
+    Every metric is one groupby over all segments (key phrases via explode), so
+    the cost is one pass per table however many segments there are. Segments are
+    reported in SEGMENTS order, followed by any other segment_id in crm_df.
+    """
+    crm_metrics = crm_df.groupby("segment_id").agg(
+        visits=("visit_date", "count"),
+        customers=("customer_id", "nunique"),
+        avg_spend=("spend", "mean"),
+    )
+    transaction_counts = transactions_df.groupby("segment_id").size()
+    redemption_metrics = redemption_df.groupby("segment_id").agg(
+        redemptions=("offer_type", "size"),
+        lift_estimate=("lift_multiplier", "mean"),
+    )
 
-        description = (
-            f"{segment.replace('-', ' ').title()} segment averaging ${avg_spend:0.2f} per visit "
-            f"and {visits_per_customer:0.1f} visits per month."
-        )
+    channels_by_segment = _top_values_by_segment(crm_df, "channel", 3)
+    time_periods_by_segment = _top_values_by_segment(crm_df, "time_period", 3)
+    dayparts_by_segment = _top_values_by_segment(crm_df, "visit_daypart", 3)
+    mechanics_by_segment = _top_values_by_segment(redemption_df, "offer_type", 3)
+    phrases_by_segment: Dict[str, List[Any]] = {}
+    if not feedback_df.empty and "key_phrases" in feedback_df:
+        phrases = feedback_df[["segment_id", "key_phrases"]].explode("key_phrases").dropna()
+        phrases_by_segment = _top_values_by_segment(phrases, "key_phrases", 5)
 
-        empirical_metrics = {
-            "avg_monthly_visits": round(visits_per_customer or 0, 1),
-            "avg_spend": round(avg_spend or 0, 2),
-            "segment_size": len(crm_segment["customer_id"].unique()),
-            "top_channels": top_channels,
-            "generation_mix": generation_mix,
-            "top_time_periods": top_time_periods,
-            "dominant_dayparts": dominant_dayparts,
-        }
+    generation_mixes: Dict[str, Dict[str, float]] = {}
+    generation_shares = customer_profiles.groupby("segment_id")["generation"].value_counts(normalize=True).round(3)
+    for (segment, generation), share in generation_shares.items():
+        generation_mixes.setdefault(segment, {})[generation] = float(share)
 
+    segments = []
+    for segment in order_segment_ids(crm_metrics.index):
+        metrics = crm_metrics.loc[segment]
+        redemptions = int(redemption_metrics["redemptions"].get(segment, 0))
         segments.append(
-            {
-                "segment_id": segment,
-                "description": description,
-                "preferred_mechanics": preferred_mechanics,
-                "key_messaging_phrases": key_messaging_phrases,
-                "redemption_rate": round(redemption_rate, 3),
-                "lift_estimate": round(lift_estimate, 2),
-                "empirical_metrics": json.dumps(empirical_metrics),
-                "created_at": datetime.utcnow().isoformat(),
-                "primary_generation": primary_generation,
-                "gen_z_share": round(float(gen_z_share), 3),
-                "top_time_periods": top_time_periods,
-                "dominant_dayparts": dominant_dayparts,
-            }
+            segment_summary_row(
+                segment,
+                visits=int(metrics["visits"]),
+                customers=int(metrics["customers"]),
+                avg_spend=float(metrics["avg_spend"]),
+                transactions=int(transaction_counts.get(segment, 0)),
+                redemptions=redemptions,
+                lift_estimate=float(redemption_metrics["lift_estimate"][segment]) if redemptions else 1.0,
+                top_channels=channels_by_segment.get(segment, []),
+                preferred_mechanics=mechanics_by_segment.get(segment, []),
+                key_messaging_phrases=phrases_by_segment.get(segment, []),
+                generation_mix=generation_mixes.get(segment, {}),
+                top_time_periods=time_periods_by_segment.get(segment, []),
+                dominant_dayparts=dayparts_by_segment.get(segment, []),
+            )
         )
 
     return pd.DataFrame(segments)
 
 
-def export_to_dataframes() -> Dict[str, pd.DataFrame]:
-    """Generate all synthetic data and return as pandas DataFrames."""
-    print("Generating synthetic CRM data...")
-    crm_rows, customer_profile_rows = generate_crm_data(num_customers=1200)
-    crm_df = pd.DataFrame(crm_rows)
-    customer_profiles = pd.DataFrame(customer_profile_rows)
-
-    print("Generating synthetic redemption logs...")
-    redemption_data = generate_redemption_logs(num_redemptions=5500, customer_profiles=customer_profiles)
-    redemption_df = pd.DataFrame(redemption_data)
+def export_to_dataframes(
+    engine: str = "python",
+    seed: Optional[int] = None,
+    num_customers: int = 1200,
+    num_redemptions: Optional[int] = None,
+    num_reviews: Optional[int] = None,
+    redemption_weights: Optional[Dict[str, float]] = None,
+    num_shards: Optional[int] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Generate all synthetic data and return as pandas DataFrames.
+
+    Args:
+        engine: "python" (row-by-row, the original generator) or "numpy"
+                (vectorized_generator.py, for large datasets) or "sharded" (the numpy
+                engine across a process pool, sharded_generator.py)
+        seed: Seed for reproducible output; None draws fresh randomness
+        num_customers: Number of customers in crm_data
+        num_redemptions: Redemption log rows (defaults to the 5500 per 1200 customers ratio;
+                         the sharded engine always uses the ratio)
+        num_reviews: Feedback rows (defaults to the 2200 per 1200 customers ratio; likewise)
+        redemption_weights: Optional segment -> relative redemption propensity (for example
+                            profile_sampler.HEAVY_REDEEMER_WEIGHTS); None spreads redemptions evenly
+        num_shards: Customer shards for the sharded engine (defaults to the CPU count);
+                    output is identical for the same seed and num_shards
+    """
+    if engine not in ("python", "numpy", "sharded"):
+        raise ValueError(f"Unknown generation engine '{engine}'; use 'python', 'numpy' or 'sharded'")
+    if engine == "sharded":
+        from .sharded_generator import generate_sharded
+
+        return generate_sharded(
+            num_customers, seed=seed, num_shards=num_shards, redemption_weights=redemption_weights
+        )
+    if num_redemptions is None:
+        num_redemptions = round(num_customers * 5500 / 1200)
+    if num_reviews is None:
+        num_reviews = round(num_customers * 2200 / 1200)
+    # The python engine and the derived tables use the random module, and
+    # DataFrame.sample draws from NumPy's global state
+    random.seed(seed)
+    np.random.seed(seed)
+
+    if engine == "numpy":
+        from .vectorized_generator import generate_crm_frame, generate_feedback_frame, generate_redemption_frame
+
+        rng = np.random.default_rng(seed)
+        print(f"Generating synthetic CRM data ({num_customers:,} customers, numpy engine)...")
+        crm_df, customer_profiles = generate_crm_frame(num_customers, rng)
+        weights = segment_weights(customer_profiles, redemption_weights) if redemption_weights else None
+
+        print("Generating synthetic redemption logs...")
+        redemption_df = generate_redemption_frame(num_redemptions, customer_profiles, rng, weights=weights)
+
+        print("Generating synthetic feedback data...")
+        feedback_df = generate_feedback_frame(num_reviews, customer_profiles, rng)
+    else:
+        print("Generating synthetic CRM data...")
+        crm_rows, customer_profile_rows = generate_crm_data(num_customers=num_customers)
+        crm_df = pd.DataFrame(crm_rows)
+        customer_profiles = pd.DataFrame(customer_profile_rows)
+        weights = segment_weights(customer_profiles, redemption_weights) if redemption_weights else None
+
+        print("Generating synthetic redemption logs...")
+        redemption_data = generate_redemption_logs(
+            num_redemptions=num_redemptions, customer_profiles=customer_profiles, weights=weights
+        )
+        redemption_df = pd.DataFrame(redemption_data)
 
-    print("Generating synthetic feedback data...")
-    feedback_data = generate_feedback_data(num_reviews=2200, customer_profiles=customer_profiles)
-    feedback_df = pd.DataFrame(feedback_data)
+        print("Generating synthetic feedback data...")
+        feedback_data = generate_feedback_data(num_reviews=num_reviews, customer_profiles=customer_profiles)
+        feedback_df = pd.DataFrame(feedback_data)
 
     print("Deriving raw transaction records...")
     transactions_df = generate_customer_transactions_raw(crm_df, redemption_df)
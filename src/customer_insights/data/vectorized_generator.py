@@ -0,0 +1,378 @@
+"""
+Vectorized NumPy engine for the synthetic data generator.
+
+Produces the same tables, columns and distributions as generate_crm_data,
+generate_redemption_logs and generate_feedback_data in
+synthetic_data_generator.py, but samples whole columns at once:
+
+- Categorical columns are drawn with one uniform per row against the
+  precomputed cumulative weights of the row's generation (searchsorted),
+  instead of a random.choices call that rebuilds the weight list every row.
+- Timestamps are built as datetime64 arithmetic (quarter start + day + hour
+  from DAYPART_HOURS + minute + second) instead of one datetime per row.
+
+All randomness comes from the np.random.Generator passed in, so output is
+reproducible for a given seed. The row-level draws are not the same stream
+as the Python engine, so the two engines agree in distribution, not row by
+row. Timestamp columns are datetime64 rather than ISO strings.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .profile_sampler import ProfileSampler, as_profile_sampler
+from .synthetic_data_generator import (
+    DAYPART_HOURS,
+    DEFAULT_CHANNEL_WEIGHTS,
+    DEFAULT_DAYPART_WEIGHTS,
+    DEFAULT_PHRASES,
+    DEFAULT_SEGMENT_WEIGHTS,
+    DEFAULT_TIME_PERIOD_WEIGHTS,
+    DEFAULT_VISIT_PROFILE,
+    FEEDBACK_SOURCES,
+    GENERATION_CONFIGS,
+    OFFER_TYPES,
+    REFERENCE_YEAR,
+    REVIEW_VERBS,
+    SEGMENT_PHRASES,
+    SEGMENT_VISIT_PROFILES,
+    TIME_PERIODS,
+)
+
+GENERATIONS = [config["name"] for config in GENERATION_CONFIGS]
+GEN_Z_CODE = GENERATIONS.index("Gen Z")
+DAYPARTS = list(DEFAULT_DAYPART_WEIGHTS)
+PERIODS = list(DEFAULT_TIME_PERIOD_WEIGHTS)
+SEGMENT_OPTIONS = list(DEFAULT_SEGMENT_WEIGHTS)
+CHANNEL_OPTIONS = list(DEFAULT_CHANNEL_WEIGHTS)
+DAY_NAMES = np.array(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], dtype=object)
+
+
+def cumulative_weights(weights: List[float]) -> np.ndarray:
+    """Normalized cumulative weights for searchsorted; all-zero weights mean uniform, like weighted_choice"""
+    weights = np.asarray(weights, dtype=float)
+    if weights.sum() == 0:
+        weights = np.ones_like(weights)
+    cdf = np.cumsum(weights / weights.sum())
+    cdf[-1] = 1.0
+    return cdf
+
+
+def _generation_cdfs(key: str, defaults: Dict[str, float]) -> List[np.ndarray]:
+    """One cumulative weight array per generation, in GENERATIONS order (same fallback as weighted_choice_from_map)"""
+    return [
+        cumulative_weights([config.get(key, {}).get(option, defaults[option]) for option in defaults])
+        for config in GENERATION_CONFIGS
+    ]
+
+
+GENERATION_CDF = cumulative_weights([config["weight"] for config in GENERATION_CONFIGS])
+SEGMENT_CDFS = _generation_cdfs("segment_weights", DEFAULT_SEGMENT_WEIGHTS)
+DAYPART_CDFS = _generation_cdfs("daypart_weights", DEFAULT_DAYPART_WEIGHTS)
+PERIOD_CDFS = _generation_cdfs("time_period_weights", DEFAULT_TIME_PERIOD_WEIGHTS)
+CHANNEL_CDFS = _generation_cdfs("channel_weights", DEFAULT_CHANNEL_WEIGHTS)
+
+AGE_LOW = np.array([config["age_range"][0] for config in GENERATION_CONFIGS])
+AGE_HIGH = np.array([config["age_range"][1] for config in GENERATION_CONFIGS])
+
+_visit_profiles = [SEGMENT_VISIT_PROFILES.get(segment, DEFAULT_VISIT_PROFILE) for segment in SEGMENT_OPTIONS]
+VISITS_LOW = np.array([profile["monthly_visits"][0] for profile in _visit_profiles])
+VISITS_HIGH = np.array([profile["monthly_visits"][1] for profile in _visit_profiles])
+SPEND_LOW = np.array([profile["spend_per_visit"][0] for profile in _visit_profiles])
+SPEND_HIGH = np.array([profile["spend_per_visit"][1] for profile in _visit_profiles])
+
+PERIOD_START = np.array([TIME_PERIODS[period]["start"].date() for period in PERIODS], dtype="datetime64[D]")
+PERIOD_DAYS = np.array(
+    [(TIME_PERIODS[period]["end"].date() - TIME_PERIODS[period]["start"].date()).days for period in PERIODS]
+)
+
+# Hours per daypart as a padded matrix, indexed by [daypart code, uniform index < HOUR_COUNTS]
+HOUR_COUNTS = np.array([len(DAYPART_HOURS.get(daypart, range(24))) for daypart in DAYPARTS])
+HOUR_TABLE = np.zeros((len(DAYPARTS), HOUR_COUNTS.max()), dtype=np.int64)
+for _code, _daypart in enumerate(DAYPARTS):
+    HOUR_TABLE[_code, : HOUR_COUNTS[_code]] = [hour % 24 for hour in DAYPART_HOURS.get(_daypart, range(24))]
+
+
+def labels(options: List[str], codes: np.ndarray) -> np.ndarray:
+    """Map integer codes to an object array of labels without creating new strings"""
+    return np.asarray(options, dtype=object)[codes]
+
+
+def draw_categorical(rng: np.random.Generator, cdf: np.ndarray, size: int) -> np.ndarray:
+    """Draw `size` codes from one cumulative weight array"""
+    return np.searchsorted(cdf, rng.random(size), side="right")
+
+
+def draw_by_group(rng: np.random.Generator, cdfs: List[np.ndarray], group_codes: np.ndarray) -> np.ndarray:
+    """Draw one code per row from the cumulative weights of the row's group"""
+    uniforms = rng.random(len(group_codes))
+    codes = np.empty(len(group_codes), dtype=np.int64)
+    for group, cdf in enumerate(cdfs):
+        mask = group_codes == group
+        codes[mask] = np.searchsorted(cdf, uniforms[mask], side="right")
+    return codes
+
+
+def sample_timestamps(rng: np.random.Generator, period_codes: np.ndarray, daypart_codes: np.ndarray) -> np.ndarray:
+    """
+    Vectorized sample_datetime: a uniform day in the quarter, an hour from the
+    daypart and a uniform minute and second.
+
+    Every day in a quarter spans 00:00-23:59:59, so the Python engine's range
+    clamps never apply and are not needed here.
+    """
+    size = len(period_codes)
+    days = PERIOD_START[period_codes] + rng.integers(0, PERIOD_DAYS[period_codes] + 1, size=size)
+    hours = HOUR_TABLE[daypart_codes, rng.integers(0, HOUR_COUNTS[daypart_codes], size=size)]
+    seconds = hours * 3600 + rng.integers(0, 60, size=size) * 60 + rng.integers(0, 60, size=size)
+    return days.astype("datetime64[s]") + seconds.astype("timedelta64[s]")
+
+
+def generate_crm_frame(
+    num_customers: int,
+    rng: np.random.Generator,
+    start_index: int = 0,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Vectorized generate_crm_data.
+
+    Args:
+        num_customers: Number of customers to generate
+        rng: NumPy random generator
+        start_index: Zero-based index of the first customer, used for customer_id numbering
+
+    Returns:
+        (crm_df, customer_profiles) DataFrames with the same columns as generate_crm_data
+    """
+    generation_codes = draw_categorical(rng, GENERATION_CDF, num_customers)
+    ages = rng.integers(AGE_LOW[generation_codes], AGE_HIGH[generation_codes] + 1)
+    segment_codes = draw_by_group(rng, SEGMENT_CDFS, generation_codes)
+    monthly_visits = rng.integers(VISITS_LOW[segment_codes], VISITS_HIGH[segment_codes] + 1)
+    spend_per_visit = np.round(rng.uniform(SPEND_LOW[segment_codes], SPEND_HIGH[segment_codes]), 2)
+    preferred_codes = draw_by_group(rng, DAYPART_CDFS, generation_codes)
+    lifetime_visits = monthly_visits * rng.integers(18, 49, size=num_customers)
+    lifetime_spend = np.round(spend_per_visit * lifetime_visits, 2)
+
+    annual_visits = monthly_visits * 12
+    num_visits = rng.integers((annual_visits * 0.6).astype(np.int64), (annual_visits * 1.1).astype(np.int64) + 1)
+
+    customer_ids = np.array(
+        [f"customer_{i + 1:04d}" for i in range(start_index, start_index + num_customers)], dtype=object
+    )
+    generations = labels(GENERATIONS, generation_codes)
+    segments = labels(SEGMENT_OPTIONS, segment_codes)
+    preferred_times = labels(DAYPARTS, preferred_codes)
+    birth_years = REFERENCE_YEAR - ages
+    is_gen_z = generation_codes == GEN_Z_CODE
+
+    customer_profiles = pd.DataFrame(
+        {
+            "customer_id": customer_ids,
+            "segment_id": segments,
+            "generation": generations,
+            "birth_year": birth_years,
+            "age": ages,
+            "is_gen_z": is_gen_z,
+            "preferred_time": preferred_times,
+        }
+    )
+
+    # Expand customers to one row per visit
+    visit_customer = np.repeat(np.arange(num_customers), num_visits)
+    visit_generation = generation_codes[visit_customer]
+    period_codes = draw_by_group(rng, PERIOD_CDFS, visit_generation)
+    daypart_codes = draw_by_group(rng, DAYPART_CDFS, visit_generation)
+    visit_dates = sample_timestamps(rng, period_codes, daypart_codes)
+    visit_spend_base = spend_per_visit[visit_customer]
+    spend = np.round(rng.uniform(visit_spend_base * 0.7, visit_spend_base * 1.3), 2)
+    channel_codes = draw_by_group(rng, CHANNEL_CDFS, visit_generation)
+
+    crm_df = pd.DataFrame(
+        {
+            "customer_id": customer_ids[visit_customer],
+            "segment_id": segments[visit_customer],
+            "visit_date": visit_dates,
+            "spend": spend,
+            "channel": labels(CHANNEL_OPTIONS, channel_codes),
+            "preferred_time": preferred_times[visit_customer],
+            "total_lifetime_visits": lifetime_visits[visit_customer],
+            "total_lifetime_spend": lifetime_spend[visit_customer],
+            "birth_year": birth_years[visit_customer],
+            "age": ages[visit_customer],
+            "generation": generations[visit_customer],
+            "is_gen_z": is_gen_z[visit_customer],
+            "time_period": labels(PERIODS, period_codes),
+            "visit_daypart": labels(DAYPARTS, daypart_codes),
+        }
+    )
+    return crm_df, customer_profiles
+
+
+def generate_redemption_frame(
+    num_redemptions: int,
+    customer_profiles: Union[pd.DataFrame, ProfileSampler],
+    rng: np.random.Generator,
+    start_index: int = 0,
+    weights: Optional[Sequence[float]] = None,
+) -> pd.DataFrame:
+    """
+    Vectorized generate_redemption_logs.
+
+    Pass a ProfileSampler instead of the profiles DataFrame to reuse it (and its
+    weights) across batches; start_index offsets redemption_id numbering.
+    """
+    sampler = as_profile_sampler(customer_profiles, weights)
+    profile_rows = sampler.sample_indices(num_redemptions, rng)
+    generation = sampler.codes("generation", GENERATIONS)[profile_rows]
+    segment = sampler.columns["segment_id"][profile_rows]
+
+    offer_codes = rng.integers(0, len(OFFER_TYPES), size=num_redemptions)
+    offer_type = labels(OFFER_TYPES, offer_codes)
+
+    # Lift ranges follow the same if/elif precedence as generate_redemption_logs
+    lift_low = np.full(num_redemptions, 1.1)
+    lift_high = np.full(num_redemptions, 1.8)
+    unassigned = np.ones(num_redemptions, dtype=bool)
+    for condition, low, high in [
+        ((offer_type == "BOGO") & (segment == "value-driven-lunch-buyer"), 2.0, 2.8),
+        ((offer_type == "Time-Boxed") & np.isin(segment, ["convenience-driven", "value-driven-lunch-buyer"]), 1.8, 2.6),
+        ((offer_type == "App Exclusive") & (generation == GEN_Z_CODE), 2.0, 2.7),
+        (segment == "discount-hunter", 1.5, 2.2),
+    ]:
+        rule = condition & unassigned
+        lift_low[rule] = low
+        lift_high[rule] = high
+        unassigned &= ~rule
+    lift = rng.uniform(lift_low, lift_high)
+
+    channel_codes = draw_by_group(rng, CHANNEL_CDFS, generation)
+    period_codes = draw_by_group(rng, PERIOD_CDFS, generation)
+    daypart_codes = draw_by_group(rng, DAYPART_CDFS, generation)
+    redemption_dates = sample_timestamps(rng, period_codes, daypart_codes)
+    channel = labels(CHANNEL_OPTIONS, channel_codes)
+    days_since_epoch = redemption_dates.astype("datetime64[D]").astype(np.int64)
+
+    return pd.DataFrame(
+        {
+            "redemption_id": [f"redemption_{i + 1:05d}" for i in range(start_index, start_index + num_redemptions)],
+            "customer_id": sampler.columns["customer_id"][profile_rows],
+            "segment_id": segment,
+            "offer_type": offer_type,
+            "redemption_date": redemption_dates,
+            "channel": channel,
+            "is_time_boxed": offer_type == "Time-Boxed",
+            "is_app_exclusive": (offer_type == "App Exclusive") | (channel == "app"),
+            "lift_multiplier": np.round(lift, 2),
+            "redemption_value": np.round(rng.uniform(5.0, 16.0, size=num_redemptions), 2),
+            "month": np.datetime_as_string(redemption_dates, unit="M").astype(object),
+            # 1970-01-01 was a Thursday
+            "day_of_week": DAY_NAMES[(days_since_epoch + 3) % 7],
+            "hour": (redemption_dates.astype("datetime64[h]") - redemption_dates.astype("datetime64[D]")).astype(np.int64),
+            "time_period": labels(PERIODS, period_codes),
+            "daypart": labels(DAYPARTS, daypart_codes),
+            "birth_year": sampler.columns["birth_year"][profile_rows].astype(np.int64),
+            "age": sampler.columns["age"][profile_rows].astype(np.int64),
+            "generation": labels(GENERATIONS, generation),
+            "is_gen_z": generation == GEN_Z_CODE,
+        }
+    )
+
+
+def _sample_phrases(rng: np.random.Generator, segment: np.ndarray) -> Tuple[List[List[str]], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per row, sample 2-4 phrases without replacement from the segment's phrase
+    list (random.sample equivalent: the first k entries of a random permutation).
+
+    Returns:
+        (key_phrases lists, phrases per row, first phrase, second phrase, one phrase picked at random)
+    """
+    size = len(segment)
+    counts = rng.integers(2, 5, size=size)
+    pick = rng.random(size)
+    key_phrases: List[List[str]] = [[] for _ in range(size)]
+    first = np.empty(size, dtype=object)
+    second = np.empty(size, dtype=object)
+    picked = np.empty(size, dtype=object)
+
+    known = np.isin(segment, list(SEGMENT_PHRASES))
+    groups = [(segment == name, phrases) for name, phrases in SEGMENT_PHRASES.items()]
+    groups.append((~known, DEFAULT_PHRASES))
+    for mask, phrases in groups:
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            continue
+        phrases = np.asarray(phrases, dtype=object)
+        selected = phrases[np.argsort(rng.random((len(rows), len(phrases))), axis=1)]
+        row_counts = np.minimum(counts[rows], len(phrases))
+        counts[rows] = row_counts
+        first[rows] = selected[:, 0]
+        second[rows] = selected[:, min(1, len(phrases) - 1)]
+        picked[rows] = selected[np.arange(len(rows)), (pick[rows] * row_counts).astype(np.int64)]
+        for row, chosen, count in zip(rows, selected, row_counts):
+            key_phrases[row] = chosen[:count].tolist()
+    return key_phrases, counts, first, second, picked
+
+
+def generate_feedback_frame(
+    num_reviews: int,
+    customer_profiles: Union[pd.DataFrame, ProfileSampler],
+    rng: np.random.Generator,
+    start_index: int = 0,
+    weights: Optional[Sequence[float]] = None,
+) -> pd.DataFrame:
+    """Vectorized generate_feedback_data; arguments as for generate_redemption_frame"""
+    sampler = as_profile_sampler(customer_profiles, weights)
+    profile_rows = sampler.sample_indices(num_reviews, rng)
+    generation = sampler.codes("generation", GENERATIONS)[profile_rows]
+    segment = sampler.columns["segment_id"][profile_rows]
+
+    period_codes = draw_by_group(rng, PERIOD_CDFS, generation)
+    daypart_codes = draw_by_group(rng, DAYPART_CDFS, generation)
+    feedback_dates = sample_timestamps(rng, period_codes, daypart_codes)
+    offer_codes = rng.integers(0, len(OFFER_TYPES), size=num_reviews)
+    offer_type = labels(OFFER_TYPES, offer_codes)
+    offer = labels([offer_name.lower() for offer_name in OFFER_TYPES], offer_codes)
+    daypart = labels(DAYPARTS, daypart_codes)
+
+    key_phrases, counts, first, second, picked = _sample_phrases(rng, segment)
+    has_second = counts > 1
+    verbs = labels(REVIEW_VERBS, rng.integers(0, len(REVIEW_VERBS), size=num_reviews))
+    templates = [
+        "I " + verbs + " the " + offer + " offer. " + picked + "!",
+        "The " + offer + " was " + first + ". " + np.where(has_second, second, "Great experience!"),
+        "Really " + first + " how " + np.where(has_second, second, "smooth") + " the " + offer + " was.",
+    ]
+    review_text = np.choose(rng.integers(0, len(templates), size=num_reviews), templates)
+    review_text = np.where(offer_type == "App Exclusive", review_text + " The app made it so easy!", review_text)
+    review_text = np.where(
+        (offer_type == "Time-Boxed") & (daypart == "breakfast"),
+        review_text + " Perfect timing for my morning rush.",
+        review_text,
+    )
+
+    sentiment_base = np.where(
+        (generation == GEN_Z_CODE) & np.isin(offer_type, ["App Exclusive", "Time-Boxed"]), 0.88, 0.75
+    )
+    sentiment_score = np.clip(rng.normal(sentiment_base, 0.08), 0.45, 0.98)
+
+    return pd.DataFrame(
+        {
+            "feedback_id": [f"feedback_{i + 1:05d}" for i in range(start_index, start_index + num_reviews)],
+            "customer_id": sampler.columns["customer_id"][profile_rows],
+            "segment_id": segment,
+            "offer_type": offer_type,
+            "feedback_date": feedback_dates,
+            "review_text": review_text,
+            "sentiment_score": np.round(sentiment_score, 2),
+            "key_phrases": key_phrases,
+            "channel": labels(CHANNEL_OPTIONS, draw_by_group(rng, CHANNEL_CDFS, generation)),
+            "source": labels(FEEDBACK_SOURCES, rng.integers(0, len(FEEDBACK_SOURCES), size=num_reviews)),
+            "time_period": labels(PERIODS, period_codes),
+            "daypart": daypart,
+            "birth_year": sampler.columns["birth_year"][profile_rows].astype(np.int64),
+            "age": sampler.columns["age"][profile_rows].astype(np.int64),
+            "generation": labels(GENERATIONS, generation),
+            "is_gen_z": generation == GEN_Z_CODE,
+        }
+    )
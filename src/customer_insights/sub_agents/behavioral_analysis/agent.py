@@ -7,8 +7,8 @@ def get_behavioral_tools():
     """Get tools for BehavioralAnalysisAgent"""
     # Import the wrapped FunctionTool instance
     # Participants can add more tools during hackathon
-    from .tools import crm_database_tool, redemption_log_tool
-    return [crm_database_tool, redemption_log_tool]
+    from .tools import batch_query_tool, crm_database_tool, redemption_log_tool
+    return [crm_database_tool, redemption_log_tool, batch_query_tool]
 
 behavioral_analysis_agent = LlmAgent(
     name="BehavioralAnalysisAgent",
@@ -18,4 +18,5 @@ behavioral_analysis_agent = LlmAgent(
     ),
     description="Analyzes quantitative behavioral data including redemption patterns, segment identification, and lift metrics.",
     tools=get_behavioral_tools(),
+    output_key="behavioral_analysis",
 )
@@ -9,29 +9,23 @@ from src.utils.env_loader import load_env
 load_env()
 
 from google.adk.tools import FunctionTool
-from google.cloud import bigquery
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import asyncio
 import os
 import json
+import time
 
+from ...data.query_backend import get_query_backend
+from ...data.query_runner import QueryCostError, format_result, run_blocking
+from ...data.query_templates import template_query_from_text
 
-def get_bigquery_client() -> bigquery.Client:
-    """Get BigQuery client with credentials"""
-    project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    
-    if credentials_path:
-        client = bigquery.Client.from_service_account_json(credentials_path, project=project_id)
-    else:
-        client = bigquery.Client(project=project_id)
-    
-    return client
 
-
-def crm_database_tool(
+async def crm_database_tool(
     query: str,
     dataset_id: str,
-    table_name: str
+    table_name: str,
+    result_format: str = "columnar",
+    mode: str = "raw",
 ) -> Dict[str, Any]:
     """
     Query the Loyalty and CRM database for visits, spend, and segment information.
@@ -46,20 +40,35 @@ def crm_database_tool(
         query: SQL query string or natural language query describing what data to retrieve.
                Examples:
                - "SELECT segment_id, AVG(spend) as avg_spend FROM crm_data GROUP BY segment_id"
-               - "Find all customers in value-driven-lunch-buyer segment with more than 20 visits"
-               - "Get transactions with redeemed offers"
+               - "Summarize the value-driven-lunch-buyer segment for Gen Z in 2025-Q1"
+               - "Compare Gen Z vs non-Gen Z breakfast visits on app"
+               - "Daypart breakdown for the discount-hunter segment"
+               Natural-language queries run a named template (segment_summary, cohort_comparison,
+               daypart_breakdown, or transaction_summary for customer_transactions_raw) filtered by
+               any segment, offer type, channel, daypart, quarter or Gen Z mention.
         dataset_id: BigQuery dataset ID (typically: "wendys_hackathon_data")
         table_name: BigQuery table name - 'crm_data' or 'customer_transactions_raw' (typically: "crm_data")
+        result_format: "columnar" (default) returns compact column -> values lists in `data`;
+                       "rows" returns a list of row objects in `rows` instead
+        mode: "raw" (default) returns result rows, capped at the tool's row/byte budget;
+              "summary" returns server-side aggregates per column (count, avg, p25-p90,
+              top values) over the full result instead of rows - use it for large scans
     
     Returns:
         Dictionary containing:
-        - rows: List of query results
+        - data: Query results as column name -> list of values (columnar format)
+        - rows: List of query results (only when result_format="rows")
         - columns: Column names
         - row_count: Number of rows returned
+        - summary: Per-column aggregates (only when mode="summary")
+        - truncated / total_rows: Whether rows were dropped to fit the budget, and the full row count
         - query_executed: The SQL query that was executed
+        - bytes_processed: BigQuery's dry-run estimate of bytes scanned (keep this low)
+        - cache_hit: Whether the result was served from the query result cache
+        - template / template_parameters: Query template and filters used for a natural-language query
     """
-    client = get_bigquery_client()
-    project_id = client.project
+    backend = get_query_backend()
+    project_id = backend.project
     
     # Determine which table to query based on query content or use specified table
     primary_table = table_name if table_name else "crm_data"
@@ -74,35 +83,26 @@ def crm_database_tool(
     # Set default dataset if not provided
     dataset = dataset_id if dataset_id else "wendys_hackathon_data"
     
-    # If query is natural language, try to convert to SQL (simplified)
+    # Summary mode aggregates the whole result, so natural-language fallbacks are not row-limited
+    row_limit = "" if mode == "summary" else "LIMIT 100"
+    
+    # Natural-language requests run a parameterized template instead of LIKE scans,
+    # so the same question always produces the same cacheable query
+    query_parameters = []
+    template_fields: Dict[str, Any] = {}
     if not query.strip().upper().startswith("SELECT"):
-        if primary_table == "customer_transactions_raw":
-            sql_query = f"""
-            SELECT 
-                customer_id,
-                COUNT(*) as transaction_count,
-                AVG(total_spend) as avg_spend,
-                COUNT(DISTINCT redeemed_offer) as unique_offers_redeemed,
-                channel,
-                COUNTIF(redeemed_offer IS NOT NULL) as redemptions_count
-            FROM `{project_id}.{dataset}.{primary_table}`
-            WHERE customer_id LIKE '%{query}%' OR redeemed_offer LIKE '%{query}%'
-            GROUP BY customer_id, channel
-            LIMIT 100
-            """
-        else:
-            sql_query = f"""
-            SELECT 
-                segment_id,
-                COUNT(DISTINCT customer_id) as customer_count,
-                AVG(spend) as avg_spend,
-                COUNT(*) as total_visits,
-                AVG(total_lifetime_visits) as avg_lifetime_visits
-            FROM `{project_id}.{dataset}.{primary_table}`
-            WHERE segment_id LIKE '%{query}%' OR customer_id LIKE '%{query}%'
-            GROUP BY segment_id
-            LIMIT 100
-            """
+        template = template_query_from_text(query, primary_table, project_id, dataset, row_limit)
+        if template is None:
+            return {
+                "error": f"No query template reads from '{primary_table}'; pass a SELECT statement instead",
+                "query_executed": "",
+                "data": {},
+                "columns": [],
+                "row_count": 0,
+            }
+        sql_query = template["sql"]
+        query_parameters = template["query_parameters"]
+        template_fields = {"template": template["template"], "template_parameters": template["parameters"]}
     else:
         # Replace table name in query if needed
         sql_query = query.replace("{table}", f"`{project_id}.{dataset_id}.{primary_table}`")
@@ -113,38 +113,54 @@ def crm_database_tool(
             sql_query = sql_query.replace("FROM transactions", f"FROM `{project_id}.{dataset_id}.customer_transactions_raw`")
     
     try:
-        query_job = client.query(sql_query)
-        results = query_job.result()
-        
-        rows = []
-        columns = [field.name for field in results.schema]
+        if mode == "summary":
+            summary = await backend.run_summary_query_async(sql_query, dataset, query_parameters)
+            return {
+                "mode": "summary",
+                "summary": summary["summary"],
+                "row_count": summary["summary"]["row_count"],
+                "query_executed": sql_query,
+                "summary_query": summary["summary_query"],
+                "bytes_processed": summary["bytes_processed"],
+                "cache_hit": summary["cache_hit"],
+                **template_fields,
+            }
         
-        for row in results:
-            row_dict = {}
-            for col in columns:
-                row_dict[col] = row[col]
-            rows.append(row_dict)
+        result = await backend.run_query_async(sql_query, dataset, query_parameters=query_parameters)
         
         return {
-            "rows": rows,
-            "columns": columns,
-            "row_count": len(rows),
+            **format_result(result, result_format),
             "query_executed": sql_query,
+            "bytes_processed": result["bytes_processed"],
+            "cache_hit": result["cache_hit"],
+            **template_fields,
+        }
+    except QueryCostError as e:
+        return {
+            "error": str(e),
+            "bytes_processed": e.bytes_processed,
+            "max_bytes_billed": e.max_bytes_billed,
+            "query_executed": sql_query,
+            "data": {},
+            "columns": [],
+            "row_count": 0,
         }
     except Exception as e:
         return {
             "error": str(e),
             "query_executed": sql_query,
-            "rows": [],
+            "data": {},
             "columns": [],
             "row_count": 0,
         }
 
 
-def redemption_log_tool(
+async def redemption_log_tool(
     query: str,
     dataset_id: str,
-    table_name: str
+    table_name: str,
+    result_format: str = "columnar",
+    mode: str = "raw",
 ) -> Dict[str, Any]:
     """
     Query Redemption logs and offer history.
@@ -158,113 +174,217 @@ def redemption_log_tool(
                - "CALCULATE lift for 'BOGO' offer WHERE channel='app'"
                - "SELECT offer_type, AVG(lift_multiplier) as avg_lift, COUNT(*) as count FROM redemption_logs WHERE channel='app' GROUP BY offer_type"
                - "Find redemption patterns for value-driven-lunch-buyer segment"
+               Natural-language queries run the offer_lift_by_channel template filtered by any
+               segment, offer type, channel, daypart, quarter or Gen Z mention.
         dataset_id: BigQuery dataset ID (typically: "wendys_hackathon_data")
         table_name: BigQuery table name (typically: "redemption_logs")
+        result_format: "columnar" (default) returns compact column -> values lists in `data`;
+                       "rows" returns a list of row objects in `rows` instead
+        mode: "raw" (default) returns result rows, capped at the tool's row/byte budget;
+              "summary" returns server-side aggregates per column (count, avg, p25-p90,
+              top values) over the full result instead of rows - use it for large scans
     
     Returns:
         Dictionary containing:
-        - rows: List of query results
+        - data: Query results as column name -> list of values (columnar format)
+        - rows: List of query results (only when result_format="rows")
         - columns: Column names
         - row_count: Number of rows returned
+        - summary: Per-column aggregates (only when mode="summary")
+        - truncated / total_rows: Whether rows were dropped to fit the budget, and the full row count
         - query_executed: The SQL query that was executed
+        - bytes_processed: BigQuery's dry-run estimate of bytes scanned (keep this low)
         - metrics: Calculated metrics if applicable (avg_lift, redemption_rate, etc.)
+        - cache_hit: Whether the result was served from the query result cache
+        - template / template_parameters: Query template and filters used for a natural-language query
     """
-    client = get_bigquery_client()
-    project_id = client.project
+    backend = get_query_backend()
+    project_id = backend.project
     
     # Set defaults if not provided
     dataset = dataset_id if dataset_id else "wendys_hackathon_data"
     table = table_name if table_name else "redemption_logs"
     
-    # Handle natural language queries for lift calculation
-    if "CALCULATE lift" in query.upper() or "calculate lift" in query.lower():
-        # Extract offer type and channel from query
-        offer_type = "BOGO"  # default
-        channel = None
-        
-        if "BOGO" in query.upper():
-            offer_type = "BOGO"
-        elif "time-boxed" in query.lower() or "time_boxed" in query.lower():
-            offer_type = "Time-Boxed"
-        elif "app" in query.lower():
-            offer_type = "App Exclusive"
-        
-        if "channel='app'" in query or "channel = 'app'" in query:
-            channel = "app"
-        elif "channel='web'" in query or "channel = 'web'" in query:
-            channel = "web"
-        
-        sql_query = f"""
-        SELECT 
-            offer_type,
-            channel,
-            AVG(lift_multiplier) as avg_lift,
-            COUNT(*) as redemption_count,
-            COUNT(DISTINCT customer_id) as unique_customers,
-            AVG(redemption_value) as avg_redemption_value
-        FROM `{project_id}.{dataset}.{table}`
-        WHERE offer_type = '{offer_type}'
-        """
-        if channel:
-            sql_query += f" AND channel = '{channel}'"
-        sql_query += " GROUP BY offer_type, channel"
-    elif not query.strip().upper().startswith("SELECT"):
-        # Simple natural language conversion
-        sql_query = f"""
-        SELECT 
-            offer_type,
-            segment_id,
-            channel,
-            AVG(lift_multiplier) as avg_lift,
-            COUNT(*) as redemption_count
-        FROM `{project_id}.{dataset}.{table}`
-        WHERE segment_id LIKE '%{query}%' OR offer_type LIKE '%{query}%'
-        GROUP BY offer_type, segment_id, channel
-        ORDER BY avg_lift DESC
-        LIMIT 100
-        """
+    # Summary mode aggregates the whole result, so natural-language fallbacks are not row-limited
+    row_limit = "" if mode == "summary" else "LIMIT 100"
+    
+    # Natural-language requests run a parameterized template instead of LIKE scans,
+    # so the same question always produces the same cacheable query
+    query_parameters = []
+    template_fields: Dict[str, Any] = {}
+    if not query.strip().upper().startswith("SELECT"):
+        template = template_query_from_text(query, table, project_id, dataset, row_limit)
+        if template is None:
+            return {
+                "error": f"No query template reads from '{table}'; pass a SELECT statement instead",
+                "query_executed": "",
+                "data": {},
+                "columns": [],
+                "row_count": 0,
+                "metrics": {},
+            }
+        sql_query = template["sql"]
+        query_parameters = template["query_parameters"]
+        template_fields = {"template": template["template"], "template_parameters": template["parameters"]}
     else:
         sql_query = query.replace("{table}", f"`{project_id}.{dataset}.{table}`")
         if f"{project_id}.{dataset}.{table}" not in sql_query:
             sql_query = sql_query.replace("FROM redemption_logs", f"FROM `{project_id}.{dataset}.{table}`")
     
     try:
-        query_job = client.query(sql_query)
-        results = query_job.result()
-        
-        rows = []
-        columns = [field.name for field in results.schema]
+        if mode == "summary":
+            summary = await backend.run_summary_query_async(sql_query, dataset, query_parameters)
+            column_stats = summary["summary"]["columns"]
+            metrics = {}
+            if "avg_lift" in column_stats:
+                metrics["avg_lift"] = column_stats["avg_lift"].get("avg")
+            if "redemption_count" in column_stats:
+                metrics["redemption_count_p50"] = column_stats["redemption_count"].get("p50")
+            return {
+                "mode": "summary",
+                "summary": summary["summary"],
+                "row_count": summary["summary"]["row_count"],
+                "query_executed": sql_query,
+                "summary_query": summary["summary_query"],
+                "metrics": metrics,
+                "bytes_processed": summary["bytes_processed"],
+                "cache_hit": summary["cache_hit"],
+                **template_fields,
+            }
         
-        for row in results:
-            row_dict = {}
-            for col in columns:
-                row_dict[col] = row[col]
-            rows.append(row_dict)
+        result = await backend.run_query_async(sql_query, dataset, query_parameters=query_parameters)
+        data = result["data"]
+        row_count = result["row_count"]
         
         # Calculate summary metrics
         metrics = {}
-        if rows:
-            metrics["avg_lift"] = sum(r.get("avg_lift", 0) or 0 for r in rows) / len(rows)
-            metrics["total_redemptions"] = sum(r.get("redemption_count", 0) or 0 for r in rows)
+        if row_count:
+            metrics["avg_lift"] = sum(v or 0 for v in data.get("avg_lift", [])) / row_count
+            metrics["total_redemptions"] = sum(v or 0 for v in data.get("redemption_count", []))
         
         return {
-            "rows": rows,
-            "columns": columns,
-            "row_count": len(rows),
+            **format_result(result, result_format),
             "query_executed": sql_query,
             "metrics": metrics,
+            "bytes_processed": result["bytes_processed"],
+            "cache_hit": result["cache_hit"],
+            **template_fields,
+        }
+    except QueryCostError as e:
+        return {
+            "error": str(e),
+            "bytes_processed": e.bytes_processed,
+            "max_bytes_billed": e.max_bytes_billed,
+            "query_executed": sql_query,
+            "data": {},
+            "columns": [],
+            "row_count": 0,
+            "metrics": {},
         }
     except Exception as e:
         return {
             "error": str(e),
             "query_executed": sql_query,
-            "rows": [],
+            "data": {},
             "columns": [],
             "row_count": 0,
             "metrics": {},
         }
 
 
-# Wrap functions with FunctionTool for ADK
+# Most statements a single batch_query_tool call may run
+MAX_BATCH_QUERIES = int(os.getenv("BQ_BATCH_MAX_QUERIES", "12"))
+
+# Tool that answers a batch entry, by table_name (anything else goes to crm_database_tool)
+BATCH_TABLE_TOOLS = {
+    "crm_data": crm_database_tool,
+    "customer_transactions_raw": crm_database_tool,
+    "redemption_logs": redemption_log_tool,
+}
+# Bound now: crm_database_tool is rebound to its FunctionTool wrapper at the end of this module
+_DEFAULT_BATCH_TOOL = crm_database_tool
+
+
+async def batch_query_tool(
+    queries: List[Dict[str, Any]],
+    dataset_id: str,
+    result_format: str = "columnar",
+) -> Dict[str, Any]:
+    """
+    Run several named queries at once as concurrent BigQuery jobs and return every result.
+    
+    Use this instead of a chain of separate crm_database_tool / redemption_log_tool calls
+    when the queries do not depend on each other's results, e.g. the mandatory Gen Z and
+    non-Gen Z schema checks plus the cohort, daypart and channel breakdowns of one run.
+    
+    Args:
+        queries: List of query objects, each with:
+                 - name: Key for this query's result (e.g. "gen_z_visits"); must be unique
+                 - query: SQL statement or natural-language query, as for crm_database_tool
+                 - table_name: 'crm_data', 'customer_transactions_raw' or 'redemption_logs'
+                 - mode: Optional, "raw" (default) or "summary"
+                 Example:
+                 [{"name": "gen_z_visits", "query": "SELECT COUNT(*) AS gen_z_visits FROM crm_data WHERE is_gen_z = TRUE", "table_name": "crm_data"},
+                  {"name": "non_gen_z_visits", "query": "SELECT COUNT(*) AS non_gen_z_visits FROM crm_data WHERE is_gen_z = FALSE", "table_name": "crm_data"}]
+        dataset_id: BigQuery dataset ID (typically: "wendys_hackathon_data")
+        result_format: "columnar" (default) or "rows", applied to every query
+    
+    Returns:
+        Dictionary containing:
+        - results: Query name -> that query's result, exactly as crm_database_tool or
+                   redemption_log_tool returns it, plus elapsed_ms
+        - query_count / error_count: Number of queries run and how many returned an error
+        - bytes_processed: Total bytes scanned by the batch
+        - elapsed_ms: Wall-clock time of the whole batch
+    """
+    if not queries:
+        return {"error": "Pass at least one query", "results": {}, "query_count": 0}
+    if len(queries) > MAX_BATCH_QUERIES:
+        return {
+            "error": f"A batch may run at most {MAX_BATCH_QUERIES} queries; got {len(queries)}",
+            "results": {},
+            "query_count": 0,
+        }
+    names = [entry.get("name") or f"query_{index + 1}" for index, entry in enumerate(queries)]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        return {"error": f"Duplicate query names: {', '.join(duplicates)}", "results": {}, "query_count": 0}
+    
+    async def run_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        table_name = entry.get("table_name") or "crm_data"
+        tool = BATCH_TABLE_TOOLS.get(table_name, _DEFAULT_BATCH_TOOL)
+        started = time.perf_counter()
+        try:
+            result = await tool(
+                entry.get("query", ""),
+                dataset_id,
+                table_name,
+                result_format=result_format,
+                mode=entry.get("mode") or "raw",
+            )
+        except Exception as e:
+            result = {"error": str(e), "data": {}, "columns": [], "row_count": 0}
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+    
+    # Every query is submitted at once; query_runner bounds how many jobs are in flight
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_entry(entry) for entry in queries))
+    return {
+        "results": dict(zip(names, results)),
+        "query_count": len(results),
+        "error_count": sum(1 for result in results if "error" in result),
+        "bytes_processed": sum(result.get("bytes_processed") or 0 for result in results),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+# Blocking variants for scripts without an event loop
+crm_database_tool_sync = run_blocking(crm_database_tool)
+redemption_log_tool_sync = run_blocking(redemption_log_tool)
+batch_query_tool_sync = run_blocking(batch_query_tool)
+
+# Wrap functions with FunctionTool for ADK (async, so ParallelAgent sub-agents overlap their queries)
 crm_database_tool = FunctionTool(crm_database_tool)
-redemption_log_tool = FunctionTool(redemption_log_tool)
\ No newline at end of file
+redemption_log_tool = FunctionTool(redemption_log_tool)
+batch_query_tool = FunctionTool(batch_query_tool)
@@ -19,4 +19,5 @@ profile_synthesizer_agent = LlmAgent(
     ),
     description="Synthesizes quantitative behavioral data and qualitative sentiment data into actionable customer insight profiles.",
     tools=get_synthesizer_tools(),  # Can save results to BigQuery
+    output_key="customer_insight_profiles",
 )
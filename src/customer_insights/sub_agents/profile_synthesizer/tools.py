@@ -9,29 +9,22 @@ from src.utils.env_loader import load_env
 load_env()
 
 from google.adk.tools import FunctionTool
-from google.cloud import bigquery
+from google.adk.tools.tool_context import ToolContext
 from typing import Dict, Any, List
-import os
+from datetime import datetime, timezone
 import json
 
+from ...data.query_backend import get_query_backend
 
-def get_bigquery_client() -> bigquery.Client:
-    """Get BigQuery client with credentials"""
-    project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    
-    if credentials_path:
-        client = bigquery.Client.from_service_account_json(credentials_path, project=project_id)
-    else:
-        client = bigquery.Client(project=project_id)
-    
-    return client
+# Session state key holding the current synthesis run's created_at
+SEGMENT_RUN_STATE_KEY = "customer_segments_run"
 
 
 def save_customer_segments_tool(
     customer_insights: List[Dict[str, Any]],
     dataset_id: str,
-    table_name: str
+    table_name: str,
+    tool_context: ToolContext,
 ) -> Dict[str, Any]:
     """
     Save synthesized customer insights to BigQuery customer_segments table.
@@ -57,22 +50,23 @@ def save_customer_segments_tool(
             ]
         dataset_id: BigQuery dataset ID (typically: "wendys_hackathon_data")
         table_name: BigQuery table name (typically: "customer_segments")
+        tool_context: ADK tool context (provided by ADK, not by the model)
     
     Returns:
-        Dictionary with save results including row count and any errors
+        Dictionary with save results including row count and any errors. Rows are
+        upserted on segment_id + created_at, where created_at is fixed per synthesis
+        run, so saving a segment again in the same run updates it; rows_pending counts
+        rows still buffered for a batched write (see SEGMENT_WRITER_MAX_DELAY_SECONDS)
     """
-    client = get_bigquery_client()
-    project_id = client.project
+    backend = get_query_backend()
+    project_id = backend.project
     
     # Set defaults if not provided
     dataset = dataset_id if dataset_id else "wendys_hackathon_data"
     table = table_name if table_name else "customer_segments"
     
     try:
-        table_ref = bigquery.TableReference(
-            bigquery.DatasetReference(project_id, dataset),
-            table
-        )
+        table_ref = f"{project_id}.{dataset}.{table}"
         
         # Prepare rows for insertion
         rows_to_insert = []
@@ -82,6 +76,8 @@ def save_customer_segments_tool(
                 "description": insight.get("description", ""),
                 "preferred_mechanics": insight.get("preferred_mechanics", []),
                 "key_messaging_phrases": insight.get("key_messaging_phrases", []),
+                # Missing timestamps are stamped with the synthesis run's time (part of the upsert key)
+                "created_at": insight.get("created_at"),
             }
             
             # Handle empirical_metrics
@@ -97,20 +93,23 @@ def save_customer_segments_tool(
             
             rows_to_insert.append(row)
         
-        # Insert rows
-        errors = client.insert_rows_json(table_ref, rows_to_insert)
+        # Upsert in batches on (segment_id, created_at); repeated or retried calls in one run never duplicate rows
+        result = backend.write_segments(table_ref, rows_to_insert, run_at=_synthesis_run_at(tool_context))
+        errors = result["errors"]
         
         if errors:
             return {
                 "success": False,
-                "rows_inserted": 0,
+                "rows_inserted": result["rows_written"],
+                "rows_pending": result["rows_pending"],
                 "rows_attempted": len(rows_to_insert),
                 "errors": errors,
             }
         else:
             return {
                 "success": True,
-                "rows_inserted": len(rows_to_insert),
+                "rows_inserted": result["rows_written"],
+                "rows_pending": result["rows_pending"],
                 "rows_attempted": len(rows_to_insert),
                 "table": f"{project_id}.{dataset}.{table}",
             }
@@ -123,6 +122,18 @@ def save_customer_segments_tool(
         }
 
 
+def _synthesis_run_at(tool_context: ToolContext) -> str:
+    """Timestamp of the first segment save in this ADK invocation, kept in session state"""
+    run = tool_context.state.get(SEGMENT_RUN_STATE_KEY) or {}
+    if run.get("invocation_id") != tool_context.invocation_id:
+        run = {
+            "invocation_id": tool_context.invocation_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        tool_context.state[SEGMENT_RUN_STATE_KEY] = run
+    return run["created_at"]
+
+
 def _parse_metric(metric_str: str) -> float:
     """Parse metric string like '2.3x' to float"""
     try:
@@ -16,4 +16,5 @@ sentiment_analysis_agent = LlmAgent(
     ),
     description="Analyzes qualitative sentiment data including feedback, reviews, and messaging cues.",
     tools=get_sentiment_tools(),
+    output_key="sentiment_analysis",
 )
@@ -9,28 +9,19 @@ from src.utils.env_loader import load_env
 load_env()
 
 from google.adk.tools import FunctionTool
-from google.cloud import bigquery
 from typing import Dict, Any
-import os
 
-
-def get_bigquery_client() -> bigquery.Client:
-    """Get BigQuery client with credentials"""
-    project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    
-    if credentials_path:
-        client = bigquery.Client.from_service_account_json(credentials_path, project=project_id)
-    else:
-        client = bigquery.Client(project=project_id)
-    
-    return client
+from ...data.query_backend import get_query_backend
+from ...data.query_runner import QueryCostError, format_result, run_blocking
+from ...data.query_templates import template_query_from_text
 
 
-def feedback_database_tool(
+async def feedback_database_tool(
     query: str,
     dataset_id: str,
-    table_name: str
+    table_name: str,
+    result_format: str = "columnar",
+    mode: str = "raw",
 ) -> Dict[str, Any]:
     """
     Query past campaign feedback, reviews, and social comments.
@@ -47,21 +38,35 @@ def feedback_database_tool(
                - "SELECT review_text, sentiment_score FROM feedback_data WHERE offer_type='BOGO'"
                - "Find feedback for app-exclusive offers"
                - "Get sentiment for value-driven-lunch-buyer segment"
-               - "Extract key phrases from positive reviews"
+               - "Gen Z breakfast feedback on drive-thru in 2025-Q1"
+               Natural-language queries run the feedback_sentiment (feedback_data) or
+               feedback_verbatims (customer_feedback_raw) template filtered by any segment,
+               offer type, channel, daypart, quarter or Gen Z mention.
         dataset_id: BigQuery dataset ID (typically: "wendys_hackathon_data")
         table_name: BigQuery table name - 'feedback_data' or 'customer_feedback_raw' (typically: "feedback_data")
+        result_format: "columnar" (default) returns compact column -> values lists in `data`;
+                       "rows" returns a list of row objects in `rows` instead
+        mode: "raw" (default) returns result rows, capped at the tool's row/byte budget;
+              "summary" returns server-side aggregates per column (count, avg, p25-p90,
+              top values) over the full result instead of rows - use it for large scans
     
     Returns:
         Dictionary containing:
-        - rows: List of query results with review_text, sentiment_score, key_phrases
+        - data: Query results (review_text, sentiment_score, key_phrases, ...) as column name -> list of values
+        - rows: List of query results (only when result_format="rows")
         - columns: Column names
         - row_count: Number of rows returned
+        - summary: Per-column aggregates (only when mode="summary")
+        - truncated / total_rows: Whether rows were dropped to fit the budget, and the full row count
         - query_executed: The SQL query that was executed
+        - bytes_processed: BigQuery's dry-run estimate of bytes scanned (keep this low)
         - extracted_phrases: Unique key phrases found across results
         - avg_sentiment: Average sentiment score across results
+        - cache_hit: Whether the result was served from the query result cache
+        - template / template_parameters: Query template and filters used for a natural-language query
     """
-    client = get_bigquery_client()
-    project_id = client.project
+    backend = get_query_backend()
+    project_id = backend.project
     
     # Set defaults if not provided
     dataset = dataset_id if dataset_id else "wendys_hackathon_data"
@@ -74,41 +79,26 @@ def feedback_database_tool(
         elif "sentiment" in query.lower() or "key_phrases" in query.lower() or "segment" in query.lower():
             primary_table = "feedback_data"
     
-    # Handle natural language queries
+    # Summary mode aggregates the whole result, so natural-language fallbacks are not row-limited
+    row_limit = "" if mode == "summary" else "LIMIT 100"
+    
+    # Natural-language requests run a parameterized template instead of LIKE scans,
+    # so the same question always produces the same cacheable query
+    query_parameters = []
+    template_fields: Dict[str, Any] = {}
     if not query.strip().upper().startswith("SELECT"):
-        if primary_table == "customer_feedback_raw":
-            sql_query = f"""
-            SELECT 
-                feedback_id,
-                customer_id,
-                feedback_date,
-                rating,
-                feedback_text
-            FROM `{project_id}.{dataset}.{primary_table}`
-            WHERE 
-                feedback_text LIKE '%{query}%'
-            ORDER BY rating DESC, feedback_date DESC
-            LIMIT 100
-            """
-        else:
-            sql_query = f"""
-            SELECT 
-                feedback_id,
-                segment_id,
-                offer_type,
-                review_text,
-                sentiment_score,
-                key_phrases,
-                source,
-                channel
-            FROM `{project_id}.{dataset}.{primary_table}`
-            WHERE 
-                review_text LIKE '%{query}%' 
-                OR offer_type LIKE '%{query}%'
-                OR segment_id LIKE '%{query}%'
-            ORDER BY sentiment_score DESC
-            LIMIT 100
-            """
+        template = template_query_from_text(query, primary_table, project_id, dataset, row_limit)
+        if template is None:
+            return {
+                "error": f"No query template reads from '{primary_table}'; pass a SELECT statement instead",
+                "query_executed": "",
+                "data": {},
+                "columns": [],
+                "row_count": 0,
+            }
+        sql_query = template["sql"]
+        query_parameters = template["query_parameters"]
+        template_fields = {"template": template["template"], "template_parameters": template["parameters"]}
     else:
         sql_query = query.replace("{table}", f"`{project_id}.{dataset}.{primary_table}`")
         if f"{project_id}.{dataset}" not in sql_query:
@@ -117,42 +107,67 @@ def feedback_database_tool(
             sql_query = sql_query.replace("FROM reviews", f"FROM `{project_id}.{dataset}.feedback_data`")
     
     try:
-        query_job = client.query(sql_query)
-        results = query_job.result()
+        if mode == "summary":
+            summary = await backend.run_summary_query_async(sql_query, dataset, query_parameters)
+            column_stats = summary["summary"]["columns"]
+            top_phrases = column_stats.get("key_phrases", {}).get("top", [])
+            return {
+                "mode": "summary",
+                "summary": summary["summary"],
+                "row_count": summary["summary"]["row_count"],
+                "query_executed": sql_query,
+                "summary_query": summary["summary_query"],
+                "bytes_processed": summary["bytes_processed"],
+                "cache_hit": summary["cache_hit"],
+                **template_fields,
+                "extracted_phrases": [item["value"] for item in top_phrases],
+                "avg_sentiment": column_stats.get("sentiment_score", {}).get("avg") or 0,
+            }
         
-        rows = []
-        columns = [field.name for field in results.schema]
+        result = await backend.run_query_async(sql_query, dataset, query_parameters=query_parameters)
+        data = result["data"]
+        row_count = result["row_count"]
         all_phrases = set()
         
-        for row in results:
-            row_dict = {}
-            for col in columns:
-                value = row[col]
-                if col == "key_phrases" and value:
-                    # Handle repeated field (array)
-                    if isinstance(value, list):
-                        all_phrases.update(value)
-                    elif isinstance(value, str):
-                        # Split if it's a string representation
-                        phrases = [p.strip() for p in value.split(",")]
-                        all_phrases.update(phrases)
-                        value = phrases
-                row_dict[col] = value
-            rows.append(row_dict)
+        key_phrases = data.get("key_phrases", [])
+        for i, value in enumerate(key_phrases):
+            if not value:
+                continue
+            # Handle repeated field (array)
+            if isinstance(value, list):
+                all_phrases.update(value)
+            elif isinstance(value, str):
+                # Split if it's a string representation
+                phrases = [p.strip() for p in value.split(",")]
+                all_phrases.update(phrases)
+                key_phrases[i] = phrases
         
         return {
-            "rows": rows,
-            "columns": columns,
-            "row_count": len(rows),
+            **format_result(result, result_format),
             "query_executed": sql_query,
+            "bytes_processed": result["bytes_processed"],
+            "cache_hit": result["cache_hit"],
+            **template_fields,
             "extracted_phrases": list(all_phrases),
-            "avg_sentiment": sum(r.get("sentiment_score", 0) or 0 for r in rows) / len(rows) if rows else 0,
+            "avg_sentiment": sum(v or 0 for v in data.get("sentiment_score", [])) / row_count if row_count else 0,
+        }
+    except QueryCostError as e:
+        return {
+            "error": str(e),
+            "bytes_processed": e.bytes_processed,
+            "max_bytes_billed": e.max_bytes_billed,
+            "query_executed": sql_query,
+            "data": {},
+            "columns": [],
+            "row_count": 0,
+            "extracted_phrases": [],
+            "avg_sentiment": 0,
         }
     except Exception as e:
         return {
             "error": str(e),
             "query_executed": sql_query,
-            "rows": [],
+            "data": {},
             "columns": [],
             "row_count": 0,
             "extracted_phrases": [],
@@ -160,5 +175,8 @@ def feedback_database_tool(
         }
 
 
-# Wrap function with FunctionTool for ADK
-feedback_database_tool = FunctionTool(feedback_database_tool)
\ No newline at end of file
+# Blocking variant for scripts without an event loop
+feedback_database_tool_sync = run_blocking(feedback_database_tool)
+
+# Wrap function with FunctionTool for ADK (async, so ParallelAgent sub-agents overlap their queries)
+feedback_database_tool = FunctionTool(feedback_database_tool)
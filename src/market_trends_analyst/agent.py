@@ -11,6 +11,8 @@ load_env()
 
 from google.adk.agents.sequential_agent import SequentialAgent
 
+from utils.model_cache import install_model_cache
+
 from .sub_agents.data_collection.agent import data_collection_agent
 from .sub_agents.research_synthesis.agent import research_synthesis_agent
 
@@ -30,4 +32,5 @@ market_trends_analyst_root_agent = SequentialAgent(
 
 root_agent = market_trends_analyst_root_agent
 
-
+# Opt-in model response cache (LLM_RESPONSE_CACHE_ENABLED); see utils/model_cache.py
+install_model_cache(root_agent)
@@ -7,7 +7,14 @@ This sequential process ensures a logical workflow:
 1. Research is conducted.
 2. Insights are gathered.
 3. Offers are designed based on the collected information.
+
+The three research teams do not depend on each other, so by default
+(MARKETING_RESEARCH_MODE=parallel) they run at the same time through the
+research squad's ParallelAgent, each under RESEARCH_BRANCH_TIMEOUT_SECONDS,
+and a join stage merges their findings before offer design. Set
+MARKETING_RESEARCH_MODE=sequential to run them one after another instead.
 """
+import os
 import sys
 from pathlib import Path
 
@@ -25,6 +32,9 @@ load_env()
 
 from google.adk.agents.sequential_agent import SequentialAgent
 
+# Same module path as the teams use, so every agent is wired to one shared cache
+from utils.model_cache import install_model_cache
+
 # Import the primary agent from each specialized team.
 # These are the entry points for the Market Trends, Customer Insights,
 # Competitor Intelligence, and Offer Design teams.
@@ -35,15 +45,36 @@ from src.offer_design.sub_agents.simplified_offer_design.agent import (
     simplified_offer_design_agent,
 )
 
+RESEARCH_MODES = ("parallel", "sequential")
+research_mode = os.getenv("MARKETING_RESEARCH_MODE", "parallel").lower()
+if research_mode not in RESEARCH_MODES:
+    raise ValueError(
+        f"Unknown MARKETING_RESEARCH_MODE '{research_mode}'; use one of {', '.join(RESEARCH_MODES)}"
+    )
+
+if research_mode == "parallel":
+    # Imported only in parallel mode: an agent can have one parent, so the research
+    # teams are wrapped by the squad or listed below, never both
+    from src.marketing_orchestrator.sub_agents.research_squad.agent import (
+        research_join_agent,
+        research_squad_agent,
+    )
+
+    research_agents = [research_squad_agent, research_join_agent]
+else:
+    research_agents = [
+        market_trends_analyst_root_agent,
+        customer_insights_manager_agent,
+        competitor_intel_manager_agent,
+    ]
+
 # This is the main SequentialAgent that orchestrates the entire workflow.
 # You can modify the workflow by changing the order of the agents in the `sub_agents`
 # list or by adding/removing agents.
 marketing_orchestrator_agent = SequentialAgent(
     name="MarketingOrchestratorAgent",
     sub_agents=[
-        market_trends_analyst_root_agent,
-        customer_insights_manager_agent,
-        competitor_intel_manager_agent,
+        *research_agents,
         simplified_offer_design_agent,
     ],
     description=(
@@ -57,3 +88,5 @@ marketing_orchestrator_agent = SequentialAgent(
 # For this application, the orchestrator is the root.
 root_agent = marketing_orchestrator_agent
 
+# Opt-in model response cache (LLM_RESPONSE_CACHE_ENABLED); see utils/model_cache.py
+install_model_cache(root_agent)
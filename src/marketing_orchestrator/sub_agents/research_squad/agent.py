@@ -1,11 +1,141 @@
 """Research Squad Agent - The Data Gatherer (ParallelAgent)"""
+import asyncio
+import os
+import time
+from typing import AsyncGenerator, Dict, List
+
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
 from google.adk.agents.parallel_agent import ParallelAgent
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.genai import types
 
 # Import the three research specialist agents
-# These are the root agents from each specialist module
-from market_trends_analyst.agent import market_trends_analyst_root_agent
-from customer_insights.agent import customer_insights_manager_agent
-from competitor_intelligence.agent import competitor_intel_manager_agent
+# These are the root agents from each specialist module (imported the same way as
+# marketing_orchestrator/agent.py so both share one instance of each team)
+from src.market_trends_analyst.agent import market_trends_analyst_root_agent
+from src.customer_insights.agent import customer_insights_manager_agent
+from src.competitor_intelligence.agent import competitor_intel_manager_agent
+
+# Longest a single research team may run before the squad moves on without it
+BRANCH_TIMEOUT_SECONDS = float(os.getenv("RESEARCH_BRANCH_TIMEOUT_SECONDS", "600"))
+# Session state key prefix for each branch's completion status
+STATUS_KEY_PREFIX = "research_status_"
+
+
+class TimeboxedResearchAgent(BaseAgent):
+    """Runs one research team, abandoning it when it exceeds timeout_seconds"""
+
+    timeout_seconds: float = BRANCH_TIMEOUT_SECONDS
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        team = self.sub_agents[0]
+        started = time.perf_counter()
+        deadline = started + self.timeout_seconds
+        events = team.run_async(ctx)
+        status = "completed"
+        try:
+            while True:
+                # Time out each step rather than wrapping the loop, so the deadline
+                # never cancels the consumer while this generator is suspended at yield
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                try:
+                    event = await asyncio.wait_for(events.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    break
+                yield event
+        except asyncio.TimeoutError:
+            status = "timed_out"
+        finally:
+            await events.aclose()
+
+        elapsed = round(time.perf_counter() - started, 1)
+        content = None
+        if status == "timed_out":
+            content = types.Content(
+                role="model",
+                parts=[types.Part(text=f"{team.name} timed out after {elapsed}s; its findings are incomplete.")],
+            )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=content,
+            actions=EventActions(
+                state_delta={f"{STATUS_KEY_PREFIX}{self.name}": {"status": status, "elapsed_seconds": elapsed}}
+            ),
+        )
+
+
+class ResearchJoinAgent(BaseAgent):
+    """
+    Merges the research squad's branches into one state update and message.
+
+    Each branch's final responses are collected from the session and saved under
+    the state key the offer design step expects (trend_briefs, customer_insights,
+    whitespace_opportunities), along with every branch's status and timing.
+    """
+
+    # Timeboxed branch name -> state key its findings are saved under
+    branch_keys: Dict[str, str]
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        findings: Dict[str, List[str]] = {key: [] for key in self.branch_keys.values()}
+        for event in ctx.session.events:
+            if event.invocation_id != ctx.invocation_id or not event.branch or not event.content:
+                continue
+            if not event.is_final_response() or not event.content.parts:
+                continue
+            branch_path = event.branch.split(".")
+            for branch_name, key in self.branch_keys.items():
+                if branch_name in branch_path:
+                    text = "".join(part.text or "" for part in event.content.parts).strip()
+                    if text:
+                        findings[key].append(f"[{event.author}]\n{text}")
+                    break
+
+        status = {
+            branch_name: ctx.session.state.get(f"{STATUS_KEY_PREFIX}{branch_name}", {"status": "missing"})
+            for branch_name in self.branch_keys
+        }
+        state_delta = {key: "\n\n".join(texts) for key, texts in findings.items()}
+        state_delta["research_status"] = status
+
+        sections = ["RESEARCH_COMPLETE:"]
+        for branch_name, key in self.branch_keys.items():
+            branch_status = status[branch_name]
+            sections.append(
+                f"\n## {key} ({branch_status['status']}"
+                + (f", {branch_status['elapsed_seconds']}s)" if "elapsed_seconds" in branch_status else ")")
+            )
+            sections.append(state_delta[key] or "No findings returned.")
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text="\n".join(sections))]),
+            actions=EventActions(state_delta=state_delta),
+        )
+
+
+market_trends_branch = TimeboxedResearchAgent(
+    name="MarketTrendsBranch",
+    sub_agents=[market_trends_analyst_root_agent],
+    description="Runs the Market Trends team under the research branch timeout.",
+)
+customer_insights_branch = TimeboxedResearchAgent(
+    name="CustomerInsightsBranch",
+    sub_agents=[customer_insights_manager_agent],
+    description="Runs the Customer Insights team under the research branch timeout.",
+)
+competitor_intel_branch = TimeboxedResearchAgent(
+    name="CompetitorIntelBranch",
+    sub_agents=[competitor_intel_manager_agent],
+    description="Runs the Competitor Intelligence team under the research branch timeout.",
+)
 
 # -- Research Squad Agent (ParallelAgent) --
 # This agent runs all three research specialists simultaneously
@@ -13,10 +143,21 @@ from competitor_intelligence.agent import competitor_intel_manager_agent
 research_squad_agent = ParallelAgent(
     name="ResearchSquadAgent",
     sub_agents=[
-        market_trends_analyst_root_agent,      # Market Trends research
-        customer_insights_manager_agent,         # Customer Insights research
-        competitor_intel_manager_agent,          # Competitor Intelligence research
+        market_trends_branch,          # Market Trends research
+        customer_insights_branch,      # Customer Insights research
+        competitor_intel_branch,       # Competitor Intelligence research
     ],
     description="Coordinates parallel execution of all three research agents (Market Trends, Customer Insights, Competitor Intelligence) to gather comprehensive intelligence simultaneously.",
 )
 
+# -- Join stage --
+# Runs after the squad and hands one merged research summary to offer design
+research_join_agent = ResearchJoinAgent(
+    name="ResearchJoinAgent",
+    branch_keys={
+        market_trends_branch.name: "trend_briefs",
+        customer_insights_branch.name: "customer_insights",
+        competitor_intel_branch.name: "whitespace_opportunities",
+    },
+    description="Merges the parallel research teams' findings into session state for offer design.",
+)
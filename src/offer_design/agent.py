@@ -5,6 +5,8 @@ load_env()
 
 from google.adk.agents.sequential_agent import SequentialAgent
 
+from utils.model_cache import install_model_cache
+
 # Import sub-agents for SequentialAgent workflow
 from offer_design.sub_agents.concept_generation.agent import concept_generation_agent
 from offer_design.sub_agents.offer_definition.agent import offer_definition_agent
@@ -28,3 +30,5 @@ offer_design_manager_agent = SequentialAgent(
 # -- Run the root agent for the runner --
 root_agent = offer_design_manager_agent
 
+# Opt-in model response cache (LLM_RESPONSE_CACHE_ENABLED); see utils/model_cache.py
+install_model_cache(root_agent)
@@ -0,0 +1,134 @@
+"""
+Dependency-aware scheduling of ADK sub-agents.
+
+DagAgent runs its sub-agents as a graph whose edges are session state keys:
+a sub-agent's ``output_key`` is what it produces, and ``inputs`` lists the
+keys each sub-agent reads (typically through ``{key}`` placeholders in its
+instruction). Every sub-agent starts the moment its inputs exist, sub-agents
+with no pending inputs run concurrently on their own branches like a
+ParallelAgent, and the DagAgent finishes once all of them have.
+
+Usage:
+    DagAgent(
+        name="CustomerInsightsAgent",
+        sub_agents=[behavioral_agent, sentiment_agent, synthesizer_agent],
+        inputs={"ProfileSynthesizerAgent": ["behavioral_analysis", "sentiment_analysis"]},
+    )
+"""
+import asyncio
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set, Tuple
+
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events.event import Event
+from pydantic import Field
+
+
+class DagAgent(BaseAgent):
+    """Runs sub-agents as soon as the state keys they depend on are written"""
+
+    # Sub-agent name -> session state keys it needs before it can start
+    inputs: Dict[str, List[str]] = Field(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        names = {agent.name for agent in self.sub_agents}
+        unknown = sorted(set(self.inputs) - names)
+        if unknown:
+            raise ValueError(f"{self.name}: inputs name unknown sub-agents: {', '.join(unknown)}")
+        self._check_acyclic()
+
+    def producers(self) -> Dict[str, str]:
+        """State key -> name of the sub-agent whose output_key writes it"""
+        return {
+            agent.output_key: agent.name for agent in self.sub_agents if getattr(agent, "output_key", None)
+        }
+
+    def dependencies(self, agent_name: str) -> Set[str]:
+        """Names of the sibling sub-agents whose output agent_name reads"""
+        producers = self.producers()
+        return {producers[key] for key in self.inputs.get(agent_name, []) if key in producers}
+
+    def _check_acyclic(self) -> None:
+        visiting: Set[str] = set()
+        done: Set[str] = set()
+
+        def visit(name: str, path: List[str]) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"{self.name}: dependency cycle {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dependency in sorted(self.dependencies(name)):
+                visit(dependency, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for agent in self.sub_agents:
+            visit(agent.name, [])
+
+    def _is_ready(self, agent: BaseAgent, ctx: InvocationContext, produced: Set[str]) -> bool:
+        producers = self.producers()
+        for key in self.inputs.get(agent.name, []):
+            # A sibling's output only counts once written in this run, not left over from an earlier turn
+            if key in producers:
+                if key not in produced:
+                    return False
+            elif key not in ctx.session.state:
+                return False
+        return True
+
+    def _branch_context(self, agent: BaseAgent, ctx: InvocationContext) -> InvocationContext:
+        # Same branch naming as ParallelAgent, so concurrent sub-agents keep separate histories
+        branch_ctx = ctx.model_copy()
+        branch_suffix = f"{self.name}.{agent.name}"
+        branch_ctx.branch = f"{ctx.branch}.{branch_suffix}" if ctx.branch else branch_suffix
+        return branch_ctx
+
+    async def _run_node(
+        self,
+        agent: BaseAgent,
+        ctx: InvocationContext,
+        queue: "asyncio.Queue[Tuple[str, Optional[Event], Any]]",
+    ) -> None:
+        try:
+            async for event in agent.run_async(self._branch_context(agent, ctx)):
+                # Wait until the runner has applied this event (and its state_delta) before continuing
+                processed = asyncio.Event()
+                await queue.put((agent.name, event, processed))
+                await processed.wait()
+        except Exception as e:
+            await queue.put((agent.name, None, e))
+            return
+        await queue.put((agent.name, None, None))
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        pending = list(self.sub_agents)
+        running: Dict[str, asyncio.Task] = {}
+        produced: Set[str] = set()
+        queue: "asyncio.Queue[Tuple[str, Optional[Event], Any]]" = asyncio.Queue()
+        try:
+            while pending or running:
+                for agent in [agent for agent in pending if self._is_ready(agent, ctx, produced)]:
+                    pending.remove(agent)
+                    running[agent.name] = asyncio.create_task(self._run_node(agent, ctx, queue))
+                if not running:
+                    blocked = {
+                        agent.name: [key for key in self.inputs.get(agent.name, []) if key not in produced]
+                        for agent in pending
+                    }
+                    raise RuntimeError(f"{self.name}: sub-agents never received their inputs: {blocked}")
+
+                agent_name, event, detail = await queue.get()
+                if event is None:
+                    running.pop(agent_name)
+                    if isinstance(detail, Exception):
+                        raise detail
+                    continue
+                yield event
+                if event.actions and event.actions.state_delta:
+                    produced.update(event.actions.state_delta)
+                detail.set()
+        finally:
+            for task in running.values():
+                task.cancel()
@@ -0,0 +1,405 @@
+"""
+Opt-in response cache for LlmAgent model calls, shared across sessions.
+
+Many users send near-identical goals ("increase Gen Z breakfast traffic in
+Q1"), and every LlmAgent in the tree pays full Gemini latency for each one.
+install_model_cache() attaches a before_model_callback / after_model_callback
+pair to every LlmAgent under a root agent:
+
+- Exact tier: the key hashes the model, system instruction, tools and request
+  contents (function call ids, which ADK generates per call, are ignored).
+- Semantic tier (optional): when LLM_RESPONSE_CACHE_SEMANTIC_THRESHOLD is
+  set, a request with the same model, instruction and tools whose contents
+  embed within that cosine similarity of a cached one is served from it. Only
+  requests without function calls or responses are matched this way.
+
+Entries live in SQLite on local disk, expire after LLM_RESPONSE_CACHE_TTL_SECONDS
+and are evicted least recently used beyond LLM_RESPONSE_CACHE_MAX_ENTRIES.
+Hit rates are tracked per agent (see ModelResponseCache.stats).
+
+Settings:
+    LLM_RESPONSE_CACHE_ENABLED=true              # off by default
+    LLM_RESPONSE_CACHE_AGENTS=CompetitorAnalysisAgent,SimplifiedOfferDesignAgent
+    LLM_RESPONSE_CACHE_EXCLUDE_AGENTS=ProfileSynthesizerAgent
+    LLM_RESPONSE_CACHE_SEMANTIC_THRESHOLD=0.95
+"""
+import asyncio
+import hashlib
+import inspect
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent.parent / ".cache" / "llm_responses.sqlite3"
+EMBEDDING_MODEL = os.getenv("LLM_RESPONSE_CACHE_EMBEDDING_MODEL", "text-embedding-004")
+# Longest text sent to the embedding model; the start of a request identifies it well enough
+EMBEDDING_MAX_CHARS = 8000
+# Most recent candidates compared per semantic lookup
+SEMANTIC_CANDIDATES = 500
+
+
+def _dump(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return value
+
+
+def _drop_call_ids(value: Any) -> Any:
+    """Remove the per-call ids ADK assigns to function calls and responses"""
+    if isinstance(value, list):
+        return [_drop_call_ids(item) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: _drop_call_ids(item)
+            for key, item in value.items()
+            if not (key == "id" and ("name" in value and ("args" in value or "response" in value)))
+        }
+    return value
+
+
+def _hash(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def request_keys(llm_request: LlmRequest) -> Tuple[str, str]:
+    """(exact key, scope key): the scope covers model, instruction and tools but not contents"""
+    config = llm_request.config
+    scope = {
+        "model": llm_request.model,
+        "system_instruction": _dump(config.system_instruction) if config else None,
+        "tools": _dump(config.tools) if config else None,
+    }
+    contents = _drop_call_ids(_dump(list(llm_request.contents or [])))
+    return _hash({**scope, "contents": contents}), _hash(scope)
+
+
+def request_text(llm_request: LlmRequest) -> Optional[str]:
+    """Text of the request contents, or None when they include function calls or responses"""
+    texts = []
+    for content in llm_request.contents or []:
+        for part in content.parts or []:
+            if part.function_call or part.function_response:
+                return None
+            if part.text:
+                texts.append(part.text)
+    return "\n".join(texts) or None
+
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+_genai_client = None
+
+
+def embed_text(text: str) -> List[float]:
+    """Embed text with the Gemini embedding model (same credentials as the agents)"""
+    global _genai_client
+    if _genai_client is None:
+        from google import genai
+
+        _genai_client = genai.Client()
+    result = _genai_client.models.embed_content(model=EMBEDDING_MODEL, contents=text[:EMBEDDING_MAX_CHARS])
+    return list(result.embeddings[0].values)
+
+
+class ModelResponseCache:
+    """
+    Thread-safe SQLite cache of LlmResponses keyed by request.
+
+    Agents can be switched on and off individually (set_agent_enabled, or the
+    LLM_RESPONSE_CACHE_AGENTS / _EXCLUDE_AGENTS lists); copies of an agent
+    made at run time share the switch and statistics of the agent the
+    callbacks were installed on.
+    """
+
+    def __init__(
+        self,
+        path: str = str(DEFAULT_CACHE_PATH),
+        ttl_seconds: float = 86400.0,
+        max_entries: int = 2000,
+        semantic_threshold: Optional[float] = None,
+        embed: Callable[[str], List[float]] = embed_text,
+        agents: Optional[Set[str]] = None,
+        exclude_agents: Optional[Set[str]] = None,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.semantic_threshold = semantic_threshold
+        self.embed = embed
+        self._agents = set(agents) if agents else None
+        self._exclude_agents = set(exclude_agents or ())
+        self._lock = threading.Lock()
+        # (invocation id, agent name) -> keys of the request awaiting its response
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS model_responses ("
+                " key TEXT PRIMARY KEY,"
+                " agent TEXT NOT NULL,"
+                " scope TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " embedding TEXT,"
+                " created_at REAL NOT NULL,"
+                " last_used_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS model_responses_scope ON model_responses (agent, scope, last_used_at)"
+            )
+
+    def is_enabled(self, agent_name: str) -> bool:
+        if agent_name in self._exclude_agents:
+            return False
+        return self._agents is None or agent_name in self._agents
+
+    def set_agent_enabled(self, agent_name: str, enabled: bool) -> None:
+        """Switch caching for one agent on or off at run time"""
+        with self._lock:
+            if enabled:
+                self._exclude_agents.discard(agent_name)
+                if self._agents is not None:
+                    self._agents.add(agent_name)
+            else:
+                self._exclude_agents.add(agent_name)
+
+    def callbacks(self, agent_name: str) -> Tuple[Callable[..., Any], Callable[..., Any]]:
+        """before_model_callback and after_model_callback for the agent named agent_name"""
+
+        async def before_model_callback(
+            callback_context: CallbackContext, llm_request: LlmRequest
+        ) -> Optional[LlmResponse]:
+            if not self.is_enabled(agent_name):
+                return None
+            return await self.lookup(agent_name, callback_context, llm_request)
+
+        def after_model_callback(
+            callback_context: CallbackContext, llm_response: LlmResponse
+        ) -> Optional[LlmResponse]:
+            self.store(agent_name, callback_context, llm_response)
+            return None
+
+        return before_model_callback, after_model_callback
+
+    async def lookup(
+        self, agent_name: str, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        """Cached response for the request, or None after noting it so the response gets stored"""
+        key, scope = request_keys(llm_request)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM model_responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is not None and now - row[1] <= self.ttl_seconds:
+            self._touch(key, now)
+            self._count(agent_name, "exact_hits")
+            return self._cached_response(row[0], "exact")
+
+        embedding = None
+        text = request_text(llm_request) if self.semantic_threshold is not None else None
+        if text:
+            try:
+                embedding = await asyncio.to_thread(self.embed, text)
+            except Exception:
+                # The semantic tier is best effort; a failed embedding is just a miss
+                embedding = None
+        if embedding is not None:
+            match = self._nearest(agent_name, scope, embedding, now)
+            if match is not None:
+                self._touch(match[0], now)
+                self._count(agent_name, "semantic_hits")
+                return self._cached_response(match[1], "semantic")
+
+        self._count(agent_name, "misses")
+        with self._lock:
+            self._pending[(callback_context.invocation_id, callback_context.agent_name)] = {
+                "key": key,
+                "scope": scope,
+                "embedding": embedding,
+            }
+        return None
+
+    def store(self, agent_name: str, callback_context: CallbackContext, llm_response: LlmResponse) -> None:
+        """Save the complete response to the request noted by lookup"""
+        if llm_response.partial:
+            return
+        with self._lock:
+            pending = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if pending is None or llm_response.error_code or not llm_response.content:
+            return
+        now = time.time()
+        embedding = json.dumps(pending["embedding"]) if pending["embedding"] is not None else None
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO model_responses"
+                " (key, agent, scope, response, embedding, created_at, last_used_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    pending["key"],
+                    agent_name,
+                    pending["scope"],
+                    llm_response.model_dump_json(exclude_none=True),
+                    embedding,
+                    now,
+                    now,
+                ),
+            )
+            # Expired entries go first, then the least recently used beyond max_entries
+            self._connection.execute(
+                "DELETE FROM model_responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self._connection.execute(
+                "DELETE FROM model_responses WHERE key IN ("
+                " SELECT key FROM model_responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        self._count(agent_name, "stored")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent exact_hits, semantic_hits, misses, stored and hit_rate"""
+        with self._lock:
+            stats = {}
+            for agent_name, counts in self._stats.items():
+                hits = counts.get("exact_hits", 0) + counts.get("semantic_hits", 0)
+                lookups = hits + counts.get("misses", 0)
+                stats[agent_name] = {**counts, "hit_rate": round(hits / lookups, 3) if lookups else 0.0}
+            return stats
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM model_responses")
+            self._stats.clear()
+
+    def _nearest(
+        self, agent_name: str, scope: str, embedding: List[float], now: float
+    ) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, response, embedding FROM model_responses"
+                " WHERE agent = ? AND scope = ? AND embedding IS NOT NULL AND created_at >= ?"
+                " ORDER BY last_used_at DESC LIMIT ?",
+                (agent_name, scope, now - self.ttl_seconds, SEMANTIC_CANDIDATES),
+            ).fetchall()
+        best, best_similarity = None, self.semantic_threshold
+        for key, response, cached_embedding in rows:
+            similarity = cosine_similarity(embedding, json.loads(cached_embedding))
+            if similarity >= best_similarity:
+                best, best_similarity = (key, response), similarity
+        return best
+
+    def _touch(self, key: str, now: float) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE model_responses SET last_used_at = ? WHERE key = ?", (now, key))
+
+    def _count(self, agent_name: str, counter: str) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(agent_name, {})
+            counts[counter] = counts.get(counter, 0) + 1
+
+    @staticmethod
+    def _cached_response(response_json: str, tier: str) -> LlmResponse:
+        response = LlmResponse.model_validate_json(response_json)
+        if hasattr(response, "custom_metadata"):
+            response.custom_metadata = {**(response.custom_metadata or {}), "response_cache": tier}
+        return response
+
+
+def _agent_set(value: Optional[str]) -> Optional[Set[str]]:
+    names = {name.strip() for name in (value or "").split(",") if name.strip()}
+    return names or None
+
+
+_model_cache: Optional[ModelResponseCache] = None
+_model_cache_lock = threading.Lock()
+_installed_agents: Set[int] = set()
+
+
+def get_model_cache() -> Optional[ModelResponseCache]:
+    """Get the shared response cache, or None unless LLM_RESPONSE_CACHE_ENABLED is on"""
+    global _model_cache
+    if os.getenv("LLM_RESPONSE_CACHE_ENABLED", "false").lower() not in {"1", "true", "yes"}:
+        return None
+    if _model_cache is None:
+        with _model_cache_lock:
+            if _model_cache is None:
+                threshold = os.getenv("LLM_RESPONSE_CACHE_SEMANTIC_THRESHOLD")
+                _model_cache = ModelResponseCache(
+                    path=os.getenv("LLM_RESPONSE_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+                    ttl_seconds=float(os.getenv("LLM_RESPONSE_CACHE_TTL_SECONDS", "86400")),
+                    max_entries=int(os.getenv("LLM_RESPONSE_CACHE_MAX_ENTRIES", "2000")),
+                    semantic_threshold=float(threshold) if threshold else None,
+                    agents=_agent_set(os.getenv("LLM_RESPONSE_CACHE_AGENTS")),
+                    exclude_agents=_agent_set(os.getenv("LLM_RESPONSE_CACHE_EXCLUDE_AGENTS")),
+                )
+    return _model_cache
+
+
+def _chain(first: Optional[Callable[..., Any]], second: Callable[..., Any]) -> Callable[..., Any]:
+    """Run an agent's existing callback first; the cache callback runs only if it returned None"""
+    if first is None:
+        return second
+    if isinstance(first, list):
+        # ADK runs a list of callbacks in order until one returns a value
+        return [*first, second]
+
+    async def chained(**kwargs: Any) -> Any:
+        result = first(**kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        if result is not None:
+            return result
+        result = second(**kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    return chained
+
+
+def install_model_cache(root_agent: Any, cache: Optional[ModelResponseCache] = None) -> int:
+    """
+    Attach the response cache callbacks to every LlmAgent under root_agent.
+
+    Safe to call on overlapping trees (each agent is wired once). Does
+    nothing unless a cache is given or LLM_RESPONSE_CACHE_ENABLED is on.
+
+    Returns:
+        Number of agents newly wired to the cache
+    """
+    cache = cache or get_model_cache()
+    if cache is None:
+        return 0
+    installed = 0
+    pending = [root_agent]
+    while pending:
+        agent = pending.pop()
+        pending.extend(agent.sub_agents)
+        if not isinstance(agent, LlmAgent) or id(agent) in _installed_agents:
+            continue
+        before, after = cache.callbacks(agent.name)
+        agent.before_model_callback = _chain(agent.before_model_callback, before)
+        agent.after_model_callback = _chain(agent.after_model_callback, after)
+        _installed_agents.add(id(agent))
+        installed += 1
+    return installed
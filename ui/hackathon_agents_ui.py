@@ -227,9 +227,9 @@ Prompt → Target Identification → Research Orchestrator → Competitor Analys
      - Tool: `google_search`
      - Instruction: `src/competitor_intelligence/sub_agents/target_identification/instruction.txt`
   2. `ResearchOrchestratorAgent`
-     - Tool: `competitor_analysis_tool`
-     - Instruction: `src/competitor_intelligence/sub_agents/research_orchestrator/instruction.txt`
-  3. `CompetitorAnalysisAgent`
+     - Runs one `CompetitorAnalysisAgent` per competitor concurrently (`COMPETITOR_RESEARCH_CONCURRENCY`)
+     - Code: `src/competitor_intelligence/sub_agents/research_orchestrator/agent.py`
+  3. `CompetitorAnalysisAgent` (one copy per competitor)
      - Tool: `google_search`
      - Instruction: `src/competitor_intelligence/sub_agents/competitor_analysis/instruction.txt`
   4. `WhitespaceSynthesizerAgent`